@@ -1,10 +1,172 @@
+import asyncio
+import atexit
+import os
 import ssl
+import threading
+import weakref
+from collections.abc import AsyncIterator
 from typing import Any, Optional, Union
 
 import httpx
 from attrs import define, evolve, field
 
 
+class SharedTransport(httpx.BaseTransport):
+    """Транспорт реестра: закрытие клиента не закрывает общий пул."""
+
+    def __init__(self, transport: httpx.BaseTransport) -> None:
+        """Обертка над общим синхронным пулом transport."""
+        self.transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """Отправляет запрос через общий пул."""
+        return self.transport.handle_request(request)
+
+    def close(self) -> None:
+        """Не закрывает общий пул: его закрывает реестр."""
+
+
+class SharedAsyncTransport(httpx.AsyncBaseTransport):
+    """Асинхронный транспорт реестра.
+
+    Закрытие клиента не закрывает общий пул соединений event loop.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport) -> None:
+        """Обертка над общим асинхронным пулом transport."""
+        self.transport = transport
+
+    async def handle_async_request(
+        self, request: httpx.Request,
+    ) -> httpx.Response:
+        """Отправляет запрос через общий пул."""
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        """Не закрывает общий пул: его закрывает реестр."""
+
+
+async def close_at_shutdown(
+    transports: dict[Any, httpx.AsyncHTTPTransport],
+) -> AsyncIterator[None]:
+    """Закрывает пулы соединений event loop при его остановке.
+
+    Генератор останавливается на yield и хранится в реестре, а
+    asyncio.run при завершении (loop.shutdown_asyncgens) закрывает
+    незавершенные асинхронные генераторы loop, выполняя блок finally.
+    """
+    try:
+        yield
+    finally:
+        CLIENT_REGISTRY.forget_loop(asyncio.get_running_loop())
+        for transport in list(transports.values()):
+            await transport.aclose()
+
+
+def start_async_generator(generator: AsyncIterator[None]) -> None:
+    """Доводит асинхронный генератор до первого yield без await.
+
+    До yield в генераторе нет ожиданий, поэтому шаг завершается сразу, а
+    event loop регистрирует генератор при первом шаге.
+    """
+    try:
+        generator.asend(None).send(None)
+    except StopIteration:
+        pass
+
+
+class ClientRegistry:
+    """Реестр пулов соединений.
+
+    Один пул на процесс для синхронных клиентов и один пул на (процесс, event
+    loop) для асинхронных. После fork пулы родителя не используются и не
+    закрываются (их сокеты принадлежат родителю), пулы создаются заново в
+    дочернем процессе. Пулы event loop хранятся по слабой ссылке на loop.
+    Синхронные пулы закрываются при выходе из процесса, асинхронные - при
+    остановке loop через asyncio.run (loop.shutdown_asyncgens) или вызовом
+    await CLIENT_REGISTRY.aclose() в том loop, где они использовались. Loop,
+    который закрывают без shutdown_asyncgens, должен вызвать aclose. Пулы
+    различаются по verify: SSLContext служит ключом сам, поэтому пул не
+    достанется другому контексту с тем же id.
+    """
+
+    def __init__(self) -> None:
+        """Пустой реестр, закрывающий пулы при выходе из процесса."""
+        self._reset()
+        atexit.register(self.close)
+
+    def _reset(self) -> None:
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._transports: dict[Any, httpx.HTTPTransport] = {}
+        self._async_transports: weakref.WeakKeyDictionary = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _check_process(self) -> None:
+        if os.getpid() != self._pid:
+            self._reset()
+
+    def get_transport(
+        self, verify: Union[str, bool, ssl.SSLContext] = True,
+    ) -> SharedTransport:
+        """Возвращает общий синхронный пул соединений процесса."""
+        self._check_process()
+        with self._lock:
+            transport = self._transports.get(verify)
+            if transport is None:
+                transport = self._transports[verify] = httpx.HTTPTransport(
+                    verify=verify,
+                )
+        return SharedTransport(transport)
+
+    def get_async_transport(
+        self, verify: Union[str, bool, ssl.SSLContext] = True,
+    ) -> SharedAsyncTransport:
+        """Возвращает общий пул соединений текущего event loop."""
+        self._check_process()
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._async_transports.get(loop)
+            if entry is None:
+                transports = {}
+                closer = close_at_shutdown(transports)
+                entry = self._async_transports[loop] = transports, closer
+                start_async_generator(closer)
+            transports = entry[0]
+            transport = transports.get(verify)
+            if transport is None:
+                transport = transports[verify] = httpx.AsyncHTTPTransport(
+                    verify=verify,
+                )
+        return SharedAsyncTransport(transport)
+
+    def forget_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Убирает пулы loop из реестра, не закрывая их."""
+        with self._lock:
+            self._async_transports.pop(loop, None)
+
+    async def aclose(self) -> None:
+        """Закрывает пулы соединений текущего event loop."""
+        self._check_process()
+        with self._lock:
+            entry = self._async_transports.get(asyncio.get_running_loop())
+        if entry is not None:
+            await entry[1].aclose()
+
+    def close(self) -> None:
+        """Закрывает синхронные пулы соединений процесса."""
+        if os.getpid() != self._pid:
+            return
+        with self._lock:
+            transports, self._transports = self._transports, {}
+        for transport in transports.values():
+            transport.close()
+
+
+CLIENT_REGISTRY = ClientRegistry()
+
+
 @define
 class AuthenticatedClient:
     """A Client which has been authenticated for use on secured endpoints
@@ -27,6 +189,10 @@ class AuthenticatedClient:
 
     ``httpx_args``: A dictionary of additional arguments to be passed to the ``httpx.Client`` and ``httpx.AsyncClient`` constructor.
 
+    Клиенты httpx, созданные здесь, берут пул соединений из CLIENT_REGISTRY
+    и пересоздаются после fork и при вызове из другого event loop, поэтому
+    один экземпляр можно использовать в воркерах gunicorn/uvicorn и
+    из нескольких asyncio.run.
 
     """
 
@@ -40,6 +206,10 @@ class AuthenticatedClient:
     _httpx_args: dict[str, Any] = field(factory=dict, kw_only=True, alias="httpx_args")
     _client: Optional[httpx.Client] = field(default=None, init=False)
     _async_client: Optional[httpx.AsyncClient] = field(default=None, init=False)
+    # Процесс и event loop, для которых созданы клиенты; None - клиент
+    # задан вручную и не пересоздается.
+    _client_pid: Optional[int] = field(default=None, init=False)
+    _async_client_owner: Optional[tuple] = field(default=None, init=False)
 
     token: str
     prefix: str = "Bearer"
@@ -75,11 +245,22 @@ class AuthenticatedClient:
         **NOTE**: This will override any other settings on the client, including cookies, headers, and timeout.
         """
         self._client = client
+        self._client_pid = None
         return self
 
+    def _get_httpx_args(self, transport: Any) -> dict[str, Any]:
+        """Аргументы клиента httpx.
+
+        Общий пул реестра, если транспорт не передан в httpx_args.
+        """
+        if "transport" in self._httpx_args:
+            return self._httpx_args
+        return {**self._httpx_args, "transport": transport()}
+
     async def get_httpx_client(self) -> httpx.Client:
         """Get the underlying httpx.Client, constructing a new one if not previously set"""
-        if self._client is None:
+        pid = os.getpid()
+        if self._client is None or self._client_pid not in (None, pid):
             self._headers[self.auth_header_name] = f"{self.prefix} {self.token}" if self.prefix else self.token
             self._client = httpx.Client(
                 base_url=self._base_url,
@@ -88,18 +269,21 @@ class AuthenticatedClient:
                 timeout=self._timeout,
                 verify=self._verify_ssl,
                 follow_redirects=self._follow_redirects,
-                **self._httpx_args,
+                **self._get_httpx_args(
+                    lambda: CLIENT_REGISTRY.get_transport(self._verify_ssl),
+                ),
             )
+            self._client_pid = pid
         return self._client
 
     async def __enter__(self) -> "AuthenticatedClient":
         """Enter a context manager for self.client—you cannot enter twice (see httpx docs)"""
-        await self.get_httpx_client().__enter__()
+        (await self.get_httpx_client()).__enter__()
         return self
 
     async def __exit__(self, *args: Any, **kwargs: Any) -> None:
         """Exit a context manager for internal httpx.Client (see httpx docs)"""
-        await self.get_httpx_client().__exit__(*args, **kwargs)
+        (await self.get_httpx_client()).__exit__(*args, **kwargs)
 
     async def set_async_httpx_client(self, async_client: httpx.AsyncClient) -> "AuthenticatedClient":
         """Manually the underlying httpx.AsyncClient
@@ -107,11 +291,20 @@ class AuthenticatedClient:
         **NOTE**: This will override any other settings on the client, including cookies, headers, and timeout.
         """
         self._async_client = async_client
+        self._async_client_owner = None
         return self
 
+    def _is_async_client_owner(self, loop: asyncio.AbstractEventLoop) -> bool:
+        """Создан ли асинхронный клиент в этом процессе и event loop."""
+        if self._async_client_owner is None:
+            return True
+        pid, loop_ref = self._async_client_owner
+        return pid == os.getpid() and loop_ref() is loop
+
     async def get_async_httpx_client(self) -> httpx.AsyncClient:
         """Get the underlying httpx.AsyncClient, constructing a new one if not previously set"""
-        if self._async_client is None:
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or not self._is_async_client_owner(loop):
             self._headers[self.auth_header_name] = f"{self.prefix} {self.token}" if self.prefix else self.token
             self._async_client = httpx.AsyncClient(
                 base_url=self._base_url,
@@ -120,15 +313,20 @@ class AuthenticatedClient:
                 timeout=self._timeout,
                 verify=self._verify_ssl,
                 follow_redirects=self._follow_redirects,
-                **self._httpx_args,
+                **self._get_httpx_args(
+                    lambda: CLIENT_REGISTRY.get_async_transport(
+                        self._verify_ssl,
+                    ),
+                ),
             )
+            self._async_client_owner = (os.getpid(), weakref.ref(loop))
         return self._async_client
 
     async def __aenter__(self) -> "AuthenticatedClient":
         """Enter a context manager for underlying httpx.AsyncClient—you cannot enter twice (see httpx docs)"""
-        await self.get_async_httpx_client().__aenter__()
+        await (await self.get_async_httpx_client()).__aenter__()
         return self
 
     async def __aexit__(self, *args: Any, **kwargs: Any) -> None:
         """Exit a context manager for underlying httpx.AsyncClient (see httpx docs)"""
-        await self.get_async_httpx_client().__aexit__(*args, **kwargs)
+        await (await self.get_async_httpx_client()).__aexit__(*args, **kwargs)
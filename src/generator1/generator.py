@@ -1,6 +1,10 @@
+import argparse
 import subprocess
 import sys
 
+from script import generate_client as build_client
+from script import start_report
+
 MIN_ARGS = 2
 COMMAND_INDEX = 1
 GENERATE_COMMAND = "generate"
@@ -16,10 +20,27 @@ def run_command(command):
         print(f"Ошибка при выполнении команды: {command}\nКод ошибки: {e.returncode}\nВывод:\n{e.stderr}")
 
 def generate_client():
-    """Генерация клиента и запуск скрипта-генератора."""
+    """Генерация клиента в текущем процессе за один проход шаблонов.
+
+    Печатает отчет о запуске: время, процессорное время и пиковый RSS
+    стадий, счетчики операций и схем. Флаги --report-json и --max-seconds
+    позволяют сохранить отчет и завершиться с ошибкой при регрессии.
+    """
+    parser = argparse.ArgumentParser(prog="generator.py generate")
+    parser.add_argument("--report-json", help="Путь для JSON отчета.")
+    parser.add_argument(
+        "--max-seconds", type=float,
+        help="Завершиться с ошибкой, если генерация шла дольше.",
+    )
+    args = parser.parse_args(sys.argv[COMMAND_INDEX + 1:])
     print("Генерация клиента...")
-    run_command("openapi-python-client generate --path openapi.yaml --custom-template-path=./templates --overwrite")
-    run_command("python script.py")
+    report = start_report()
+    for error in build_client():
+        print(f"{error.header}: {error.detail or ''}")
+    print(report.format_table())
+    if args.report_json:
+        report.write_json(args.report_json)
+    sys.exit(report.check(args.max_seconds))
 
 def install_and_run_tests():
     """Установка пакета и запуск тест-запросов."""
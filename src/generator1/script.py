@@ -1,163 +1,202 @@
-import ast
-import os
 import shutil
-import subprocess
+import sys
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
 
 import yaml
-from jinja2 import Environment, FileSystemLoader
-
-
-def extract_functions_and_imports_from_file(file_path) -> None:
-    with open(file_path, "r", encoding="utf-8") as file:
-        tree = ast.parse(file.read())
-
-    functions = []
-    imports = []
-
-    for node in ast.walk(tree):
-        if isinstance(node, ast.AsyncFunctionDef) or isinstance(
-            node,
-            ast.FunctionDef,
-        ):
-            functions.append(ast.unparse(node))
-        elif isinstance(node, ast.ImportFrom):
-            module = node.module if node.module else "."
-            for alias in node.names:
-                if module == "typing":
-                    imports.append(f"from typing import {alias.name}")
-                elif module.startswith("models"):
-                    imports.append(f"from .models import {alias.name}")
-                elif module == "types":
-                    imports.append(f"from .types import {alias.name}")
-                elif module == "client_serv":
-                    imports.append(f"from .client_serv import {alias.name}")
-                else:
-                    imports.append(f"from {module} import {alias.name}")
-
-    return functions, imports
-
-def get_all_api_functions_and_imports(api_dir):
-    all_functions = []
-    all_imports = []
-    for root, _, files in os.walk(api_dir):
-        for file in files:
-            if file.endswith(".py"):
-                file_path = os.path.join(root, file)
-                functions, imports = extract_functions_and_imports_from_file(
-                    file_path,
-                )
-                all_functions.extend(functions)
-                all_imports.extend(imports)
-    return all_functions, all_imports
-
+from jinja2 import FileSystemBytecodeCache
+from openapi_python_client import Project
+from openapi_python_client.config import Config, ConfigFile, MetaType
+from openapi_python_client.parser import GeneratorData
+from openapi_python_client.parser.openapi import Endpoint
 
-def get_base_url_from_yaml(openapi_yaml):
-    with open(openapi_yaml, "r", encoding="utf-8") as file:
-        data = yaml.safe_load(file)
-    return data["servers"][0]["url"]
+try:
+    import black
+    import isort
+except ImportError:
+    black = isort = None
 
+LINE_LENGTH = 79
 
-api_dir = "./pachca-api-open-api-3-0-client/pachca_api_open_api_3_0_client/api"
-openapi_yaml = "openapi.yaml"
-endpoints, imports = get_all_api_functions_and_imports(api_dir)
-base_url = get_base_url_from_yaml(openapi_yaml)
+BASE_DIR = Path(__file__).resolve().parent
+# Отчет о запуске общий с generator2: его модуль импортируется из src.
+if str(BASE_DIR.parent) not in sys.path:
+    sys.path.append(str(BASE_DIR.parent))
 
-env = Environment(
-    loader=FileSystemLoader('templates'),
+from generator2.services.run_report import (  # noqa: E402
+    get_report,
+    start_report,  # noqa: F401 - импортируется из generator.py
 )
 
-client_template = env.get_template("client.py.jinja")
-
-client_path = (
-    "./pachca-api-open-api-3-0-client/pachca_api_open_api_3_0_client/client.py"
-)
-
-with open(client_path, mode='w', encoding="utf-8") as file:
-    unique_imports = list(set(imports))
-    models_imports = sorted(
-        [model for model in unique_imports if model.startswith(
-            'from .models',
-        )],
-    )
-    typing_imports = sorted(
-        [model for model in unique_imports if model.startswith(
-            'from typing import',
-        )],
+OPENAPI_YAML = BASE_DIR / "openapi.yaml"
+TEMPLATES_DIR = BASE_DIR / "templates"
+OUTPUT_DIR = BASE_DIR / "pachca-api-open-api-3-0-client"
+JINJA_CACHE_DIR = BASE_DIR / ".generator_cache" / "jinja"
+
+MODELS_IMPORT_PREFIX = "from ...models."
+TYPES_IMPORT_PREFIX = "from ...types import "
+
+STATIC_MODULES = {
+    "client_servis.py": "client_serv.py",
+    "logger_setup.py": "logger_setup.py",
+}
+
+# Таймаут запроса в секундах по методу HTTP, если у операции нет x-timeout.
+DEFAULT_TIMEOUTS = {
+    "get": 10.0,
+    "head": 10.0,
+    "delete": 15.0,
+    "put": 20.0,
+    "patch": 20.0,
+    "post": 30.0,
+}
+
+
+def format_code(source: str) -> str:
+    """Форматирует код в памяти через black и isort, без подпроцессов."""
+    if black is None:
+        return source
+    source = black.format_str(
+        source, mode=black.Mode(line_length=LINE_LENGTH),
     )
-    types_imports = sorted(
-        [model for model in unique_imports if model.startswith(
-            'from .types import',
-        )],
+    return isort.code(source, line_length=LINE_LENGTH)
+
+
+def collect_imports(
+    endpoints: Iterable[Endpoint],
+) -> tuple[list, list, list]:
+    """Собирает импорты эндпоинтов из данных парсера, без разбора кода.
+
+    Возвращает отсортированные списки: имена моделей, имена из модуля
+    types и прочие строки импорта.
+    """
+    models_imports = set()
+    types_imports = {"Response"}
+    other_imports = set()
+    for endpoint in endpoints:
+        for relative_import in endpoint.relative_imports:
+            if relative_import.startswith(MODELS_IMPORT_PREFIX):
+                models_imports.add(relative_import.split(" import ")[-1])
+            elif relative_import.startswith(TYPES_IMPORT_PREFIX):
+                types_imports.update(
+                    relative_import[len(TYPES_IMPORT_PREFIX):].split(", "),
+                )
+            else:
+                other_imports.add(relative_import)
+    return (
+        sorted(models_imports), sorted(types_imports), sorted(other_imports),
     )
-    other_imports = sorted(
-        list(
-            set(unique_imports) - set(typing_imports)
-            - set(types_imports) - set(models_imports),
-        ))
-    if models_imports:
-        models_imports_str = "from .models import (\n    " + ",\n    ".join(
-            [model.split('from .models import ')[-1] for model in models_imports]
-        ) + "\n)"
-        file.write(models_imports_str + "\n\n")
-    if typing_imports:
-        typing_imports_str = "from typing import (\n    " + ",\n    ".join(
-            [model.split('from typing import ')[-1] for model in typing_imports]
-        ) + "\n)"
-        file.write(typing_imports_str + "\n\n")
-    if types_imports:
-        types_imports_str = "from .types import (\n    " + ",\n    ".join(
-            [model.split('from .types import ')[-1] for model in types_imports]
-        ) + "\n)"
-        file.write(types_imports_str + "\n\n")
-    if other_imports:
-        file.write("\n".join(other_imports) + "\n\n")
-    file.write(client_template.render(endpoints=endpoints, base_url=base_url))
-
-cli_servis_path = (
-    "./pachca-api-open-api-3-0-client/"
-    "pachca_api_open_api_3_0_client/"
-    "client_serv.py"
-)
 
-logger_setup_path = (
-    "./pachca-api-open-api-3-0-client/"
-    "pachca_api_open_api_3_0_client/"
-    "logger_setup.py"
-)
-
-source_file_serv = os.path.join(
-    os.path.dirname(__file__),
-    "..",
-    "generator1",
-    "client_servis.py",
-)
-shutil.copy(source_file_serv, cli_servis_path)
 
-source_file_log = os.path.join(
-    os.path.dirname(__file__),
-    "..",
-    "generator1",
-    "logger_setup.py",
-)
-shutil.copy(source_file_log, logger_setup_path)
+def get_operation_timeouts(data: dict) -> dict[tuple[str, str], float]:
+    """Возвращает таймауты операций по (метод, путь).
 
-try:
-    subprocess.run(
-        [
-            "black",
-            "./pachca-api-open-api-3-0-client/pachca_api_open_api_3_0_client/"
-            "client.py",
-            "--line-length",
-            "79",
-        ],
-        check=True,
+    Таймаут - x-timeout операции в спецификации или таймаут метода HTTP
+    из DEFAULT_TIMEOUTS.
+    """
+    timeouts = {}
+    for path, path_item in data.get("paths", {}).items():
+        for method, operation in path_item.items():
+            if method in DEFAULT_TIMEOUTS:
+                timeouts[(method, path)] = float(
+                    operation.get("x-timeout", DEFAULT_TIMEOUTS[method]),
+                )
+    return timeouts
+
+
+class PachcaProject(Project):
+    """Проект openapi-python-client с рендерингом класса Pachca.
+
+    Класс Pachca рендерится напрямую из разобранных эндпоинтов за один
+    проход шаблона client.py.
+    """
+
+    def __init__(
+        self, *args: Any, operation_timeouts: dict = None, **kwargs: Any,
+    ) -> None:
+        """Проект с таймаутами операций operation_timeouts."""
+        super().__init__(*args, **kwargs)
+        self.operation_timeouts = operation_timeouts or {}
+        JINJA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        self.env.bytecode_cache = FileSystemBytecodeCache(
+            str(JINJA_CACHE_DIR),
+        )
+
+    def _build_api(self) -> None:
+        errors_path = self.package_dir / "errors.py"
+        errors_template = self.env.get_template("errors.py.jinja")
+        errors_path.write_text(
+            errors_template.render(), encoding=self.config.file_encoding,
+        )
+
+        endpoints = [
+            endpoint
+            for collection in self.openapi.endpoint_collections_by_tag.values()
+            for endpoint in collection.endpoints
+        ]
+        models_imports, types_imports, other_imports = collect_imports(
+            endpoints,
+        )
+        report = get_report()
+        report.count("operations", len(endpoints))
+        client_template = self.env.get_template("client.py.jinja")
+        with report.stage("render_client"):
+            client_source = client_template.render(
+                endpoints=endpoints,
+                models_imports=models_imports,
+                types_imports=types_imports,
+                other_imports=other_imports,
+                operation_timeouts=self.operation_timeouts,
+            )
+        with report.stage("format_client"):
+            client_source = format_code(client_source)
+        (self.package_dir / "client.py").write_text(
+            client_source, encoding=self.config.file_encoding,
+        )
+        report.count("bytes_written", len(client_source.encode()))
+
+        for source_name, target_name in STATIC_MODULES.items():
+            shutil.copy(BASE_DIR / source_name, self.package_dir / target_name)
+
+
+def generate_client() -> list:
+    """Генерирует клиент в процессе и возвращает ошибки генерации."""
+    config = Config.from_sources(
+        config_file=ConfigFile(post_hooks=[]),
+        meta_type=MetaType.POETRY,
+        document_source=OPENAPI_YAML,
+        file_encoding="utf-8",
+        overwrite=True,
+        output_path=OUTPUT_DIR,
     )
-    subprocess.run(
-        [
-            "isort",
-            "./pachca-api-open-api-3-0-client/pachca_api_open_api_3_0_client/"
-            "client.py",
-        ],
+    report = get_report()
+    with report.stage("load_spec"):
+        with open(OPENAPI_YAML, "r", encoding="utf-8") as file:
+            data = yaml.load(
+                file, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader),
+            )
+    with report.stage("parse"):
+        openapi = GeneratorData.from_dict(data, config=config)
+    if not isinstance(openapi, GeneratorData):
+        report.add_error(openapi.header)
+        return [openapi]
+    # models и enums - одноразовые генераторы, а project.build() читает их
+    # после подсчета, поэтому они сохраняются списками.
+    openapi.models = list(openapi.models)
+    openapi.enums = list(openapi.enums)
+    report.count("schemas", len(openapi.models) + len(openapi.enums))
+    project = PachcaProject(
+        openapi=openapi, config=config, custom_template_path=TEMPLATES_DIR,
+        operation_timeouts=get_operation_timeouts(data),
     )
-except subprocess.CalledProcessError as e:
-    print("Автолинтер не сработал!", e)
+    with report.stage("build"):
+        errors = list(project.build())
+    for error in errors:
+        report.add_error(f"{error.header}: {error.detail or ''}")
+    return errors
+
+
+if __name__ == "__main__":
+    for error in generate_client():
+        print(error.header, error.detail or "")
@@ -0,0 +1,105 @@
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from ..generator2_full.bot import Bot
+from ..generator2_full.concurrency import (
+    MAX_LIMIT,
+    AdaptiveLimiter,
+    AdaptiveTransport,
+)
+
+REQUESTS = 1000
+CAPACITY = 12
+LATENCY = 0.02
+RETRY_DELAY = 0.05
+FIXED = (2, 8, 32, 64)
+
+
+class FakeServer:
+    """Сервер без сети с ограниченной пропускной способностью.
+
+    capacity запросов обслуживаются за latency, дальше задержка растет
+    с очередью, а больше двух capacity одновременно получают 429.
+    """
+
+    def __init__(self, capacity: int, latency: float) -> None:
+        """Сервер на capacity запросов с задержкой latency."""
+        self.capacity = capacity
+        self.latency = latency
+        self.in_flight = 0
+        self.requests = 0
+        self.rejected = 0
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        """Отвечает на запрос с учетом текущей нагрузки."""
+        self.requests += 1
+        if self.in_flight >= self.capacity * 2:
+            self.rejected += 1
+            await asyncio.sleep(self.latency / 10)
+            return httpx.Response(429, json={'errors': []})
+        self.in_flight += 1
+        try:
+            await asyncio.sleep(
+                self.latency * max(1, self.in_flight / self.capacity),
+            )
+        finally:
+            self.in_flight -= 1
+        return httpx.Response(200, json={'data': {'id': 1, 'name': 'chat'}})
+
+
+async def sync_chats(bot: Bot, requests: int, concurrency: int) -> None:
+    """Пакетная загрузка бесед: повтор после 429, как у задач выгрузки."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def get_chat(chat_id: int) -> None:
+        """Загружает беседу, повторяя запрос после 429."""
+        while True:
+            async with semaphore:
+                response = await bot.get_chat(chat_id)
+            if hasattr(response, 'data'):
+                return
+            await asyncio.sleep(RETRY_DELAY)
+
+    await asyncio.gather(*(get_chat(index) for index in range(requests)))
+
+
+async def measure(
+    requests: int, capacity: int, concurrency: int = None,
+) -> tuple[float, FakeServer, dict]:
+    """Пропускная способность загрузки с лимитом concurrency.
+
+    Без concurrency используется AdaptiveLimiter.
+    """
+    server = FakeServer(capacity, LATENCY)
+    transport = httpx.MockTransport(server.handle)
+    limiter = None
+    if concurrency is None:
+        limiter = AdaptiveLimiter()
+        transport = AdaptiveTransport(limiter, transport)
+        concurrency = MAX_LIMIT
+    start = time.perf_counter()
+    await sync_chats(Bot('token', transport=transport), requests, concurrency)
+    elapsed = time.perf_counter() - start
+    return requests / elapsed, server, limiter and limiter.metrics()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Пакетная загрузка с фиксированной и адаптивной '
+                    '(AIMD) конкурентностью.')
+    parser.add_argument('--requests', type=int, default=REQUESTS)
+    parser.add_argument('--capacity', type=int, default=CAPACITY)
+    args = parser.parse_args()
+    for concurrency in (*FIXED, None):
+        throughput, server, metrics = asyncio.run(
+            measure(args.requests, args.capacity, concurrency),
+        )
+        name = f'fixed {concurrency}' if concurrency else 'adaptive'
+        line = (f'{name:<10}{throughput:>8.1f} req/s '
+                f'{server.rejected:>5} x 429')
+        if metrics:
+            line += f'  final limit {metrics["limit"]}'
+        print(line)
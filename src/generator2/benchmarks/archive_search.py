@@ -0,0 +1,89 @@
+import argparse
+import asyncio
+import random
+import time
+from collections.abc import Callable
+
+from ..generator2_full.archive import MessageArchive
+from ..generator2_full.models.models_response_getListMessageget200 import (
+    ResponseGetlistmessageGet200,
+)
+
+CHATS = 20
+MESSAGES = 5000
+SEARCHES = 200
+SYLLABLES = 'ка ро ли на те мо да ви се пу ло ре ма ни ко ту'.split()
+WORDS = (
+    'отчет продажи футболки релиз сборка дизайн встреча бюджет клиент '
+    'договор задача ревью деплой ошибка макет счет отпуск созвон план'
+).split()
+
+
+class FakeBot:
+    """Бот с историей сообщений в памяти вместо API."""
+
+    def __init__(self, chats: int, messages: int) -> None:
+        """История из chats бесед по messages сообщений в среднем."""
+        generator = random.Random(1)
+        vocabulary = WORDS + [
+            ''.join(generator.choices(SYLLABLES, k=3)) for _ in range(3000)
+        ]
+        self.history = {chat_id: [] for chat_id in range(1, chats + 1)}
+        for message_id in range(1, chats * messages + 1):
+            chat_id = generator.randint(1, chats)
+            self.history[chat_id].append({
+                'id': message_id,
+                'entity_id': chat_id,
+                'chat_id': chat_id,
+                'user_id': generator.randint(1, 50),
+                'content': ' '.join(generator.choices(vocabulary, k=12)),
+                'created_at': time.strftime(
+                    '%Y-%m-%dT%H:%M:%S.000Z',
+                    time.gmtime(1600000000 + message_id * 60),
+                ),
+            })
+        for messages_list in self.history.values():
+            messages_list.reverse()
+        self.requests = 0
+
+    async def get_list_message(
+        self, chat_id: int = None, per: int = None, page: int = None,
+    ) -> ResponseGetlistmessageGet200:
+        """Возвращает страницу сообщений беседы, новые первыми."""
+        self.requests += 1
+        messages = self.history[chat_id][(page - 1) * per:page * per]
+        return ResponseGetlistmessageGet200.model_validate({'data': messages})
+
+
+def measure(call: Callable[[], object], searches: int) -> float:
+    """Возвращает время одного поиска в миллисекундах."""
+    start = time.perf_counter()
+    for _ in range(searches):
+        call()
+    return (time.perf_counter() - start) / searches * 1e3
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Загрузка истории в архив и поиск по нему.')
+    parser.add_argument('--chats', type=int, default=CHATS)
+    parser.add_argument('--messages', type=int, default=MESSAGES,
+                        help='Сообщений на беседу в среднем.')
+    args = parser.parse_args()
+    bot = FakeBot(args.chats, args.messages)
+    archive = MessageArchive(bot)
+    chat_ids = list(bot.history)
+    start = time.perf_counter()
+    asyncio.run(archive.sync(chat_ids))
+    print(f'initial sync {time.perf_counter() - start:.2f} s, '
+          f'{bot.requests} requests, {archive.count()} messages')
+    bot.requests = 0
+    asyncio.run(archive.sync(chat_ids))
+    print(f'incremental sync without new messages: {bot.requests} requests')
+    for name, call in (
+        ('keyword', lambda: archive.search('бюджет договор')),
+        ('keyword + author', lambda: archive.search('релиз', user_id=7)),
+        ('author + date range', lambda: archive.search(
+            user_id=7, since='2020-10-01', until='2020-11-01')),
+    ):
+        print(f'{name:<24}{measure(call, SEARCHES):>8.2f} ms/search')
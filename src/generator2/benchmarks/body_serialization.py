@@ -0,0 +1,85 @@
+import argparse
+import time
+from collections.abc import Callable
+
+import httpx
+
+from ..generator2_full.constants import JSON_HEADERS, URL
+from ..generator2_full.fast_path import encode_request
+from ..generator2_full.models.models_reqBod_createMessage import (
+    Createmessage,
+)
+
+CALLS = 20000
+MESSAGE = {
+    'message': {
+        'entity_type': 'discussion',
+        'entity_id': 17579010,
+        'content': 'Вчера мы продали 756 футболок '
+                   '(что на 10% больше, чем в прошлое воскресенье)',
+        'buttons': [[{'text': 'Подробнее', 'url': 'https://example.com'}]],
+    },
+}
+
+
+def build_json_request(data: Createmessage) -> httpx.Request:
+    """Запрос, как его собирали раньше: dict pydantic и json httpx."""
+    return httpx.Request(
+        'POST', f'{URL}/messages', json=data.model_dump(),
+    )
+
+
+def build_content_request(data: Createmessage) -> httpx.Request:
+    """Запрос с телом, сериализованным pydantic сразу в JSON."""
+    return httpx.Request(
+        'POST', f'{URL}/messages',
+        content=data.model_dump_json(exclude_unset=True),
+        headers=JSON_HEADERS,
+    )
+
+
+def build_model_from_dict(data: dict) -> bytes:
+    """Тело из словаря через модель: создание и сериализация модели."""
+    return Createmessage.model_validate(data).model_dump_json(
+        exclude_unset=True,
+    ).encode()
+
+
+def build_fast_path_from_dict(data: dict) -> bytes:
+    """Тело из словаря через быстрый путь: проверка и сериализация."""
+    return encode_request(Createmessage, data)
+
+
+def measure(
+    build: Callable[[dict], object], data: dict, calls: int,
+) -> tuple[float, int]:
+    """Возвращает время сборки запроса и размер тела.
+
+    Процессорное время - в микросекундах, размер тела - в байтах.
+    """
+    body = build(data)
+    body_size = len(getattr(body, 'content', body))
+    start = time.process_time()
+    for _ in range(calls):
+        build(data)
+    return (time.process_time() - start) / calls * 1e6, body_size
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='CPU на сериализацию тела create_message.')
+    parser.add_argument('--calls', type=int, default=CALLS)
+    args = parser.parse_args()
+    message = Createmessage.model_validate(MESSAGE)
+    for name, build in (
+        ('json=model_dump()', build_json_request),
+        ('content=model_dump_json()', build_content_request),
+    ):
+        micros, body_size = measure(build, message, args.calls)
+        print(f'{name:<28}{micros:>8.2f} us/request {body_size:>6} bytes')
+    for name, build in (
+        ('dict -> model -> JSON', build_model_from_dict),
+        ('dict -> encode_request', build_fast_path_from_dict),
+    ):
+        micros, body_size = measure(build, MESSAGE, args.calls)
+        print(f'{name:<28}{micros:>8.2f} us/body    {body_size:>6} bytes')
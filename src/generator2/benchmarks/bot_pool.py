@@ -0,0 +1,56 @@
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from ..generator2_full.pool import STRATEGIES, BotPool
+
+REQUESTS = 400
+RATE = 20
+LATENCY = 0.02
+
+
+def create_transport(latency: float) -> httpx.MockTransport:
+    """Транспорт без сети, отвечающий с задержкой latency."""
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        return httpx.Response(200, json={'data': {'id': 1, 'name': 'chat'}})
+
+    return httpx.MockTransport(handle)
+
+
+async def measure(
+    tokens: int, strategy: str, requests: int, rate: float, latency: float,
+) -> tuple[float, dict]:
+    """Возвращает запросов в секунду и распределение по ботам."""
+    async with BotPool(
+        [f'token{index}' for index in range(tokens)],
+        strategy=strategy, rate=rate, burst=1,
+        transport=create_transport(latency),
+    ) as pool:
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            pool.get_bot(chat_id=index).get_chat(index)
+            for index in range(requests)
+        ))
+        elapsed = time.perf_counter() - start
+        return requests / elapsed, pool.stats()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Пропускная способность BotPool в зависимости от числа '
+                    'токенов при ограничении частоты на токен.')
+    parser.add_argument('--requests', type=int, default=REQUESTS)
+    parser.add_argument('--rate', type=float, default=RATE)
+    args = parser.parse_args()
+    for tokens in (1, 2, 4, 8):
+        for strategy in STRATEGIES:
+            throughput, stats = asyncio.run(measure(
+                tokens, strategy, args.requests, args.rate, LATENCY,
+            ))
+            spread = [bot['requests'] for bot in stats.values()]
+            print(f'{tokens} tokens {strategy:<13}{throughput:>8.1f} req/s '
+                  f'per bot {spread}')
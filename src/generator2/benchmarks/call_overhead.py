@@ -0,0 +1,108 @@
+import argparse
+import asyncio
+import marshal
+import time
+from typing import Any
+
+from ..generator2_full import request_methods
+from ..generator2_full.bot import Bot
+from ..generator2_full.models.models_reqBod_createMessage import (
+    Createmessage,
+)
+
+CALLS = 20000
+
+
+class FakeResponse:
+    """Ответ без тела.
+
+    Методы не валидируют модели, поэтому замеряется только собственный
+    код сгенерированного метода.
+    """
+
+    is_success = False
+    is_client_error = False
+    text = ''
+
+
+class FakeClient:
+    """Клиент без сети с интерфейсом httpx.AsyncClient."""
+
+    response = FakeResponse()
+
+    async def __aenter__(self) -> 'FakeClient':
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        return None
+
+    async def request(
+        self, method: str, url: str, **kwargs: Any,
+    ) -> FakeResponse:
+        """Возвращает ответ без тела на запрос любым методом."""
+        return self.response
+
+    async def get(self, url: str, **kwargs: Any) -> FakeResponse:
+        """Возвращает ответ без тела на GET запрос."""
+        return self.response
+
+    async def post(self, url: str, **kwargs: Any) -> FakeResponse:
+        """Возвращает ответ без тела на POST запрос."""
+        return self.response
+
+    async def put(self, url: str, **kwargs: Any) -> FakeResponse:
+        """Возвращает ответ без тела на PUT запрос."""
+        return self.response
+
+    async def delete(self, url: str, **kwargs: Any) -> FakeResponse:
+        """Возвращает ответ без тела на DELETE запрос."""
+        return self.response
+
+
+class BenchmarkBot(Bot):
+    """Бот, отправляющий запросы через FakeClient."""
+
+    client = FakeClient()
+
+    async def get_client(self) -> FakeClient:
+        """Возвращает общий клиент без сети."""
+        return self.client
+
+
+def get_bytecode_size() -> int:
+    """Возвращает размер байткода модуля request_methods."""
+    with open(request_methods.__file__, encoding='utf-8') as f:
+        code = compile(f.read(), request_methods.__file__, 'exec')
+    return len(marshal.dumps(code))
+
+
+async def measure_calls(calls: int) -> dict[str, float]:
+    """Возвращает время одного вызова метода в микросекундах."""
+    bot = BenchmarkBot('token')
+    message = Createmessage.model_validate(
+        {'message': {'entity_id': 1, 'content': 'text'}},
+    )
+    cases = {
+        'get_chat (path)': lambda: bot.get_chat(1),
+        'get_employees (query)': lambda: bot.get_employees(per=50, page=2),
+        'get_chats (sort)': lambda: bot.get_chats(sort='desc'),
+        'create_message (body)': lambda: bot.create_message(message),
+    }
+    results = {}
+    for name, call in cases.items():
+        await call()
+        start = time.perf_counter()
+        for _ in range(calls):
+            await call()
+        results[name] = (time.perf_counter() - start) / calls * 1e6
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Накладные расходы вызова сгенерированных методов.')
+    parser.add_argument('--calls', type=int, default=CALLS)
+    args = parser.parse_args()
+    print(f'request_methods bytecode: {get_bytecode_size()} bytes')
+    for name, micros in asyncio.run(measure_calls(args.calls)).items():
+        print(f'{name:<24}{micros:>8.2f} us/call')
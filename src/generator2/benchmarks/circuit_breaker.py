@@ -0,0 +1,76 @@
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from ..generator2_full.bot import Bot
+from ..generator2_full.circuit import CircuitBreakerTransport, CircuitOpen
+
+REQUESTS = 2000
+INTERVAL = 0.001
+TIMEOUT = 1.0
+SLOW = 0.2
+
+
+class FakeServer:
+    """Деградировавший сервер без сети: ответ 503 через timeout секунд."""
+
+    def __init__(self, timeout: float) -> None:
+        """Сервер, отвечающий через timeout секунд."""
+        self.timeout = timeout
+        self.requests = 0
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        """Отвечает 503 после таймаута."""
+        self.requests += 1
+        await asyncio.sleep(self.timeout)
+        return httpx.Response(503)
+
+
+async def measure(requests: int, breaker: bool) -> tuple[int, float, int]:
+    """Обработчики отправляют запрос каждые INTERVAL секунд.
+
+    API в это время не отвечает. Возвращает пик ожидающих запросов,
+    среднее время отказа и число запросов, дошедших до API.
+    """
+    server = FakeServer(TIMEOUT)
+    transport = httpx.MockTransport(server.handle)
+    if breaker:
+        transport = CircuitBreakerTransport(transport, slow_seconds=SLOW)
+    bot = Bot('token', transport=transport)
+    waiting = peak = 0
+    durations = []
+
+    async def handler(chat_id: int) -> None:
+        """Запрашивает беседу и записывает время ответа или отказа."""
+        nonlocal waiting, peak
+        waiting += 1
+        peak = max(peak, waiting)
+        start = time.perf_counter()
+        try:
+            await bot.get_chat(chat_id)
+        except CircuitOpen:
+            pass
+        durations.append(time.perf_counter() - start)
+        waiting -= 1
+
+    tasks = []
+    for index in range(requests):
+        tasks.append(asyncio.create_task(handler(index)))
+        await asyncio.sleep(INTERVAL)
+    await asyncio.gather(*tasks)
+    return peak, sum(durations) / len(durations), server.requests
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Обработчики при деградации API с circuit breaker и '
+                    'без него.')
+    parser.add_argument('--requests', type=int, default=REQUESTS)
+    args = parser.parse_args()
+    for breaker in (False, True):
+        peak, duration, sent = asyncio.run(measure(args.requests, breaker))
+        print(f'{"breaker" if breaker else "plain":<8}peak waiting {peak:>5}'
+              f'  mean failure {duration * 1e3:>7.1f} ms'
+              f'  reached API {sent}')
@@ -0,0 +1,121 @@
+import argparse
+import asyncio
+import time
+from collections.abc import Callable
+from typing import Any
+
+from ..generator2_full.directory import DirectoryMirror
+from ..generator2_full.models.models_response_getChatsget200 import (
+    ResponseGetchatsGet200,
+)
+from ..generator2_full.models.models_response_getEmployeesget200 import (
+    ResponseGetemployeesGet200,
+)
+from ..generator2_full.models.models_response_getTagsEmployeesget200 import (
+    ResponseGettagsemployeesGet200,
+)
+from ..generator2_full.models.models_response_getTagsget200 import (
+    ResponseGettagsGet200,
+)
+
+EMPLOYEES = 5000
+TAGS = 50
+CHATS = 500
+LOOKUPS = 20000
+
+
+def get_page(items: list, per: int, page: int) -> list:
+    """Возвращает страницу page списка по per элементов."""
+    return items[(page - 1) * per:page * per]
+
+
+class FakeBot:
+    """Бот со справочником в памяти вместо API."""
+
+    def __init__(self, employees: int, tags: int, chats: int) -> None:
+        """Справочник из employees сотрудников, tags тегов и chats бесед."""
+        self.employees = [
+            {'id': index, 'first_name': 'Имя', 'last_name': f'Фамилия{index}',
+             'nickname': f'user{index}', 'email': f'user{index}@example.com'}
+            for index in range(employees)
+        ]
+        self.tags = [
+            {'id': index, 'name': f'tag{index}', 'users_count': 0}
+            for index in range(tags)
+        ]
+        self.chats = [
+            {'id': index, 'name': f'chat{index}',
+             'member_ids': list(range(index, employees, chats))}
+            for index in range(chats)
+        ]
+        self.requests = 0
+
+    async def get_employees(
+        self, per: int = None, page: int = None,
+    ) -> ResponseGetemployeesGet200:
+        """Возвращает страницу сотрудников."""
+        self.requests += 1
+        return ResponseGetemployeesGet200.model_validate(
+            {'data': get_page(self.employees, per, page)},
+        )
+
+    async def get_tags(
+        self, per: int = None, page: int = None,
+    ) -> ResponseGettagsGet200:
+        """Возвращает страницу тегов."""
+        self.requests += 1
+        return ResponseGettagsGet200.model_validate(
+            {'data': get_page(self.tags, per, page)},
+        )
+
+    async def get_tags_employees(
+        self, tag_id: int, per: int = None, page: int = None,
+    ) -> ResponseGettagsemployeesGet200:
+        """Возвращает страницу сотрудников тега."""
+        self.requests += 1
+        members = self.employees[tag_id::len(self.tags)]
+        return ResponseGettagsemployeesGet200.model_validate(
+            {'data': get_page(members, per, page)},
+        )
+
+    async def get_chats(
+        self, per: int = None, page: int = None, **kwargs: Any,
+    ) -> ResponseGetchatsGet200:
+        """Возвращает страницу бесед."""
+        self.requests += 1
+        return ResponseGetchatsGet200.model_validate(
+            {'data': get_page(self.chats, per, page)},
+        )
+
+
+def measure(call: Callable[[int], object], lookups: int) -> float:
+    """Возвращает время одного запроса к копии в микросекундах."""
+    start = time.perf_counter()
+    for index in range(lookups):
+        call(index)
+    return (time.perf_counter() - start) / lookups * 1e6
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Загрузка справочника и поиск по локальной копии.')
+    parser.add_argument('--employees', type=int, default=EMPLOYEES)
+    parser.add_argument('--lookups', type=int, default=LOOKUPS)
+    args = parser.parse_args()
+    bot = FakeBot(args.employees, TAGS, CHATS)
+    mirror = DirectoryMirror(bot)
+    start = time.perf_counter()
+    counts = asyncio.run(mirror.sync())
+    print(f'sync {time.perf_counter() - start:.2f} s, '
+          f'{bot.requests} requests, {counts}')
+    employees = args.employees
+    for name, call in (
+        ('find_employee(email=)', lambda index: mirror.find_employee(
+            email=f'user{index % employees}@example.com')),
+        ('members_of_tag(tag_id)', lambda index: mirror.members_of_tag(
+            index % TAGS)),
+        ('chats_for_user(user_id)', lambda index: mirror.chats_for_user(
+            index % employees)),
+    ):
+        micros = measure(call, args.lookups)
+        print(f'{name:<24}{micros:>8.2f} us/lookup')
@@ -0,0 +1,87 @@
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+
+from ..generator2_full.bot import Bot
+from ..generator2_full.hedging import HedgingTransport
+
+REQUESTS = 2000
+CONCURRENCY = 20
+LATENCY = 0.01
+SLOW_LATENCY = 0.3
+SLOW_SHARE = 0.03
+
+
+class FakeServer:
+    """Сервер без сети с долей медленных ответов.
+
+    Доля slow_share ответов приходит за SLOW_LATENCY вместо LATENCY.
+    """
+
+    def __init__(self, slow_share: float) -> None:
+        """Сервер с долей медленных ответов slow_share."""
+        self.random = random.Random(1)
+        self.slow_share = slow_share
+        self.requests = 0
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        """Отвечает на запрос быстро или медленно."""
+        self.requests += 1
+        slow = self.random.random() < self.slow_share
+        await asyncio.sleep(SLOW_LATENCY if slow else LATENCY)
+        return httpx.Response(200, json={
+            'data': {'id': 1, 'entity_id': 1, 'content': ''},
+        })
+
+
+def percentile(latencies: list[float], share: float) -> float:
+    """Перцентиль share задержек в миллисекундах."""
+    return sorted(latencies)[int(len(latencies) * share)] * 1e3
+
+
+async def measure(
+    requests: int, slow_share: float, hedging: bool,
+) -> tuple[list[float], int, dict | None]:
+    """Задержки, число запросов к серверу и метрики хеджирования."""
+    server = FakeServer(slow_share)
+    transport = httpx.MockTransport(server.handle)
+    if hedging:
+        transport = HedgingTransport(['get_message'], transport)
+    bot = Bot('token', transport=transport)
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    latencies = []
+
+    async def get_message(message_id: int) -> None:
+        """Запрашивает сообщение и записывает задержку."""
+        async with semaphore:
+            start = time.perf_counter()
+            await bot.get_message(message_id)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(get_message(index) for index in range(requests)))
+    metrics = transport.metrics() if hedging else {}
+    return latencies, server.requests, metrics.get('get_message')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Задержки get_message с хеджированием и без при доле '
+                    'медленных ответов сервера.')
+    parser.add_argument('--requests', type=int, default=REQUESTS)
+    parser.add_argument('--slow-share', type=float, default=SLOW_SHARE)
+    args = parser.parse_args()
+    for hedging in (False, True):
+        latencies, sent, metrics = asyncio.run(
+            measure(args.requests, args.slow_share, hedging),
+        )
+        line = (f'{"hedging" if hedging else "plain":<8}'
+                f'p50 {percentile(latencies, 0.5):>6.1f} ms  '
+                f'p99 {percentile(latencies, 0.99):>6.1f} ms  '
+                f'extra requests {sent / args.requests - 1:>5.1%}')
+        if metrics:
+            line += (f'  hedged {metrics["hedged"]}, '
+                     f'won {metrics["hedge_wins"]}')
+        print(line)
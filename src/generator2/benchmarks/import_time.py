@@ -0,0 +1,59 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+from ..services.constants import BASE_DIR
+
+SRC_DIR = os.path.dirname(BASE_DIR)
+DEFAULT_MODULE = 'generator2.generator2_full.bot'
+MODELS_PACKAGE = 'generator2.generator2_full.models.'
+RUNS = 5
+
+
+def measure_import(module: str, statement: str = '') -> tuple[int, int]:
+    """Импортирует модуль в новом интерпретаторе с -X importtime.
+
+    Возвращает кумулятивное время импорта модуля в микросекундах и
+    количество загруженных модулей моделей.
+    """
+    code = f'import {module}\n{statement}'
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=SRC_DIR, capture_output=True, text=True, check=True,
+    )
+    total = 0
+    models = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not cumulative.strip().isdigit():
+            continue
+        name = name.strip()
+        if name.startswith(MODELS_PACKAGE):
+            models += 1
+        if name == module:
+            total = int(cumulative)
+    return total, models
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Время холодного импорта сгенерированного клиента.')
+    parser.add_argument('--module', default=DEFAULT_MODULE)
+    parser.add_argument(
+        '--statement', default='',
+        help='Код, выполняемый после импорта (например, обращение к модели).')
+    parser.add_argument('--runs', type=int, default=RUNS)
+    args = parser.parse_args()
+    results = [
+        measure_import(args.module, args.statement) for _ in range(args.runs)
+    ]
+    times = [total for total, _ in results]
+    print(
+        f'{args.module}: median {statistics.median(times) / 1000:.1f} ms, '
+        f'min {min(times) / 1000:.1f} ms, '
+        f'models modules loaded: {results[-1][1]}',
+    )
@@ -0,0 +1,82 @@
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from ..generator2_full.bot import Bot
+from ..generator2_full.membership import CHUNK_SIZE, MembershipSync, chunked
+
+MEMBERS = 5000
+JOINED = 200
+LEFT = 50
+LATENCY = 0.02
+
+
+class FakeServer:
+    """Сервер без сети с одной беседой.
+
+    Отвечает на get_chat и добавление участников, считает запросы и байты
+    тел запросов.
+    """
+
+    def __init__(self, members: int) -> None:
+        """Беседа с участниками от 1 до members."""
+        self.members = set(range(1, members + 1))
+        self.requests = 0
+        self.bytes = 0
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        """Возвращает беседу или добавляет участников."""
+        self.requests += 1
+        self.bytes += len(request.content)
+        await asyncio.sleep(LATENCY)
+        if request.method == 'GET':
+            return httpx.Response(200, json={'data': {
+                'id': 1, 'name': 'chat', 'member_ids': sorted(self.members),
+            }})
+        self.members.update(json.loads(request.content)['member_ids'])
+        return httpx.Response(201)
+
+
+async def measure(
+    members: int, joined: int, left: int, diff: bool,
+) -> tuple[int, int, float, int]:
+    """Приводит беседу к составу с новыми и ушедшими сотрудниками.
+
+    joined сотрудников добавляется, left уходит. Без diff отправляется
+    весь нужный состав пачками.
+    """
+    server = FakeServer(members)
+    bot = Bot('token', transport=httpx.MockTransport(server.handle))
+    desired = set(range(left + 1, members + joined + 1))
+    start = time.perf_counter()
+    if diff:
+        result = await MembershipSync(bot).sync_chat_members(1, desired)
+        added = len(result['added'])
+    else:
+        await asyncio.gather(*(
+            bot.post_members_to_chats({'member_ids': chunk}, 1)
+            for chunk in chunked(sorted(desired), CHUNK_SIZE)
+        ))
+        added = joined
+    elapsed = time.perf_counter() - start
+    return server.requests, server.bytes, elapsed, added
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Синхронизация участников беседы по разнице множеств '
+                    'и отправкой всего состава.')
+    parser.add_argument('--members', type=int, default=MEMBERS)
+    parser.add_argument('--joined', type=int, default=JOINED)
+    parser.add_argument('--left', type=int, default=LEFT)
+    args = parser.parse_args()
+    for diff in (False, True):
+        requests, sent, elapsed, added = asyncio.run(
+            measure(args.members, args.joined, args.left, diff),
+        )
+        print(f'{"diff" if diff else "full list":<10}{requests:>5} requests '
+              f'{sent / 1024:>8.1f} KiB sent  {elapsed:.2f} s  '
+              f'added {added}')
@@ -0,0 +1,80 @@
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from ..generator2_full.models.models_response_getListMessageget200 import (
+    ResponseGetlistmessageGet200,
+)
+
+MESSAGES = 100000
+RUNS = 3
+
+
+def get_backend() -> str:
+    """Возвращает бэкенд моделей ответов сгенерированного клиента."""
+    if hasattr(ResponseGetlistmessageGet200, '__dataclass_fields__'):
+        return 'dataclass'
+    return 'pydantic'
+
+
+def create_payload(messages: int) -> bytes:
+    """Возвращает ответ get_list_message с заданным числом сообщений."""
+    return json.dumps({'data': [
+        {
+            'id': 194275 + index,
+            'entity_type': 'discussion',
+            'entity_id': 334,
+            'chat_id': 334,
+            'content': 'Вчера мы продали 756 футболок',
+            'user_id': 12,
+            'created_at': '2021-08-28T15:56:53.000Z',
+            'files': [],
+            'buttons': [[{'text': 'Подробнее', 'url': 'https://example.com'}]],
+            'thread': None,
+            'forwarding': None,
+            'parent_message_id': None,
+        }
+        for index in range(messages)
+    ]}, ensure_ascii=False).encode()
+
+
+def measure_decode(payload: bytes, messages: int, runs: int) -> float:
+    """Возвращает лучшее время разбора одного сообщения в микросекундах."""
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        ResponseGetlistmessageGet200.model_validate_json(payload)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / messages * 1e6
+
+
+def measure_memory(payload: bytes, messages: int) -> float:
+    """Возвращает память разобранного ответа в байтах на сообщение."""
+    gc.collect()
+    tracemalloc.start()
+    response = ResponseGetlistmessageGet200.model_validate_json(payload)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del response
+    return size / messages
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Память и время разбора ответа со списком сообщений. '
+                    'Запустите после генерации с --models-backend pydantic '
+                    'и с --models-backend dataclass.')
+    parser.add_argument('--messages', type=int, default=MESSAGES)
+    parser.add_argument('--runs', type=int, default=RUNS)
+    args = parser.parse_args()
+    payload = create_payload(args.messages)
+    print(f'backend: {get_backend()}, payload: '
+          f'{len(payload) / args.messages:.0f} bytes/message')
+    print(f'decode {measure_decode(payload, args.messages, args.runs):>8.2f} '
+          'us/message')
+    print(f'memory {measure_memory(payload, args.messages):>8.0f} '
+          'bytes/message')
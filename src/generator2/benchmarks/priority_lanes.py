@@ -0,0 +1,87 @@
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from ..generator2_full.bot import Bot
+from ..generator2_full.priority import (
+    BULK_OPERATIONS,
+    PriorityScheduler,
+    PriorityTransport,
+)
+from ..generator2_full.rate_limit import TokenBucket
+
+BULK_REQUESTS = 600
+INTERACTIVE_REQUESTS = 40
+INTERACTIVE_INTERVAL = 0.1
+RATE = 100
+LATENCY = 0.02
+
+
+async def handle(request: httpx.Request) -> httpx.Response:
+    """Сервер без сети: отвечает через LATENCY секунд."""
+    await asyncio.sleep(LATENCY)
+    if request.method == 'POST':
+        return httpx.Response(201, json={
+            'data': {'id': 1, 'entity_id': 1, 'content': 'ok'},
+        })
+    return httpx.Response(200, json={'data': []})
+
+
+async def measure(
+    bulk: int, interactive: int, lanes: bool,
+) -> tuple[float, float, float]:
+    """Выгрузка bulk страниц и ответы пользователям.
+
+    Ответы отправляются каждые INTERACTIVE_INTERVAL секунд. Без lanes
+    все запросы идут одной очередью с теми же местами и ограничителем
+    частоты.
+    """
+    transport = PriorityTransport(
+        PriorityScheduler(limiter=TokenBucket(RATE, RATE / 10)),
+        httpx.MockTransport(handle),
+        bulk_operations=BULK_OPERATIONS if lanes else (),
+    )
+    bot = Bot('token', transport=transport)
+    latencies = []
+
+    async def reply() -> None:
+        """Отправляет ответ и записывает задержку."""
+        start = time.perf_counter()
+        await bot.create_message({'message': {
+            'entity_id': 1, 'content': 'ok',
+        }})
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    export = asyncio.gather(*(
+        bot.get_employees(per=50, page=page) for page in range(bulk)
+    ))
+    replies = []
+    for _ in range(interactive):
+        replies.append(asyncio.create_task(reply()))
+        await asyncio.sleep(INTERACTIVE_INTERVAL)
+    await asyncio.gather(export, *replies)
+    latencies.sort()
+    return (
+        latencies[len(latencies) // 2], latencies[-1],
+        time.perf_counter() - start,
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Задержка ответов пользователям во время выгрузки с '
+                    'приоритетами и с общей очередью.')
+    parser.add_argument('--bulk', type=int, default=BULK_REQUESTS)
+    parser.add_argument('--interactive', type=int,
+                        default=INTERACTIVE_REQUESTS)
+    args = parser.parse_args()
+    for lanes in (False, True):
+        median, worst, total = asyncio.run(
+            measure(args.bulk, args.interactive, lanes),
+        )
+        print(f'{"lanes" if lanes else "fifo":<6}reply p50 '
+              f'{median * 1e3:>7.1f} ms  max {worst * 1e3:>7.1f} ms  '
+              f'export {total:.2f} s')
@@ -0,0 +1,88 @@
+import argparse
+import multiprocessing
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from ..generator2_full.rate_limit import SharedTokenBucket, TokenBucket
+
+ACQUIRES = 20000
+WORKERS = (1, 4, 16)
+RATE = 20
+SECONDS = 2
+
+
+def acquire_cost(
+    directory: str, acquires: int, start: threading.Barrier,
+) -> float:
+    """Время одного try_acquire в микросекундах.
+
+    Запаса ограничителя хватает на все запросы.
+    """
+    limiter = SharedTokenBucket('token', 1e9, 1e9, directory)
+    start.wait()
+    begin = time.perf_counter()
+    for _ in range(acquires):
+        limiter.try_acquire()
+    elapsed = time.perf_counter() - begin
+    limiter.close()
+    return elapsed / acquires * 1e6
+
+
+def granted(
+    directory: str, rate: float, seconds: float, start: threading.Barrier,
+) -> int:
+    """Число запросов, разрешенных воркеру за seconds секунд."""
+    limiter = SharedTokenBucket('limited', rate, 1, directory)
+    start.wait()
+    deadline = time.monotonic() + seconds
+    count = 0
+    while time.monotonic() < deadline:
+        if not limiter.try_acquire():
+            count += 1
+        else:
+            time.sleep(0.001)
+    limiter.close()
+    return count
+
+
+def run(workers: int, target: Callable[..., Any], *args: Any) -> list:
+    """Запускает target в workers процессах с общим барьером старта."""
+    with multiprocessing.Manager() as manager:
+        start = manager.Barrier(workers)
+        with multiprocessing.Pool(workers) as pool:
+            return pool.starmap(target, [(*args, start)] * workers)
+
+
+def local_cost(acquires: int) -> float:
+    """Время одного try_acquire TokenBucket в микросекундах."""
+    limiter = TokenBucket(1e9, 1e9)
+    begin = time.perf_counter()
+    for _ in range(acquires):
+        limiter.try_acquire()
+    return (time.perf_counter() - begin) / acquires * 1e6
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Стоимость try_acquire общего для процессов '
+                    'ограничителя и соблюдение лимита под конкуренцией.')
+    parser.add_argument('--acquires', type=int, default=ACQUIRES)
+    parser.add_argument('--rate', type=float, default=RATE)
+    parser.add_argument('--seconds', type=float, default=SECONDS)
+    args = parser.parse_args()
+    print(f'TokenBucket in-process {local_cost(args.acquires):>8.2f} us')
+    for workers in WORKERS:
+        with tempfile.TemporaryDirectory() as directory:
+            costs = run(workers, acquire_cost, directory, args.acquires)
+        print(f'SharedTokenBucket {workers:>2} workers '
+              f'{sum(costs) / len(costs):>8.2f} us/acquire')
+    for workers in WORKERS:
+        with tempfile.TemporaryDirectory() as directory:
+            counts = run(
+                workers, granted, directory, args.rate, args.seconds,
+            )
+        print(f'{workers:>2} workers granted {sum(counts)} requests in '
+              f'{args.seconds:g} s, limit {args.rate * args.seconds + 1:g}')
@@ -0,0 +1,111 @@
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from collections.abc import AsyncIterator, Awaitable, Callable
+
+import httpx
+
+from ..generator2_full.bot import Bot
+
+EMPLOYEES = 20000
+CHUNK_EMPLOYEES = 50
+
+
+def create_employee(index: int) -> dict:
+    """Возвращает сотрудника в формате ответа API."""
+    return {
+        'id': index,
+        'first_name': 'Олег',
+        'last_name': 'Петров',
+        'nickname': f'user{index}',
+        'email': f'user{index}@example.com',
+        'phone_number': '+79001234567',
+        'department': 'Продукт',
+        'role': 'user',
+        'suspended': False,
+        'invite_status': 'confirmed',
+        'list_tags': ['Product', 'Design'],
+        'custom_properties': [],
+        'user_status': None,
+        'bot': False,
+        'created_at': '2020-06-08T09:32:57.000Z',
+    }
+
+
+async def generate_body(employees: int) -> AsyncIterator[bytes]:
+    """Отдает тело ответа частями, не держа весь ответ в памяти."""
+    yield b'{"data": ['
+    for start in range(0, employees, CHUNK_EMPLOYEES):
+        items = (
+            json.dumps(create_employee(index), ensure_ascii=False)
+            for index in range(start, min(start + CHUNK_EMPLOYEES, employees))
+        )
+        prefix = b',' if start else b''
+        yield prefix + ','.join(items).encode()
+    yield b']}'
+
+
+class BenchmarkBot(Bot):
+    """Бот с ответом get_employees из генератора вместо сети."""
+
+    employees = EMPLOYEES
+
+    async def get_client(self) -> httpx.AsyncClient:
+        """Возвращает клиент, отвечающий через handle."""
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            transport=httpx.MockTransport(self.handle),
+        )
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        """Отвечает списком сотрудников, который отдается частями."""
+        return httpx.Response(200, content=generate_body(self.employees))
+
+
+async def read_page(bot: BenchmarkBot) -> int:
+    """Читает список сотрудников одной моделью ответа."""
+    response = await bot.get_employees(per=bot.employees)
+    return len(response.data)
+
+
+async def read_stream(bot: BenchmarkBot) -> int:
+    """Читает список сотрудников потоком по одному."""
+    count = 0
+    async for _ in bot.iter_get_employees(per=bot.employees):
+        count += 1
+    return count
+
+
+def measure(
+    read: Callable[[BenchmarkBot], Awaitable[int]], bot: BenchmarkBot,
+) -> tuple[int, float, float]:
+    """Возвращает число сотрудников, время и пиковую память в МБ.
+
+    Память замеряется отдельным запуском: tracemalloc замедляет код.
+    """
+    start = time.perf_counter()
+    count = asyncio.run(read(bot))
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    asyncio.run(read(bot))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, elapsed, peak / 1024 / 1024
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Пиковая память get_employees и iter_get_employees.')
+    parser.add_argument('--employees', type=int, default=EMPLOYEES)
+    args = parser.parse_args()
+    bot = BenchmarkBot('token')
+    bot.employees = args.employees
+    for name, read in (
+        ('get_employees', read_page),
+        ('iter_get_employees', read_stream),
+    ):
+        count, elapsed, peak = measure(read, bot)
+        print(f'{name:<20}{count:>8} items {elapsed:>7.2f} s '
+              f'peak {peak:>8.1f} MB')
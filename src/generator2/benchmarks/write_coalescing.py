@@ -0,0 +1,85 @@
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from ..generator2_full.bot import Bot
+from ..generator2_full.coalesce import CoalescingTransport
+
+MESSAGES = 20
+EDITS = 50
+INTERVAL = 0.01
+LATENCY = 0.03
+
+
+class FakeServer:
+    """Сервер без сети, запоминающий последний текст каждого сообщения."""
+
+    def __init__(self) -> None:
+        """Сервер без сообщений."""
+        self.requests = 0
+        self.contents = {}
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        """Запоминает текст сообщения и возвращает его."""
+        self.requests += 1
+        await asyncio.sleep(LATENCY)
+        message = json.loads(request.content)['message']
+        self.contents[request.url.path] = message['content']
+        return httpx.Response(200, json={'data': {
+            'id': 1, 'entity_id': 1, 'content': message['content'],
+        }})
+
+
+async def measure(
+    messages: int, edits: int, coalescing: bool,
+) -> tuple[int, float, bool]:
+    """Каждое сообщение редактируется edits раз с интервалом INTERVAL.
+
+    Возвращает число запросов, время и совпадение итогового текста.
+    """
+    server = FakeServer()
+    transport = httpx.MockTransport(server.handle)
+    if coalescing:
+        transport = CoalescingTransport(transport=transport)
+    bot = Bot('token', transport=transport)
+
+    async def progress(message_id: int) -> str:
+        """Обновляет прогресс в сообщении и возвращает итоговый текст."""
+        calls = []
+        for step in range(1, edits + 1):
+            calls.append(asyncio.create_task(bot.edit_message(
+                {'message': {'content': f'{step}/{edits}'}}, message_id,
+            )))
+            await asyncio.sleep(INTERVAL)
+        results = await asyncio.gather(*calls)
+        return results[-1].data.content
+
+    start = time.perf_counter()
+    finals = await asyncio.gather(*(
+        progress(message_id) for message_id in range(messages)
+    ))
+    elapsed = time.perf_counter() - start
+    final = f'{edits}/{edits}'
+    correct = all(content == final for content in finals) and all(
+        content == final for content in server.contents.values()
+    )
+    return server.requests, elapsed, correct
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Число запросов edit_message для прогресс-сообщений '
+                    'со схлопыванием записей и без него.')
+    parser.add_argument('--messages', type=int, default=MESSAGES)
+    parser.add_argument('--edits', type=int, default=EDITS)
+    args = parser.parse_args()
+    for coalescing in (False, True):
+        requests, elapsed, correct = asyncio.run(
+            measure(args.messages, args.edits, coalescing),
+        )
+        print(f'{"coalescing" if coalescing else "plain":<11}'
+              f'{requests:>6} requests  {elapsed:.2f} s  '
+              f'final text {"ok" if correct else "WRONG"}')
@@ -1,9 +1,54 @@
-from .services.constants import ENUM_TYPES, PYTHON_TYPES
-from .services.file_writer import write_to_file
+import re
+
 from .schema_link_processor import (
+    get_component_name,
     load_schema,
     new_replace_ref_with_schema,
+    register_component,
+)
+from .services.constants import (
+    ENUM_TYPES,
+    MODELS_BACKENDS,
+    MODELS_BACKEND_DATACLASS,
+    MODELS_BACKEND_PYDANTIC,
+    PREFIX_REQUEST,
+    PYTHON_TYPES,
+    TYPED_DICT_KEEP_NAMES,
+    TYPED_DICT_SUFFIX,
 )
+from .services.file_writer import write_to_file
+from .services.run_report import get_report
+
+# Имена компонентов components/schemas для вложенных моделей:
+# (имя модуля, имя класса) -> имя компонента.
+COMPONENT_NAMES: dict[tuple[str, str], str] = {}
+
+# Бэкенд моделей ответов текущего запуска генератора.
+_MODELS_BACKEND = MODELS_BACKEND_PYDANTIC
+
+
+def set_models_backend(backend: str) -> None:
+    """Задает бэкенд моделей ответов: pydantic или dataclass."""
+    global _MODELS_BACKEND
+    if backend not in MODELS_BACKENDS:
+        raise ValueError(
+            f'Unknown models backend {backend!r}, '
+            f'expected one of {MODELS_BACKENDS}',
+        )
+    _MODELS_BACKEND = backend
+
+
+def get_models_backend() -> str:
+    """Возвращает бэкенд моделей ответов текущего запуска."""
+    return _MODELS_BACKEND
+
+
+def uses_structs(file_name: str) -> bool:
+    """Генерируются ли модели модуля как dataclass(slots=True)."""
+    return (
+        _MODELS_BACKEND == MODELS_BACKEND_DATACLASS
+        and not file_name.startswith(PREFIX_REQUEST)
+    )
 
 
 def check_error_field(model_name: str, field_name: str, field_type: str):
@@ -42,6 +87,74 @@ def create_model(name: str, fields: list) -> str:
     return model_code
 
 
+def create_struct(name: str, fields: list) -> str:
+    """Генерирует код компактной модели ответа на dataclass(slots=True).
+
+    Поля и описания те же, что у модели Pydantic, ключ JSON с дефисом
+    хранится в metadata поля (alias). Разбор JSON - в базовом классе Struct.
+    """
+    struct_code = (
+        '@dataclass(slots=True, kw_only=True)\n'
+        f'class {name}(Struct):\n'
+    )
+    for field in fields:
+        field_name = field[0].replace('-', '_')
+        field_type = check_error_field(name, field_name, field[1])
+        metadata = f'\'description\': \'{field[3]}\''
+        if field_name != field[0]:
+            metadata += f', \'alias\': \'{field[0]}\''
+        if field[2]:
+            struct_code += (
+                f'    {field_name}: {field_type} '
+                f'= field(metadata={{{metadata}}})\n'
+            )
+        else:
+            struct_code += (
+                f'    {field_name}: Optional[{field_type}] '
+                f'= field(default=None, metadata={{{metadata}}})\n'
+            )
+    return struct_code
+
+
+def create_typed_dict(name: str, fields: list, enums: list) -> str | None:
+    """Генерирует TypedDict с теми же полями, что и модель Pydantic.
+
+    Вложенные модели заменяются их TypedDict, Enum - Literal со значениями,
+    обязательные поля отмечаются Required. Для схем с ключами, которые
+    не являются идентификаторами (x-amz-date), возвращает None.
+    """
+    if not all(field[0].isidentifier() for field in fields):
+        return None
+    literals = {
+        f'enum_{enum_name}': 'Literal[{}]'.format(', '.join(
+            repr(value) for value in values
+        ))
+        for enum_name, _, values in enums
+    }
+
+    def replace_type(match: re.Match) -> str:
+        type_name = match.group(0)
+        if type_name in TYPED_DICT_KEEP_NAMES:
+            return type_name
+        if type_name in literals:
+            return literals[type_name]
+        return f'{type_name}{TYPED_DICT_SUFFIX}'
+
+    typed_dict_code = (
+        f'class {name}{TYPED_DICT_SUFFIX}(TypedDict, total=False):\n'
+    )
+    for field in fields:
+        field_type = re.sub(
+            r'\b\w+\b', replace_type, check_error_field(name, *field[:2]),
+        )
+        if field[2]:
+            field_type = f'Required[{field_type}]'
+        else:
+            field_type = f'Optional[{field_type}]'
+        typed_dict_code += f'    {field[0]}: {field_type}\n'
+    return typed_dict_code
+
+
 def create_enum(name: str, enum_type: str, fields: list):
     """Создает классы Enum."""
     enum_class_code = f'class enum_{name}({ENUM_TYPES.get(enum_type)}):\n'
@@ -54,8 +167,59 @@ def create_enum(name: str, enum_type: str, fields: list):
     return enum_class_code
 
 
+def resolve_component(property_schema: dict) -> tuple[dict, str | None]:
+    """Раскрывает ссылку схемы свойства и регистрирует ее компонент.
+
+    Возвращает схему свойства и имя компонента components/schemas, на
+    который ссылается свойство или элементы его массива (или None).
+    """
+    component_name = (
+        get_component_name(property_schema)
+        or get_component_name(property_schema.get('items'))
+    )
+    inner_body = new_replace_ref_with_schema(property_schema)
+    if component_name:
+        register_component(inner_body, component_name)
+    return inner_body, component_name
+
+
+def write_model(
+    file_name: str, name: str, properties: list, enums: list,
+) -> None:
+    """Записывает в буфер модель выбранного бэкенда и ее TypedDict.
+
+    TypedDict генерируется только для моделей запросов.
+    """
+    get_report().count('models')
+    if uses_structs(file_name):
+        model_code = create_struct(name, properties)
+    else:
+        model_code = create_model(name, properties)
+    write_to_file(file_name, model_code + '\n\n')
+    if not file_name.startswith(PREFIX_REQUEST):
+        return
+    typed_dict_code = create_typed_dict(name, properties, enums)
+    if typed_dict_code:
+        get_report().count('typed_dicts')
+        write_to_file(file_name, typed_dict_code + '\n\n')
+
+
+def get_list_type(name: str, inner_body: dict, inner_schema: dict) -> str:
+    """Возвращает тайпхинт List[...] свойства-массива name."""
+    list_type = inner_body.get("items").get("type")
+    list_type = PYTHON_TYPES.get(list_type, list_type)
+    if list_type is None:
+        list_type = next(iter(inner_schema.keys())).capitalize()
+    if list_type == 'object' or list_type == 'array':
+        list_type = name.capitalize()
+    if inner_body.get("items").get("items"):
+        list_type = f'List[{list_type}]'
+    return f'List[{list_type}]'
+
+
 def look_into_schema_new(schema: dict, file_name: str):
     """Разбирает схемы и вызывает генерацию моделей."""
+    get_report().count('schemas')
     schema = new_replace_ref_with_schema(schema)
     list_of_properties = []
     nested_properties = []
@@ -69,7 +233,9 @@ def look_into_schema_new(schema: dict, file_name: str):
             'items',{}).get('items', {}).get('properties'))
     required_properties = schema.get(upper_schema_name).get('required', [])
     for property in inner_schema:
-        inner_body = new_replace_ref_with_schema(inner_schema.get(property))
+        inner_body, component_name = resolve_component(
+            inner_schema.get(property),
+        )
         if 'enum' in inner_body:
             enum_properties.append(
                 (property, inner_body.get('type'),  inner_body['enum']),
@@ -92,15 +258,7 @@ def look_into_schema_new(schema: dict, file_name: str):
         if property_type == 'object':
             property_type = property.capitalize()
         if property_type == 'array':
-            list_type = inner_body.get("items").get("type")
-            list_type = PYTHON_TYPES.get(list_type, list_type)
-            if list_type is None:
-                list_type = next(iter(inner_schema.keys())).capitalize()
-            if list_type == 'object' or list_type == 'array':
-                list_type = property.capitalize()
-            if inner_body.get("items").get("items"):
-                list_type = f'List[{list_type}]'
-            property_type = (f'List[{list_type}]')
+            property_type = get_list_type(property, inner_body, inner_schema)
         if property_type == 'Payload':
             property_type = 'Dict'
         list_of_properties.append(
@@ -119,6 +277,10 @@ def look_into_schema_new(schema: dict, file_name: str):
            or inner_body.get('items', {}).get('$ref')
            or inner_body.get('items', {}).get('items')):
             nested_properties.append(property)
+            if component_name:
+                COMPONENT_NAMES.setdefault(
+                    (file_name, property.capitalize()), component_name,
+                )
 
     for nested in nested_properties:
         nested_obj = new_replace_ref_with_schema(inner_schema)
@@ -132,6 +294,7 @@ def look_into_schema_new(schema: dict, file_name: str):
 
     for enum_class in enum_properties:
         write_to_file(file_name, create_enum(*enum_class) + '\n\n')
-    write_to_file(
-        file_name,
-        create_model(upper_schema_name, list_of_properties) + '\n\n')
+    get_report().count('enums', len(enum_properties))
+    write_model(
+        file_name, upper_schema_name, list_of_properties, enum_properties,
+    )
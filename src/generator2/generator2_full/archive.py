@@ -0,0 +1,232 @@
+import asyncio
+import json
+import sqlite3
+import time
+from typing import Any
+
+from .directory import dump_item
+from .logger_setup import setup_logging
+from .priority import PRIORITY_BULK, priority
+
+PER_PAGE = 50
+CONCURRENCY = 4
+SEARCH_LIMIT = 100
+
+logger = setup_logging('archive')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    chat_id INTEGER NOT NULL,
+    user_id INTEGER,
+    created_at TEXT,
+    content TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_chat ON messages (chat_id, id);
+CREATE INDEX IF NOT EXISTS messages_user ON messages (user_id, id);
+CREATE INDEX IF NOT EXISTS messages_created ON messages (created_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    content,
+    content='messages',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS messages_insert AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, content)
+        VALUES (new.id, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_delete AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, content)
+        VALUES ('delete', old.id, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_update AFTER UPDATE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, content)
+        VALUES ('delete', old.id, old.content);
+    INSERT INTO messages_fts (rowid, content)
+        VALUES (new.id, new.content);
+END;
+CREATE TABLE IF NOT EXISTS chat_cursors (
+    chat_id INTEGER PRIMARY KEY,
+    newest_id INTEGER NOT NULL
+);
+"""
+
+
+class ArchiveSyncError(Exception):
+    """API вернул ошибку или пустой ответ при загрузке сообщений."""
+
+
+class MessageArchive:
+    """Локальный архив сообщений с полнотекстовым индексом SQLite FTS5.
+
+    sync_chat загружает из get_list_message только сообщения новее
+    сохраненного курсора (идентификатора последнего сообщения беседы):
+    API отдает сообщения от новых к старым, поэтому загрузка
+    останавливается на первой странице с уже известным сообщением.
+    Сообщения, полученные клиентом другим способом, добавляются через
+    add_messages. Изменения старых сообщений (edit_message) архив не
+    видит, пока сообщение не будет добавлено заново. Запись в SQLite и
+    индекс FTS5 идет в потоке (asyncio.to_thread) и не блокирует event
+    loop. search ищет по словам, автору, беседе и периоду без запросов
+    к API.
+    """
+
+    def __init__(
+        self,
+        bot: Any,
+        path: str = ':memory:',
+        per: int = PER_PAGE,
+        concurrency: int = CONCURRENCY,
+    ) -> None:
+        """Архив сообщений бота bot в базе SQLite path."""
+        self.bot = bot
+        self.per = per
+        self.semaphore = asyncio.Semaphore(concurrency)
+        # Транзакции записи выполняются по одной в потоке пула
+        # asyncio.to_thread.
+        self.write_lock = asyncio.Lock()
+        self.connection = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False,
+        )
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Закрывает базу SQLite."""
+        self.connection.close()
+
+    def get_cursor(self, chat_id: int) -> int | None:
+        """Возвращает идентификатор последнего сохраненного сообщения."""
+        row = self.connection.execute(
+            'SELECT newest_id FROM chat_cursors WHERE chat_id = ?',
+            (chat_id,),
+        ).fetchone()
+        return row[0] if row else None
+
+    async def add_messages(self, messages: list) -> None:
+        """Сохраняет сообщения (модели ответов API) в архив.
+
+        Курсоры бесед сдвигаются на самые новые сохраненные сообщения.
+        """
+        if not messages:
+            return
+        async with self.write_lock:
+            await asyncio.to_thread(self.store, messages)
+
+    def store(self, messages: list) -> None:
+        """Записывает сообщения и курсоры бесед одной транзакцией."""
+        with self.connection:
+            self.connection.execute('BEGIN')
+            self.connection.executemany(
+                'INSERT INTO messages '
+                '(id, chat_id, user_id, created_at, content, data) '
+                'VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (id) DO UPDATE SET '
+                'content = excluded.content, data = excluded.data '
+                'WHERE content IS NOT excluded.content',
+                (
+                    (
+                        message.id, message.chat_id, message.user_id,
+                        message.created_at, message.content,
+                        dump_item(message),
+                    )
+                    for message in messages
+                ),
+            )
+            newest = {}
+            for message in messages:
+                if message.id > newest.get(message.chat_id, 0):
+                    newest[message.chat_id] = message.id
+            self.connection.executemany(
+                'INSERT INTO chat_cursors (chat_id, newest_id) VALUES (?, ?) '
+                'ON CONFLICT (chat_id) DO UPDATE SET newest_id = '
+                'max(newest_id, excluded.newest_id)',
+                newest.items(),
+            )
+
+    async def sync_chat(self, chat_id: int) -> int:
+        """Загружает новые сообщения беседы и возвращает их количество."""
+        newest_id = self.get_cursor(chat_id)
+        messages = []
+        page = 1
+        while True:
+            with priority(PRIORITY_BULK):
+                async with self.semaphore:
+                    response = await self.bot.get_list_message(
+                        chat_id=chat_id, per=self.per, page=page,
+                    )
+            if response is None or not hasattr(response, 'data'):
+                raise ArchiveSyncError(
+                    f'get_list_message failed for chat {chat_id}: {response}',
+                )
+            data = response.data or []
+            fresh = [
+                message for message in data
+                if newest_id is None or message.id > newest_id
+            ]
+            messages.extend(fresh)
+            if len(fresh) < len(data) or len(data) < self.per:
+                break
+            page += 1
+        await self.add_messages(messages)
+        return len(messages)
+
+    async def sync(self, chat_ids: list[int]) -> dict[int, int]:
+        """Параллельно обновляет архив бесед.
+
+        Одновременно идет не больше concurrency запросов. Возвращает число
+        новых сообщений по беседам.
+        """
+        start = time.perf_counter()
+        counts = await asyncio.gather(*(
+            self.sync_chat(chat_id) for chat_id in chat_ids
+        ))
+        logger.debug(
+            f'Archive synced in {time.perf_counter() - start:.3f}s: '
+            f'{sum(counts)} new messages in {len(chat_ids)} chats',
+        )
+        return dict(zip(chat_ids, counts))
+
+    def search(
+        self,
+        query: str = None,
+        user_id: int = None,
+        chat_id: int = None,
+        since: str = None,
+        until: str = None,
+        limit: int = SEARCH_LIMIT,
+    ) -> list[dict]:
+        """Ищет сообщения, новые (с большим идентификатором) первыми.
+
+        query - запрос FTS5 (слова, "фраза", префикс*, OR, NOT), since и
+        until - границы created_at в ISO-8601 (until не включается).
+        """
+        conditions = []
+        parameters = []
+        if query is not None:
+            conditions.append(
+                'id IN (SELECT rowid FROM messages_fts '
+                'WHERE messages_fts MATCH ?)',
+            )
+            parameters.append(query)
+        for condition, value in (
+            ('user_id = ?', user_id),
+            ('chat_id = ?', chat_id),
+            ('created_at >= ?', since),
+            ('created_at < ?', until),
+        ):
+            if value is not None:
+                conditions.append(condition)
+                parameters.append(value)
+        where = f'WHERE {" AND ".join(conditions)} ' if conditions else ''
+        rows = self.connection.execute(
+            f'SELECT data FROM messages {where}'
+            'ORDER BY id DESC LIMIT ?',
+            (*parameters, limit),
+        )
+        return [json.loads(row[0]) for row in rows]
+
+    def count(self) -> int:
+        """Возвращает число сообщений в архиве."""
+        return self.connection.execute(
+            'SELECT count(*) FROM messages',
+        ).fetchone()[0]
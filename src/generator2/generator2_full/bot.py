@@ -2,19 +2,35 @@ import httpx
 
 from .constants import PARAM_NAME_SORT, PARAM_NAME_SORT_FIELD, TOKEN_TYPE, URL
 from .request_methods import RequestMethods
+from .transport import TransportLayer
 
 
 class Bot(RequestMethods):
     base_url = URL
     token_type = TOKEN_TYPE
 
-    def __init__(self, token):
+    def __init__(
+        self, token: str, transport: httpx.AsyncBaseTransport = None,
+    ) -> None:
+        """Бот с токеном token, отправляющий запросы через transport.
+
+        Транспорт httpx, который не является TransportLayer, оборачивается
+        в TransportLayer: иначе async with client в методах закрыл бы его
+        после первого запроса. Его пул соединений закрывает
+        bot.transport.close().
+        """
         self.token = f'{self.token_type} {token}'
+        if transport is not None and not isinstance(
+            transport, TransportLayer,
+        ):
+            transport = TransportLayer(transport)
+        self.transport = transport
 
     async def get_client(self):
         return httpx.AsyncClient(
             base_url=self.base_url,
             headers={'Authorization': self.token},
+            transport=self.transport,
         )
 
     async def format_url(
@@ -0,0 +1,233 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any
+
+import httpx
+
+from .concurrency import OVERLOAD_STATUSES
+from .logger_setup import setup_logging
+from .transport import TransportLayer, get_operation
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+# Доля ошибок среди последних WINDOW запросов, открывающая цепь.
+FAILURE_RATE = 0.5
+WINDOW = 50
+# Меньше запросов в окне - слишком мало данных для решения.
+MIN_REQUESTS = 10
+# Сколько секунд цепь открыта до пробных запросов.
+OPEN_SECONDS = 10
+HALF_OPEN_REQUESTS = 3
+
+logger = setup_logging('circuit')
+
+
+class CircuitOpen(Exception):
+    """Цепь операции открыта: запрос отклонен без обращения к API."""
+
+    def __init__(self, operation: str, retry_after: float) -> None:
+        """Отказ операции operation, повтор через retry_after секунд."""
+        self.operation = operation
+        self.retry_after = retry_after
+        super().__init__(
+            f'Circuit for {operation} is open, retry in {retry_after:.1f}s',
+        )
+
+
+class CircuitBreaker:
+    """Состояние цепи одной операции.
+
+    closed: запросы идут в API, результаты последних window запросов
+    копятся в окне; при доле ошибок от failure_rate (ошибки - 429, 5xx,
+    ошибки транспорта и запросы дольше slow_seconds, которые считаются
+    ошибкой сразу по истечении slow_seconds) цепь открывается.
+    open: запросы сразу получают CircuitOpen, через open_seconds цепь
+    переходит в half_open и пропускает half_open_requests пробных
+    запросов: все успешные закрывают цепь, любая ошибка снова открывает.
+    Каждая смена состояния начинает новое поколение: before_request
+    возвращает поколение запроса, и record не учитывает результаты
+    запросов прошлых поколений (например, ответ на запрос из closed,
+    пришедший в half_open, не считается пробным).
+    """
+
+    def __init__(
+        self,
+        operation: str,
+        failure_rate: float = FAILURE_RATE,
+        window: int = WINDOW,
+        min_requests: int = MIN_REQUESTS,
+        open_seconds: float = OPEN_SECONDS,
+        half_open_requests: int = HALF_OPEN_REQUESTS,
+        slow_seconds: float = None,
+    ) -> None:
+        """Закрытая цепь операции operation."""
+        self.operation = operation
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.open_seconds = open_seconds
+        self.half_open_requests = half_open_requests
+        self.slow_seconds = slow_seconds
+        self.state = STATE_CLOSED
+        self.outcomes = deque(maxlen=window)
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probes = 0
+        self.probe_successes = 0
+        self.generation = 0
+        self.requests = 0
+        self.rejected = 0
+        self.opened = 0
+
+    def set_state(self, state: str) -> None:
+        """Переводит цепь в состояние state и начинает новое поколение."""
+        logger.warning(f'Circuit {self.operation}: {self.state} -> {state}')
+        self.state = state
+        self.generation += 1
+        self.outcomes.clear()
+        self.failures = 0
+        self.probes = 0
+        self.probe_successes = 0
+        if state == STATE_OPEN:
+            self.opened_at = time.monotonic()
+            self.opened += 1
+
+    def before_request(self) -> int:
+        """Пропускает запрос и возвращает его поколение.
+
+        При открытой цепи вызывает CircuitOpen.
+        """
+        if self.state == STATE_OPEN:
+            retry_after = self.opened_at + self.open_seconds - time.monotonic()
+            if retry_after > 0:
+                self.rejected += 1
+                raise CircuitOpen(self.operation, retry_after)
+            self.set_state(STATE_HALF_OPEN)
+        if self.state == STATE_HALF_OPEN:
+            if self.probes >= self.half_open_requests:
+                self.rejected += 1
+                raise CircuitOpen(self.operation, 0)
+            self.probes += 1
+        self.requests += 1
+        return self.generation
+
+    def record(self, failed: bool, generation: int) -> None:
+        """Учитывает результат запроса поколения generation."""
+        if generation != self.generation:
+            return
+        if self.state == STATE_HALF_OPEN:
+            if failed:
+                self.set_state(STATE_OPEN)
+                return
+            self.probe_successes += 1
+            if self.probe_successes >= self.half_open_requests:
+                self.set_state(STATE_CLOSED)
+            return
+        if self.state != STATE_CLOSED:
+            return
+        if len(self.outcomes) == self.outcomes.maxlen:
+            self.failures -= self.outcomes[0]
+        self.outcomes.append(failed)
+        self.failures += failed
+        if (
+            len(self.outcomes) >= self.min_requests
+            and self.failures >= len(self.outcomes) * self.failure_rate
+        ):
+            self.set_state(STATE_OPEN)
+
+    def cancel(self, generation: int) -> None:
+        """Освобождает место пробного запроса, который был отменен."""
+        if generation == self.generation and self.state == STATE_HALF_OPEN:
+            self.probes -= 1
+
+    def metrics(self) -> dict:
+        """Состояние, доля ошибок и счетчики цепи."""
+        return {
+            'state': self.state,
+            'failure_rate': round(
+                self.failures / len(self.outcomes), 3,
+            ) if self.outcomes else 0.0,
+            'requests': self.requests,
+            'rejected': self.rejected,
+            'opened': self.opened,
+        }
+
+
+class CircuitBreakerTransport(TransportLayer):
+    """Слой транспорта с цепью CircuitBreaker на каждую операцию бота.
+
+    При открытой цепи методы бота сразу вызывают CircuitOpen, а не ждут
+    таймаута деградировавшего API. Параметры передаются каждой
+    CircuitBreaker, metrics() показывает состояние цепей для мониторинга.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport = None,
+        **breaker_options: Any,
+    ) -> None:
+        """Слой поверх transport с параметрами цепей breaker_options."""
+        super().__init__(transport)
+        self.breaker_options = breaker_options
+        self.breakers: dict[str, CircuitBreaker] = {}
+
+    def get_breaker(self, operation: str) -> CircuitBreaker:
+        """Возвращает цепь операции operation, создавая ее."""
+        breaker = self.breakers.get(operation)
+        if breaker is None:
+            breaker = self.breakers[operation] = CircuitBreaker(
+                operation, **self.breaker_options,
+            )
+        return breaker
+
+    async def handle_async_request(
+        self, request: httpx.Request,
+    ) -> httpx.Response:
+        """Отправляет запрос, если цепь операции его пропускает."""
+        breaker = self.get_breaker(get_operation(request))
+        generation = breaker.before_request()
+        slow = []
+        timer = None
+        if breaker.slow_seconds is not None:
+            timer = asyncio.get_running_loop().call_later(
+                breaker.slow_seconds, self.record_slow, breaker, slow,
+                generation,
+            )
+        try:
+            response = await self.transport.handle_async_request(request)
+        except asyncio.CancelledError:
+            if not slow:
+                breaker.cancel(generation)
+            raise
+        except Exception:
+            if not slow:
+                breaker.record(True, generation)
+            raise
+        finally:
+            if timer is not None:
+                timer.cancel()
+        if not slow:
+            breaker.record(
+                response.status_code in OVERLOAD_STATUSES, generation,
+            )
+        return response
+
+    @staticmethod
+    def record_slow(
+        breaker: CircuitBreaker, slow: list, generation: int,
+    ) -> None:
+        """Считает ошибкой запрос дольше slow_seconds.
+
+        Запрос не дожидается завершения: цепь открывается, пока медленные
+        запросы еще висят.
+        """
+        slow.append(True)
+        breaker.record(True, generation)
+
+    def metrics(self) -> dict[str, dict]:
+        """Состояние, доля ошибок и счетчики цепей по операциям."""
+        return {
+            operation: breaker.metrics()
+            for operation, breaker in self.breakers.items()
+        }
@@ -0,0 +1,126 @@
+import asyncio
+from collections.abc import Iterable
+
+import httpx
+
+from .transport import TransportLayer, get_operation
+
+# Операции "установить значение": важно только последнее значение.
+COALESCED_OPERATIONS = frozenset(('edit_message', 'put_status'))
+# Не чаще одного запроса к одной цели за WINDOW секунд.
+WINDOW = 0.5
+
+
+class PendingWrite:
+    """Еще не отправленная запись: последний запрос и общий результат."""
+
+    __slots__ = ('request', 'future')
+
+    def __init__(
+        self, request: httpx.Request, future: asyncio.Future,
+    ) -> None:
+        """Запись запроса request с результатом future."""
+        self.request = request
+        self.future = future
+
+
+class CoalescingTransport(TransportLayer):
+    """Схлопывание частых записей в одну цель.
+
+    Цель - например, edit_message одного сообщения или put_status.
+    Первая запись уходит сразу, следующие записи в ту же цель (операция и
+    URL) не раньше чем через window секунд после предыдущей отправки; пока
+    запись ждет, новые записи заменяют ее тело. Все вызовы, чьи записи
+    схлопнулись, получают ответ на отправленную последнюю запись.
+    Записи одной цели отправляются строго по очереди, отмена вызова не
+    отменяет общую запись.
+    """
+
+    def __init__(
+        self,
+        operations: Iterable[str] = COALESCED_OPERATIONS,
+        transport: httpx.AsyncBaseTransport = None,
+        window: float = WINDOW,
+    ) -> None:
+        """Слой поверх transport, схлопывающий записи operations."""
+        super().__init__(transport)
+        self.operations = frozenset(operations)
+        self.window = window
+        self.pending: dict[tuple, PendingWrite] = {}
+        self.locks: dict[tuple, asyncio.Lock] = {}
+        self.tasks = set()
+        self.writes = 0
+        self.sent = 0
+
+    async def handle_async_request(
+        self, request: httpx.Request,
+    ) -> httpx.Response:
+        """Отправляет запрос или присоединяет его к ожидающей записи."""
+        operation = get_operation(request)
+        if operation not in self.operations:
+            return await self.transport.handle_async_request(request)
+        self.writes += 1
+        key = (operation, str(request.url))
+        pending = self.pending.get(key)
+        if pending is None:
+            future = asyncio.get_running_loop().create_future()
+            future.add_done_callback(
+                lambda future: future.cancelled() or future.exception(),
+            )
+            pending = self.pending[key] = PendingWrite(request, future)
+            task = asyncio.ensure_future(self.flush(key))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+        else:
+            pending.request = request
+        status_code, headers, content = await asyncio.shield(pending.future)
+        return httpx.Response(
+            status_code, headers=headers, content=content, request=request,
+        )
+
+    async def flush(self, key: tuple) -> None:
+        """Отправляет ожидающую запись цели после предыдущей.
+
+        Очередь цели держится еще window секунд после отправки.
+        """
+        lock = self.locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            pending = self.pending.pop(key)
+            self.sent += 1
+            try:
+                response = await self.transport.handle_async_request(
+                    pending.request,
+                )
+                try:
+                    content = b''.join([
+                        chunk async for chunk in response.stream
+                    ])
+                finally:
+                    await response.aclose()
+            except asyncio.CancelledError:
+                pending.future.cancel()
+                raise
+            except Exception as error:
+                pending.future.set_exception(error)
+            else:
+                pending.future.set_result(
+                    (response.status_code, response.headers, content),
+                )
+            await asyncio.sleep(self.window)
+        if key not in self.pending:
+            del self.locks[key]
+
+    def metrics(self) -> dict:
+        """Записи, отправленные запросы и ожидающие цели."""
+        return {
+            'writes': self.writes,
+            'sent': self.sent,
+            'coalesced': self.writes - self.sent - len(self.pending),
+            'pending': len(self.pending),
+        }
+
+    async def close(self) -> None:
+        """Дожидается отправки ожидающих записей и закрывает транспорт."""
+        while self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+        await super().close()
@@ -0,0 +1,193 @@
+import asyncio
+import contextlib
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+
+import httpx
+
+from .logger_setup import setup_logging
+from .transport import TransportLayer
+
+INITIAL_LIMIT = 4
+MIN_LIMIT = 1
+MAX_LIMIT = 64
+# Прибавка к лимиту за каждые limit успешных запросов.
+INCREASE = 1
+# Во сколько раз уменьшается лимит при перегрузке.
+DECREASE = 0.5
+# Всплеск задержки: больше LATENCY_FACTOR базовых задержек.
+LATENCY_FACTOR = 2
+# Скорость сглаживания базовой задержки.
+SMOOTHING = 0.1
+OVERLOAD_STATUSES = frozenset((429, 500, 502, 503, 504))
+# Исключения, которые считаются перегрузкой: ошибки сети и таймауты.
+# Прочие исключения (ошибки проверки данных и т. п.) лимит не меняют.
+OVERLOAD_EXCEPTIONS = (httpx.TransportError, TimeoutError)
+
+logger = setup_logging('concurrency')
+
+
+class AdaptiveLimiter:
+    """Адаптивный лимит одновременных запросов (AIMD).
+
+    Пока ответы приходят без ошибок и без всплесков задержки, лимит
+    растет на increase за каждые limit запросов (примерно на increase за
+    время ответа), а при 429, 5xx, таймауте или задержке больше
+    latency_factor базовых уменьшается в decrease раз. Прочие исключения
+    (например, ошибки проверки данных) лимит не меняют. Уменьшение
+    срабатывает один раз на волну перегрузки: ответы на запросы, начатые
+    до предыдущего уменьшения, его не повторяют. Базовая задержка -
+    сглаженная задержка успешных ответов без всплесков.
+
+    Используется как async with limiter.slot() (обратная связь по
+    задержке и исключениям) или через AdaptiveTransport (еще и по
+    статусу ответа).
+    """
+
+    def __init__(
+        self,
+        initial: float = INITIAL_LIMIT,
+        min_limit: float = MIN_LIMIT,
+        max_limit: float = MAX_LIMIT,
+        increase: float = INCREASE,
+        decrease: float = DECREASE,
+        latency_factor: float = LATENCY_FACTOR,
+    ) -> None:
+        """Ограничитель с начальным лимитом initial."""
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.in_flight = 0
+        self.baseline = None
+        self.decreased_at = 0.0
+        self.waiters = deque()
+        self.increases = 0
+        self.decreases = 0
+
+    async def acquire(self) -> float:
+        """Ждет свободного места и возвращает время начала запроса."""
+        while self.in_flight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self.waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self.wake()
+                raise
+        self.in_flight += 1
+        return time.monotonic()
+
+    def wake(self) -> None:
+        """Будит ожидающих, пока есть свободные места."""
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def release(self, started: float, overloaded: bool = False) -> None:
+        """Освобождает место и меняет лимит по результату запроса."""
+        self.in_flight -= 1
+        latency = time.monotonic() - started
+        if not overloaded and self.baseline is not None:
+            overloaded = latency > self.baseline * self.latency_factor
+        if overloaded:
+            if started >= self.decreased_at:
+                self.limit = max(self.min_limit, self.limit * self.decrease)
+                self.decreased_at = time.monotonic()
+                self.decreases += 1
+                logger.debug(
+                    f'Concurrency limit decreased to {self.limit:.1f}, '
+                    f'latency {latency:.3f}s',
+                )
+        else:
+            self.baseline = latency if self.baseline is None else (
+                self.baseline + (latency - self.baseline) * SMOOTHING
+            )
+            if self.limit < self.max_limit:
+                self.limit = min(
+                    self.max_limit, self.limit + self.increase / self.limit,
+                )
+                self.increases += 1
+        self.wake()
+
+    def cancel(self) -> None:
+        """Освобождает место, не меняя лимит.
+
+        Используется для отмененного запроса или запроса с ошибкой,
+        не связанной с перегрузкой.
+        """
+        self.in_flight -= 1
+        self.wake()
+
+    @contextlib.asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Место на время запроса: async with limiter.slot().
+
+        Ошибка сети или таймаут (OVERLOAD_EXCEPTIONS) считаются
+        перегрузкой, другие исключения освобождают место без изменения
+        лимита.
+        """
+        started = await self.acquire()
+        try:
+            yield
+        except OVERLOAD_EXCEPTIONS:
+            self.release(started, True)
+            raise
+        except BaseException:
+            self.cancel()
+            raise
+        self.release(started)
+
+    def metrics(self) -> dict:
+        """Текущий лимит и счетчики для мониторинга."""
+        return {
+            'limit': round(self.limit, 2),
+            'in_flight': self.in_flight,
+            'waiting': len(self.waiters),
+            'baseline_latency': self.baseline,
+            'increases': self.increases,
+            'decreases': self.decreases,
+        }
+
+
+class AdaptiveTransport(TransportLayer):
+    """Слой транспорта, пропускающий запросы через AdaptiveLimiter.
+
+    Bot(token, transport=AdaptiveTransport(limiter)) ограничивает все
+    запросы бота, в том числе из DirectoryMirror и MessageArchive: их
+    concurrency тогда задает только верхнюю границу.
+    """
+
+    def __init__(
+        self,
+        limiter: AdaptiveLimiter = None,
+        transport: httpx.AsyncBaseTransport = None,
+    ) -> None:
+        """Слой поверх transport с ограничителем limiter."""
+        super().__init__(transport)
+        self.limiter = limiter or AdaptiveLimiter()
+
+    async def handle_async_request(
+        self, request: httpx.Request,
+    ) -> httpx.Response:
+        """Отправляет запрос, когда ограничитель дает место."""
+        started = await self.limiter.acquire()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except OVERLOAD_EXCEPTIONS:
+            self.limiter.release(started, True)
+            raise
+        except BaseException:
+            self.limiter.cancel()
+            raise
+        self.limiter.release(
+            started, response.status_code in OVERLOAD_STATUSES,
+        )
+        return response
@@ -0,0 +1,362 @@
+import asyncio
+import json
+import sqlite3
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from .logger_setup import setup_logging
+from .priority import PRIORITY_BULK, priority
+
+PER_PAGE = 50
+CONCURRENCY = 4
+SYNC_INTERVAL = 300
+
+logger = setup_logging('directory')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS employees (
+    id INTEGER PRIMARY KEY,
+    email TEXT,
+    nickname TEXT,
+    name TEXT,
+    data TEXT NOT NULL,
+    sync_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS employees_email ON employees (email);
+CREATE INDEX IF NOT EXISTS employees_nickname ON employees (nickname);
+CREATE INDEX IF NOT EXISTS employees_name ON employees (name);
+CREATE TABLE IF NOT EXISTS tags (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    data TEXT NOT NULL,
+    sync_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tags_name ON tags (name);
+CREATE TABLE IF NOT EXISTS tag_members (
+    tag_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    sync_id INTEGER NOT NULL,
+    PRIMARY KEY (tag_id, user_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS chats (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    last_message_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chat_members (
+    user_id INTEGER NOT NULL,
+    chat_id INTEGER NOT NULL,
+    PRIMARY KEY (user_id, chat_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class DirectorySyncError(Exception):
+    """API вернул ошибку или пустой ответ при обновлении справочника."""
+
+
+def normalize(value: str | None) -> str | None:
+    """Приводит значение к виду для поиска без учета регистра.
+
+    NOCASE в SQLite работает только для латиницы.
+    """
+    return value.casefold() if value else value
+
+
+def dump_item(item: Any) -> str:
+    """Сериализует модель ответа (pydantic или Struct) для хранения."""
+    return json.dumps(item.model_dump(), ensure_ascii=False, default=str)
+
+
+class DirectoryMirror:
+    """Локальная копия справочника: сотрудники, теги и беседы в SQLite.
+
+    sync загружает справочник страницами параллельно (не больше
+    concurrency запросов одновременно) и перезаписывает загруженные
+    строки, записи, пропавшие из API, удаляются. Запись в SQLite идет
+    одной транзакцией в потоке (asyncio.to_thread) и не блокирует event
+    loop. Беседы обновляются инкрементально: после первой загрузки
+    запрашиваются только беседы с новыми сообщениями
+    (last_message_at_after). Запросы find_employee,
+    members_of_tag и chats_for_user идут по индексам SQLite без API.
+    По умолчанию база в памяти, с path копия переживает перезапуск.
+    """
+
+    def __init__(
+        self,
+        bot: Any,
+        path: str = ':memory:',
+        per: int = PER_PAGE,
+        concurrency: int = CONCURRENCY,
+    ) -> None:
+        """Копия справочника бота bot в базе SQLite path."""
+        self.bot = bot
+        self.per = per
+        self.concurrency = concurrency
+        self.semaphore = asyncio.Semaphore(concurrency)
+        # Запись sync выполняется в потоке пула asyncio.to_thread.
+        self.connection = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False,
+        )
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Закрывает базу SQLite."""
+        self.connection.close()
+
+    def get_state(self, key: str) -> str | None:
+        """Возвращает значение состояния синхронизации или None."""
+        row = self.connection.execute(
+            'SELECT value FROM sync_state WHERE key = ?', (key,),
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_state(self, key: str, value: str) -> None:
+        """Записывает значение состояния синхронизации."""
+        self.connection.execute(
+            'INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)',
+            (key, value),
+        )
+
+    async def call(
+        self, method: Callable[..., Awaitable], *args: Any, **kwargs: Any,
+    ) -> Any:
+        """Вызывает метод бота с PRIORITY_BULK, не больше concurrency."""
+        with priority(PRIORITY_BULK):
+            async with self.semaphore:
+                return await method(*args, **kwargs)
+
+    async def fetch_all(
+        self, method: Callable[..., Awaitable], *args: Any, **kwargs: Any,
+    ) -> list:
+        """Загружает все страницы метода списка.
+
+        Страницы запрашиваются пачками по concurrency штук, пока
+        не придет неполная страница. Ответ с ошибкой прерывает обновление,
+        чтобы не удалить из копии записи, которые не удалось загрузить.
+        """
+        items = []
+        page = 1
+        while True:
+            responses = await asyncio.gather(*(
+                self.call(method, *args, per=self.per, page=number, **kwargs)
+                for number in range(page, page + self.concurrency)
+            ))
+            for response in responses:
+                if response is None or not hasattr(response, 'data'):
+                    raise DirectorySyncError(
+                        f'{method.__name__} failed: {response}',
+                    )
+                data = response.data or []
+                items.extend(data)
+                if len(data) < self.per:
+                    return items
+            page += self.concurrency
+
+    async def sync(self, full: bool = False) -> dict[str, int]:
+        """Обновляет локальную копию и возвращает количество записей.
+
+        full=True загружает все беседы заново: так учитываются удаленные
+        беседы и изменения участников в беседах без новых сообщений.
+        """
+        start = time.perf_counter()
+        sync_id = int(self.get_state('sync_id') or 0) + 1
+        chats_after = None if full else self.get_state('chats_synced_at')
+        chats_synced_at = time.strftime(
+            '%Y-%m-%dT%H:%M:%S.000Z', time.gmtime(),
+        )
+        employees, tags, chats = await asyncio.gather(
+            self.fetch_all(self.bot.get_employees),
+            self.fetch_all(self.bot.get_tags),
+            self.fetch_all(
+                self.bot.get_chats, last_message_at_after=chats_after,
+            ),
+        )
+        tag_members = await asyncio.gather(*(
+            self.fetch_all(self.bot.get_tags_employees, tag.id)
+            for tag in tags
+        ))
+        await asyncio.to_thread(
+            self.store, employees, tags, tag_members, chats, sync_id,
+            full=chats_after is None, chats_synced_at=chats_synced_at,
+        )
+        counts = {
+            'employees': len(employees),
+            'tags': len(tags),
+            'tag_members': sum(len(members) for members in tag_members),
+            'chats': len(chats),
+        }
+        logger.debug(
+            f'Directory synced in {time.perf_counter() - start:.3f}s: '
+            f'{counts}',
+        )
+        return counts
+
+    def store(
+        self,
+        employees: list,
+        tags: list,
+        tag_members: list,
+        chats: list,
+        sync_id: int,
+        full: bool,
+        chats_synced_at: str,
+    ) -> None:
+        """Записывает результат sync одной транзакцией."""
+        with self.connection:
+            self.connection.execute('BEGIN')
+            self.store_employees(employees, sync_id)
+            self.store_tags(tags, tag_members, sync_id)
+            if full:
+                self.connection.execute('DELETE FROM chats')
+                self.connection.execute('DELETE FROM chat_members')
+            self.store_chats(chats)
+            self.set_state('sync_id', str(sync_id))
+            self.set_state('chats_synced_at', chats_synced_at)
+
+    def store_employees(self, employees: list, sync_id: int) -> None:
+        """Записывает сотрудников и удаляет не пришедших в sync_id."""
+        self.connection.executemany(
+            'INSERT INTO employees (id, email, nickname, name, data, sync_id) '
+            'VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (id) DO UPDATE SET '
+            'email = excluded.email, nickname = excluded.nickname, '
+            'name = excluded.name, data = excluded.data, '
+            'sync_id = excluded.sync_id',
+            (
+                (
+                    employee.id,
+                    normalize(employee.email),
+                    normalize(employee.nickname),
+                    normalize(
+                        f'{employee.first_name or ""} '
+                        f'{employee.last_name or ""}'.strip(),
+                    ),
+                    dump_item(employee), sync_id,
+                )
+                for employee in employees
+            ),
+        )
+        self.connection.execute(
+            'DELETE FROM employees WHERE sync_id < ?', (sync_id,),
+        )
+
+    def store_tags(
+        self, tags: list, tag_members: list, sync_id: int,
+    ) -> None:
+        """Записывает теги с участниками и удаляет не пришедшие в sync_id."""
+        self.connection.executemany(
+            'INSERT OR REPLACE INTO tags (id, name, data, sync_id) '
+            'VALUES (?, ?, ?, ?)',
+            (
+                (tag.id, normalize(tag.name), dump_item(tag), sync_id)
+                for tag in tags
+            ),
+        )
+        self.connection.executemany(
+            'INSERT OR REPLACE INTO tag_members (tag_id, user_id, sync_id) '
+            'VALUES (?, ?, ?)',
+            (
+                (tag.id, member.id, sync_id)
+                for tag, members in zip(tags, tag_members)
+                for member in members
+            ),
+        )
+        for table in ('tags', 'tag_members'):
+            self.connection.execute(
+                f'DELETE FROM {table} WHERE sync_id < ?', (sync_id,),
+            )
+
+    def store_chats(self, chats: list) -> None:
+        """Записывает беседы и заменяет их списки участников."""
+        self.connection.executemany(
+            'INSERT OR REPLACE INTO chats (id, name, last_message_at, data) '
+            'VALUES (?, ?, ?, ?)',
+            (
+                (
+                    chat.id, normalize(chat.name), chat.last_message_at,
+                    dump_item(chat),
+                )
+                for chat in chats
+            ),
+        )
+        self.connection.executemany(
+            'DELETE FROM chat_members WHERE chat_id = ?',
+            ((chat.id,) for chat in chats),
+        )
+        self.connection.executemany(
+            'INSERT OR IGNORE INTO chat_members (user_id, chat_id) '
+            'VALUES (?, ?)',
+            (
+                (user_id, chat.id)
+                for chat in chats
+                for user_id in chat.member_ids or ()
+            ),
+        )
+
+    async def run(self, interval: float = SYNC_INTERVAL) -> None:
+        """Обновляет копию по расписанию.
+
+        Ошибки обновления записываются в лог и не останавливают цикл.
+        """
+        while True:
+            try:
+                await self.sync()
+            except Exception as ex:
+                logger.error(f'Unable to sync directory: {ex}')
+            await asyncio.sleep(interval)
+
+    def find_employee(
+        self, email: str = None, nickname: str = None, name: str = None,
+    ) -> dict | None:
+        """Ищет сотрудника по email, имени пользователя или имени.
+
+        Имя - имя и фамилия, поиск идет без учета регистра.
+        """
+        for column, value in (
+            ('email', email), ('nickname', nickname), ('name', name),
+        ):
+            if value is None:
+                continue
+            row = self.connection.execute(
+                f'SELECT data FROM employees WHERE {column} = ?',
+                (normalize(value),),
+            ).fetchone()
+            return json.loads(row[0]) if row else None
+        raise ValueError('Pass email, nickname or name')
+
+    def get_employee(self, employee_id: int) -> dict | None:
+        """Возвращает сотрудника по идентификатору."""
+        row = self.connection.execute(
+            'SELECT data FROM employees WHERE id = ?', (employee_id,),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find_tag(self, name: str) -> dict | None:
+        """Ищет тег по названию без учета регистра."""
+        row = self.connection.execute(
+            'SELECT data FROM tags WHERE name = ?', (normalize(name),),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def members_of_tag(self, tag_id: int) -> list[int]:
+        """Возвращает идентификаторы сотрудников тега."""
+        return [
+            row[0] for row in self.connection.execute(
+                'SELECT user_id FROM tag_members WHERE tag_id = ?', (tag_id,),
+            )
+        ]
+
+    def chats_for_user(self, user_id: int) -> list[int]:
+        """Возвращает идентификаторы бесед, в которых состоит сотрудник."""
+        return [
+            row[0] for row in self.connection.execute(
+                'SELECT chat_id FROM chat_members WHERE user_id = ?',
+                (user_id,),
+            )
+        ]
@@ -0,0 +1,128 @@
+import json
+import types
+import typing
+from collections.abc import Callable, Mapping
+from enum import Enum
+from functools import lru_cache
+from typing import Any
+
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+UNION_TYPES = (typing.Union, types.UnionType)
+
+# Функция проверки значения: (значение, путь к полю) -> None.
+Checker = Callable[[Any, str], None]
+
+
+class RequestDataError(ValueError):
+    """Словарь тела запроса не соответствует модели запроса."""
+
+
+def compile_list(item_annotation: Any) -> Checker:
+    """Возвращает функцию проверки списка и его элементов."""
+    item_checker = compile_annotation(item_annotation)
+
+    def check_list(value: Any, path: str) -> None:
+        if not isinstance(value, (list, tuple)):
+            raise RequestDataError(f'{path}: ожидается список')
+        if item_checker is None:
+            return
+        for index, item in enumerate(value):
+            if item is not None:
+                item_checker(item, f'{path}[{index}]')
+    return check_list
+
+
+def compile_enum(annotation: type[Enum]) -> Checker:
+    """Возвращает функцию проверки значения Enum."""
+    values = frozenset(member.value for member in annotation)
+
+    def check_enum(value: Any, path: str) -> None:
+        if value not in values:
+            raise RequestDataError(
+                f'{path}: {value!r} не входит в {sorted(values)}',
+            )
+    return check_enum
+
+
+def compile_annotation(annotation: Any) -> Checker | None:
+    """Возвращает функцию проверки значения поля.
+
+    None - поле не проверяется: строки, числа и прочие простые типы
+    проверяет сервер.
+    """
+    origin = typing.get_origin(annotation)
+    if origin in UNION_TYPES:
+        checkers = [
+            compile_annotation(argument)
+            for argument in typing.get_args(annotation)
+            if argument is not type(None)
+        ]
+        return checkers[0] if len(checkers) == 1 else None
+    if origin is list:
+        return compile_list(typing.get_args(annotation)[0])
+    if not isinstance(annotation, type):
+        return None
+    if issubclass(annotation, Enum):
+        return compile_enum(annotation)
+    if issubclass(annotation, BaseModel):
+        return get_model_checker(annotation)
+    return None
+
+
+@lru_cache(maxsize=None)
+def get_model_checker(model: type[BaseModel]) -> Checker:
+    """Собирает по полям модели функцию проверки словаря.
+
+    Проверяются обязательные ключи, значения Enum и вложенные словари и
+    списки. Функция собирается один раз для модели и кэшируется.
+    """
+    fields = tuple(
+        (
+            field.alias or name,
+            field.is_required(),
+            compile_annotation(field.annotation),
+        )
+        for name, field in model.model_fields.items()
+    )
+
+    def check_mapping(value: Any, path: str) -> None:
+        if not isinstance(value, Mapping):
+            raise RequestDataError(f'{path}: ожидается словарь')
+        for name, required, checker in fields:
+            item = value.get(name)
+            if item is None:
+                if required:
+                    raise RequestDataError(
+                        f'{path}: отсутствует обязательное поле {name!r}',
+                    )
+                continue
+            if checker is not None:
+                checker(item, f'{path}.{name}')
+    return check_mapping
+
+
+def dump_json(data: Mapping) -> bytes:
+    """Сериализует словарь в JSON (orjson, если установлен)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(data)
+        except TypeError:
+            pass
+    return json.dumps(
+        data, ensure_ascii=False, separators=(',', ':'),
+    ).encode()
+
+
+def encode_request(model: type[BaseModel], data: Mapping) -> bytes:
+    """Проверяет словарь по модели запроса и сериализует его в JSON.
+
+    Объекты модели при этом не создаются.
+    """
+    get_model_checker(model)(data, model.__name__)
+    return dump_json(data)
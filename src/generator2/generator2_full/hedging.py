@@ -0,0 +1,171 @@
+import asyncio
+import time
+from collections import deque
+from collections.abc import Iterable
+
+import httpx
+
+from .transport import TransportLayer, get_operation
+
+PERCENTILE = 0.95
+# Доля дополнительных запросов от всех запросов операций с хеджированием.
+BUDGET = 0.1
+# Запас бюджета на всплеск медленных ответов.
+BUDGET_BURST = 10
+WINDOW = 500
+MIN_SAMPLES = 20
+# Задержка, пока для операции не набралось MIN_SAMPLES ответов.
+INITIAL_DELAY = 0.5
+# Через сколько новых ответов пересчитывается перцентиль.
+RECALCULATE_EVERY = 10
+
+
+class HedgeStats:
+    """Задержки ответов и счетчики хеджирования одной операции."""
+
+    __slots__ = (
+        'latencies', 'delay', 'samples', 'requests', 'hedged', 'hedge_wins',
+    )
+
+    def __init__(self, window: int) -> None:
+        """Статистика по последним window ответам."""
+        self.latencies = deque(maxlen=window)
+        self.delay = INITIAL_DELAY
+        self.samples = 0
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def add(self, latency: float, percentile: float) -> None:
+        """Добавляет задержку ответа и пересчитывает задержку хеджирования."""
+        self.latencies.append(latency)
+        self.samples += 1
+        if (
+            len(self.latencies) >= MIN_SAMPLES
+            and self.samples % RECALCULATE_EVERY == 0
+        ):
+            latencies = sorted(self.latencies)
+            self.delay = latencies[
+                min(int(len(latencies) * percentile), len(latencies) - 1)
+            ]
+
+
+class HedgingTransport(TransportLayer):
+    """Хеджирование GET запросов для сокращения хвоста задержек.
+
+    Если ответ на GET запрос включенной операции не пришел за перцентиль
+    percentile ее задержек, отправляется копия запроса, используется
+    ответ, пришедший первым, а второй запрос отменяется. operations -
+    имена методов бота (get_message, get_employee), None включает все
+    GET запросы. Дополнительные запросы ограничены бюджетом: не больше
+    budget от числа запросов (с запасом BUDGET_BURST), поэтому при общей
+    деградации API нагрузка не удваивается.
+    """
+
+    def __init__(
+        self,
+        operations: Iterable[str] = None,
+        transport: httpx.AsyncBaseTransport = None,
+        percentile: float = PERCENTILE,
+        budget: float = BUDGET,
+        window: int = WINDOW,
+    ) -> None:
+        """Слой поверх transport, хеджирующий операции operations."""
+        super().__init__(transport)
+        self.operations = None if operations is None else set(operations)
+        self.percentile = percentile
+        self.budget = budget
+        self.window = window
+        self.tokens = BUDGET_BURST
+        self.stats: dict[str, HedgeStats] = {}
+
+    def is_enabled(self, request: httpx.Request, operation: str) -> bool:
+        """Включено ли хеджирование для запроса операции operation."""
+        return request.method == 'GET' and (
+            self.operations is None or operation in self.operations
+        )
+
+    def take_budget(self) -> bool:
+        """Списывает дополнительный запрос из бюджета, если он есть."""
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    async def handle_async_request(
+        self, request: httpx.Request,
+    ) -> httpx.Response:
+        """Отправляет запрос и его копию, если ответ задерживается."""
+        operation = get_operation(request)
+        if not self.is_enabled(request, operation):
+            return await self.transport.handle_async_request(request)
+        stats = self.stats.get(operation)
+        if stats is None:
+            stats = self.stats[operation] = HedgeStats(self.window)
+        stats.requests += 1
+        self.tokens = min(BUDGET_BURST, self.tokens + self.budget)
+        started = time.monotonic()
+        primary = asyncio.ensure_future(
+            self.transport.handle_async_request(request),
+        )
+        try:
+            done, _ = await asyncio.wait((primary,), timeout=stats.delay)
+            if done or not self.take_budget():
+                response = await primary
+                stats.add(time.monotonic() - started, self.percentile)
+                return response
+            stats.hedged += 1
+            hedge = asyncio.ensure_future(
+                self.transport.handle_async_request(request),
+            )
+            winner = await self.race(primary, hedge)
+        except BaseException:
+            primary.cancel()
+            raise
+        if winner is hedge:
+            stats.hedge_wins += 1
+        stats.add(time.monotonic() - started, self.percentile)
+        return winner.result()
+
+    async def race(
+        self, primary: asyncio.Future, hedge: asyncio.Future,
+    ) -> asyncio.Future:
+        """Ждет первого успешного из двух запросов и отменяет второй.
+
+        Если оба завершились ошибкой, возвращает основной.
+        """
+        pending = {primary, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in (primary, hedge):
+                    if task in done and task.exception() is None:
+                        winner = task
+                        break
+                else:
+                    continue
+                for task in pending:
+                    task.cancel()
+                for task in done - {winner}:
+                    if task.exception() is None:
+                        await task.result().aclose()
+                return winner
+            return primary
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            raise
+
+    def metrics(self) -> dict[str, dict]:
+        """Задержка хеджирования и счетчики по операциям."""
+        return {
+            operation: {
+                'delay': stats.delay,
+                'requests': stats.requests,
+                'hedged': stats.hedged,
+                'hedge_wins': stats.hedge_wins,
+            }
+            for operation, stats in self.stats.items()
+        }
@@ -0,0 +1,184 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from typing import Any
+
+from .logger_setup import setup_logging
+from .priority import PRIORITY_BULK, priority
+
+# Идентификаторов в одном запросе добавления.
+CHUNK_SIZE = 100
+CONCURRENCY = 4
+
+logger = setup_logging('membership')
+
+
+class MembershipSyncError(Exception):
+    """API вернул ошибку при чтении или изменении состава беседы."""
+
+
+def chunked(ids: list[int], size: int) -> list[list[int]]:
+    """Делит ids на пачки по size идентификаторов."""
+    return [ids[index:index + size] for index in range(0, len(ids), size)]
+
+
+class MembershipSync:
+    """Приведение состава бесед к нужному по разнице множеств.
+
+    Текущие участники и теги беседы читаются одним get_chat (для
+    нескольких бесед - параллельно), разница с нужным составом считается
+    локально, недостающие идентификаторы добавляются пачками по
+    chunk_size параллельно, не больше concurrency запросов одновременно.
+    Частоту запросов ограничивает транспорт бота (TokenBucket,
+    PriorityTransport), запросы идут с PRIORITY_BULK.
+
+    В API нет метода исключения участника или тега, поэтому лишние
+    идентификаторы только возвращаются в результате (extra) или
+    передаются remove_member(chat_id, user_id) и
+    remove_tag(chat_id, tag_id), если они заданы.
+    """
+
+    def __init__(
+        self,
+        bot: Any,
+        chunk_size: int = CHUNK_SIZE,
+        concurrency: int = CONCURRENCY,
+        silent: bool = True,
+        remove_member: Callable[[int, int], Awaitable] = None,
+        remove_tag: Callable[[int, int], Awaitable] = None,
+    ) -> None:
+        """Синхронизация состава бесед через бота bot."""
+        self.bot = bot
+        self.chunk_size = chunk_size
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.silent = silent
+        self.remove_member = remove_member
+        self.remove_tag = remove_tag
+
+    async def call(
+        self, method: Callable[..., Awaitable], *args: Any, **kwargs: Any,
+    ) -> Any:
+        """Вызывает метод бота с PRIORITY_BULK и ограничением concurrency."""
+        with priority(PRIORITY_BULK):
+            async with self.semaphore:
+                return await method(*args, **kwargs)
+
+    async def get_chat(self, chat_id: int) -> Any:
+        """Возвращает беседу с текущими участниками и тегами."""
+        response = await self.call(self.bot.get_chat, chat_id)
+        if response is None or not hasattr(response, 'data'):
+            raise MembershipSyncError(
+                f'get_chat failed for chat {chat_id}: {response}',
+            )
+        return response.data
+
+    async def apply(
+        self,
+        chat_id: int,
+        current: Iterable[int],
+        desired: Iterable[int],
+        add: Callable[[int, list[int]], Awaitable],
+        remove: Callable[[int, int], Awaitable] | None,
+    ) -> dict[str, list[int]]:
+        """Добавляет недостающие идентификаторы пачками.
+
+        Лишние идентификаторы исключаются через remove или возвращаются.
+        """
+        current = set(current or ())
+        desired = set(desired)
+        missing = sorted(desired - current)
+        extra = sorted(current - desired)
+        calls = [add(chat_id, chunk) for chunk in chunked(
+            missing, self.chunk_size,
+        )]
+        if remove is not None:
+            calls.extend(
+                self.call(remove, chat_id, item_id) for item_id in extra
+            )
+        for response in await asyncio.gather(*calls):
+            if response is not None and getattr(response, 'errors', None):
+                raise MembershipSyncError(
+                    f'Membership update failed for chat {chat_id}: '
+                    f'{response}',
+                )
+        return {
+            'added': missing,
+            'removed': extra if remove is not None else [],
+            'extra': [] if remove is not None else extra,
+        }
+
+    async def add_members(self, chat_id: int, member_ids: list[int]) -> Any:
+        """Добавляет участников member_ids в беседу."""
+        return await self.call(
+            self.bot.post_members_to_chats,
+            {'member_ids': member_ids, 'silent': self.silent}, chat_id,
+        )
+
+    async def add_tags(self, chat_id: int, tag_ids: list[int]) -> Any:
+        """Добавляет теги tag_ids в беседу."""
+        return await self.call(
+            self.bot.post_tags_to_chats, {'group_tag_ids': tag_ids}, chat_id,
+        )
+
+    async def sync_chat_members(
+        self, chat_id: int, desired_ids: Iterable[int], chat: Any = None,
+    ) -> dict[str, list[int]]:
+        """Приводит участников беседы к desired_ids.
+
+        Возвращает добавленных, исключенных и лишних (не исключенных)
+        участников.
+        """
+        chat = chat or await self.get_chat(chat_id)
+        return await self.apply(
+            chat_id, chat.member_ids, desired_ids,
+            self.add_members, self.remove_member,
+        )
+
+    async def sync_chat_tags(
+        self, chat_id: int, desired_ids: Iterable[int], chat: Any = None,
+    ) -> dict[str, list[int]]:
+        """Приводит теги беседы к desired_ids, как sync_chat_members."""
+        chat = chat or await self.get_chat(chat_id)
+        return await self.apply(
+            chat_id, chat.group_tag_ids, desired_ids,
+            self.add_tags, self.remove_tag,
+        )
+
+    async def sync(
+        self,
+        members: Mapping[int, Iterable[int]] = None,
+        tags: Mapping[int, Iterable[int]] = None,
+    ) -> dict[int, dict]:
+        """Параллельно приводит состав нескольких бесед.
+
+        members и tags - словари {chat_id: нужные идентификаторы}. Каждая
+        беседа читается один раз.
+        """
+        members = members or {}
+        tags = tags or {}
+        start = time.perf_counter()
+        chat_ids = list(dict.fromkeys((*members, *tags)))
+        chats = dict(zip(chat_ids, await asyncio.gather(*(
+            self.get_chat(chat_id) for chat_id in chat_ids
+        ))))
+
+        async def sync_chat(chat_id: int) -> dict:
+            result = {}
+            if chat_id in members:
+                result['members'] = await self.sync_chat_members(
+                    chat_id, members[chat_id], chats[chat_id],
+                )
+            if chat_id in tags:
+                result['tags'] = await self.sync_chat_tags(
+                    chat_id, tags[chat_id], chats[chat_id],
+                )
+            return result
+
+        results = await asyncio.gather(*(
+            sync_chat(chat_id) for chat_id in chat_ids
+        ))
+        logger.debug(
+            f'Membership of {len(chat_ids)} chats synced in '
+            f'{time.perf_counter() - start:.3f}s',
+        )
+        return dict(zip(chat_ids, results))
@@ -0,0 +1,198 @@
+from collections.abc import AsyncIterator, Mapping
+from importlib import import_module
+from typing import Any
+
+import httpx
+
+from .constants import JSON_HEADERS, PARAM_NAME_SORT, PARAM_NAME_SORT_FIELD
+from .fast_path import encode_request
+from .streaming import stream_items
+from .transport import (
+    IDEMPOTENT_EXTENSION,
+    OPERATION_EXTENSION,
+    RETRIES_EXTENSION,
+)
+
+
+class Operation:
+    """Описание операции API для компактного режима генерации.
+
+    Модели хранятся в виде пар (модуль, класс) и импортируются
+    при первом обращении к операции. Порядок параметров строки запроса
+    совпадает с порядком значений, которые передает обертка метода.
+    timeout, retries и idempotent - политика операции из спецификации:
+    таймаут передается в httpx, повторы и идемпотентность - слоям
+    транспорта через request.extensions.
+    """
+
+    __slots__ = (
+        'name', 'method', 'url', 'path_params', 'query_params',
+        'json_body', 'extensions', 'timeout', '_has_sort', '_request_model',
+        '_response_model', '_error_model',
+    )
+
+    def __init__(
+        self,
+        name: str,
+        method: str,
+        url: str,
+        path_params: tuple[str, ...] = (),
+        query_params: tuple[str, ...] = (),
+        request_model: tuple[str, str] = None,
+        response_model: tuple[str, str] = None,
+        error_model: tuple[str, str] = None,
+        json_body: bool = True,
+        timeout: float = None,
+        retries: int = 0,
+        idempotent: bool = False,
+    ) -> None:
+        """Описание операции name: метод и URL запроса, модели, политика."""
+        self.name = name
+        self.method = method
+        self.url = url
+        self.path_params = path_params
+        self.query_params = query_params
+        self.json_body = json_body
+        self.extensions = {
+            OPERATION_EXTENSION: name,
+            IDEMPOTENT_EXTENSION: idempotent,
+            RETRIES_EXTENSION: retries,
+        }
+        self.timeout = (
+            httpx.USE_CLIENT_DEFAULT if timeout is None else timeout
+        )
+        self._has_sort = PARAM_NAME_SORT in query_params
+        self._request_model = request_model
+        self._response_model = response_model
+        self._error_model = error_model
+
+    def __repr__(self) -> str:
+        return f'Operation({self.name!r}, {self.method!r}, {self.url!r})'
+
+    def encode_query(self, values: tuple) -> dict:
+        """Собирает параметры строки запроса без None.
+
+        sort и sort_field превращаются в ключ sort[<поле>].
+        """
+        params = {
+            name: value
+            for name, value in zip(self.query_params, values)
+            if value is not None
+        }
+        if self._has_sort:
+            sort = params.pop(PARAM_NAME_SORT, None)
+            sort_field = params.pop(PARAM_NAME_SORT_FIELD, None)
+            if sort is not None:
+                params[f'sort[{sort_field}]'] = sort
+        return params
+
+    @staticmethod
+    def load_model(model: tuple[str, str] | type | None) -> type | None:
+        """Импортирует модель, заданную парой (модуль, класс)."""
+        if model is None or isinstance(model, type):
+            return model
+        module_name, class_name = model
+        module = import_module(f'.models.{module_name}', __package__)
+        return getattr(module, class_name)
+
+    @property
+    def request_model(self) -> type | None:
+        """Модель запроса, импортируется при первом обращении."""
+        self._request_model = self.load_model(self._request_model)
+        return self._request_model
+
+    @property
+    def response_model(self) -> type | None:
+        """Модель успешного ответа, импортируется при первом обращении."""
+        self._response_model = self.load_model(self._response_model)
+        return self._response_model
+
+    @property
+    def error_model(self) -> type | None:
+        """Модель ответа с ошибкой, импортируется при первом обращении."""
+        self._error_model = self.load_model(self._error_model)
+        return self._error_model
+
+
+class OperationExecutor:
+    """Общий исполнитель операций из таблицы OPERATIONS.
+
+    Заменяет одинаковый код запроса в каждом сгенерированном методе:
+    методы только передают операцию и параметры. Переопределив
+    execute_operation, можно добавить обработку для всех операций сразу.
+    """
+
+    async def execute_operation(
+        self,
+        operation: Operation,
+        data: Any = None,
+        url: str = None,
+        query: tuple = None,
+    ) -> Any:
+        """Отправляет запрос операции и возвращает модель ответа или None.
+
+        data - модель или словарь тела запроса, url - адрес с уже
+        подставленными параметрами пути, query - значения параметров
+        строки запроса в порядке operation.query_params.
+        """
+        client = await self.get_client()
+        async with client:
+            if url is None:
+                url = operation.url
+            if data is not None and operation.json_body:
+                if isinstance(data, Mapping):
+                    content = encode_request(operation.request_model, data)
+                else:
+                    content = data.model_dump_json(exclude_unset=True)
+                response = await client.request(
+                    operation.method, url, content=content,
+                    headers=JSON_HEADERS, extensions=operation.extensions,
+                    timeout=operation.timeout)
+            elif data is not None:
+                response = await client.request(
+                    operation.method, url, json=data.model_dump(),
+                    extensions=operation.extensions,
+                    timeout=operation.timeout)
+            elif query is not None:
+                response = await client.request(
+                    operation.method, url,
+                    params=operation.encode_query(query),
+                    extensions=operation.extensions,
+                    timeout=operation.timeout)
+            else:
+                response = await client.request(
+                    operation.method, url, extensions=operation.extensions,
+                    timeout=operation.timeout)
+            if response.is_success:
+                response_model = operation.response_model
+                if response_model is not None:
+                    return response_model.model_validate_json(response.text)
+            if response.is_client_error:
+                error_model = operation.error_model
+                if error_model is not None:
+                    return error_model.model_validate_json(response.text)
+            return None
+
+    async def stream_operation(
+        self,
+        operation: Operation,
+        url: str = None,
+        query: tuple = None,
+    ) -> AsyncIterator:
+        """Потоковый вариант execute_operation для операций списков.
+
+        Элементы массива data возвращаются по одному.
+        """
+        client = await self.get_client()
+        async with client:
+            kwargs = {
+                'extensions': operation.extensions,
+                'timeout': operation.timeout,
+            }
+            if query is not None:
+                kwargs['params'] = operation.encode_query(query)
+            async for item in stream_items(
+                client, operation.method, url or operation.url,
+                operation.response_model, operation.error_model, **kwargs,
+            ):
+                yield item
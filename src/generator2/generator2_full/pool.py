@@ -0,0 +1,229 @@
+import contextlib
+import itertools
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from typing import Any, Self
+
+import httpx
+
+from .bot import Bot
+from .rate_limit import BURST, RATE_LIMIT, TokenBucket
+from .transport import TransportLayer
+
+STRATEGY_LEAST_LOADED = 'least_loaded'
+STRATEGY_ROUND_ROBIN = 'round_robin'
+STRATEGY_HASH = 'hash'
+STRATEGIES = (STRATEGY_LEAST_LOADED, STRATEGY_ROUND_ROBIN, STRATEGY_HASH)
+MAX_CONNECTIONS = 100
+# Сколько секунд выбранный, но не начатый запрос считается нагрузкой бота.
+RESERVATION_TTL = 1.0
+
+
+class PooledTransport(TransportLayer):
+    """Транспорт токена поверх общего пула соединений.
+
+    Перед запросом списывает запрос из ограничителя токена и считает
+    запросы в работе, включая ожидающие ограничителя. Брони - запросы,
+    для которых бот уже выбран, но которые еще не начались: начавшийся
+    запрос снимает самую старую бронь. Бронь запроса, который не дошел
+    до транспорта (ошибка проверки данных, отмена), снимается через
+    release или истекает через RESERVATION_TTL секунд. Общий пул
+    соединений закрывает BotPool.aclose.
+    """
+
+    def __init__(
+        self, transport: httpx.AsyncBaseTransport, limiter: TokenBucket,
+    ) -> None:
+        """Транспорт поверх transport с ограничителем токена limiter."""
+        super().__init__(transport)
+        self.limiter = limiter
+        self.in_flight = 0
+        self.requests = 0
+        self.reservations: OrderedDict[int, float] = OrderedDict()
+        self.counter = itertools.count()
+
+    def reserve(self) -> int:
+        """Бронирует запрос и возвращает ключ брони."""
+        key = next(self.counter)
+        self.reservations[key] = time.monotonic() + RESERVATION_TTL
+        return key
+
+    def release(self, key: int) -> None:
+        """Снимает бронь, если запрос ее еще не снял."""
+        self.reservations.pop(key, None)
+
+    @property
+    def reserved(self) -> int:
+        """Число действующих броней."""
+        now = time.monotonic()
+        while self.reservations:
+            key, deadline = next(iter(self.reservations.items()))
+            if deadline > now:
+                break
+            del self.reservations[key]
+        return len(self.reservations)
+
+    async def handle_async_request(
+        self, request: httpx.Request,
+    ) -> httpx.Response:
+        """Снимает бронь и отправляет запрос после ограничителя."""
+        if self.reservations:
+            self.reservations.popitem(last=False)
+        self.in_flight += 1
+        self.requests += 1
+        try:
+            await self.limiter.acquire()
+            return await self.transport.handle_async_request(request)
+        finally:
+            self.in_flight -= 1
+
+
+class PooledBot(Bot):
+    """Бот пула: свой токен и ограничитель, общий пул соединений."""
+
+    def __init__(
+        self, token: str, transport: PooledTransport, workspace: str = None,
+    ) -> None:
+        """Бот токена token рабочего пространства workspace."""
+        super().__init__(token, transport)
+        self.workspace = workspace
+
+    @property
+    def load(self) -> tuple[int, float]:
+        """Загрузка для выбора бота.
+
+        Сначала выбранные и начатые запросы, затем нехватка запаса
+        ограничителя.
+        """
+        transport = self.transport
+        return (
+            transport.in_flight + transport.reserved,
+            -transport.limiter.available,
+        )
+
+
+class BotPool:
+    """Пул ботов с разными токенами.
+
+    Все боты используют один пул соединений httpx (TLS сессии, DNS и
+    keep-alive общие), а частота запросов ограничивается отдельно для
+    каждого токена, поэтому пропускная способность растет с числом
+    токенов. tokens - список токенов или словарь
+    {рабочее пространство: [токены]}. Стратегии выбора бота:
+    least_loaded (меньше запросов в работе, больше запас), round_robin и
+    hash (по chat_id: сообщения одной беседы идут через один токен).
+    limiter_factory(token) создает ограничитель токена, например
+    shared_limiter_factory() для лимита, общего для процессов хоста.
+    """
+
+    def __init__(
+        self,
+        tokens: Iterable[str] | Mapping[str, Iterable[str]],
+        strategy: str = STRATEGY_LEAST_LOADED,
+        rate: float = RATE_LIMIT,
+        burst: float = BURST,
+        transport: httpx.AsyncBaseTransport = None,
+        limiter_factory: Callable[[str], TokenBucket] = None,
+    ) -> None:
+        """Пул ботов токенов tokens со стратегией выбора strategy."""
+        if strategy not in STRATEGIES:
+            raise ValueError(
+                f'Unknown strategy {strategy!r}, expected one of {STRATEGIES}',
+            )
+        self.strategy = strategy
+        self.transport = transport or httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS),
+        )
+        limiter_factory = limiter_factory or (
+            lambda token: TokenBucket(rate, burst)
+        )
+        if not isinstance(tokens, Mapping):
+            tokens = {None: tokens}
+        self.workspaces: dict[str, list[PooledBot]] = {}
+        for workspace, workspace_tokens in tokens.items():
+            self.workspaces[workspace] = [
+                PooledBot(
+                    token,
+                    PooledTransport(self.transport, limiter_factory(token)),
+                    workspace,
+                )
+                for token in workspace_tokens
+            ]
+        self.bots = [
+            bot for bots in self.workspaces.values() for bot in bots
+        ]
+        if not self.bots:
+            raise ValueError('BotPool needs at least one token')
+        self.counters = {
+            workspace: itertools.count()
+            for workspace in (None, *self.workspaces)
+        }
+
+    def select(
+        self, workspace: str = None, chat_id: int = None,
+    ) -> tuple[PooledBot, int | None]:
+        """Выбирает бота по стратегии пула.
+
+        Возвращает бота и ключ брони (только для least_loaded).
+        """
+        bots = self.workspaces[workspace] if workspace else self.bots
+        if self.strategy == STRATEGY_HASH and chat_id is not None:
+            return bots[hash(chat_id) % len(bots)], None
+        if self.strategy == STRATEGY_ROUND_ROBIN:
+            return bots[next(self.counters[workspace]) % len(bots)], None
+        bot = min(bots, key=lambda bot: bot.load)
+        return bot, bot.transport.reserve()
+
+    def get_bot(self, workspace: str = None, chat_id: int = None) -> PooledBot:
+        """Возвращает бота для запроса по стратегии пула.
+
+        workspace ограничивает выбор ботами рабочего пространства, chat_id
+        используется стратегией hash. least_loaded бронирует запрос
+        за выбранным ботом до его начала, поэтому боты для пачки запросов
+        из asyncio.gather распределяются равномерно. Бронь запроса, который
+        не был отправлен, истекает через RESERVATION_TTL секунд; reserve
+        снимает ее сразу.
+        """
+        return self.select(workspace, chat_id)[0]
+
+    @contextlib.contextmanager
+    def reserve(
+        self, workspace: str = None, chat_id: int = None,
+    ) -> Iterator[PooledBot]:
+        """Как get_bot, но снимает бронь при выходе из блока.
+
+        Бронь снимается, даже если запрос не был отправлен из-за ошибки
+        или отмены.
+        """
+        bot, key = self.select(workspace, chat_id)
+        try:
+            yield bot
+        finally:
+            if key is not None:
+                bot.transport.release(key)
+
+    def stats(self) -> dict[str, dict]:
+        """Запросы, запросы в работе и запас по каждому боту пула."""
+        return {
+            f'{bot.workspace or "default"}:{index}': {
+                'requests': bot.transport.requests,
+                'in_flight': bot.transport.in_flight,
+                'available': round(bot.transport.limiter.available, 2),
+            }
+            for index, bot in enumerate(self.bots)
+        }
+
+    async def aclose(self) -> None:
+        """Закрывает ограничители ботов и общий пул соединений."""
+        for bot in self.bots:
+            close = getattr(bot.transport.limiter, 'close', None)
+            if close is not None:
+                close()
+        await self.transport.aclose()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.aclose()
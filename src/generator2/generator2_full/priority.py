@@ -0,0 +1,194 @@
+import asyncio
+import contextlib
+import contextvars
+import heapq
+import itertools
+from collections.abc import Iterable, Iterator
+
+import httpx
+
+from .rate_limit import TokenBucket
+from .transport import TransportLayer, get_operation
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+CONCURRENCY = 10
+# Доля мест, доступная фоновым запросам.
+BULK_SHARE = 0.7
+# Запас ограничителя частоты, который фоновые запросы не расходуют.
+BULK_RESERVE = 2
+# Методы списков, которые по умолчанию считаются фоновыми.
+BULK_OPERATIONS = frozenset((
+    'get_chats', 'get_employees', 'get_list_message', 'get_tags',
+    'get_tags_employees', 'get_message_reactions',
+))
+
+request_priority = contextvars.ContextVar('request_priority', default=None)
+
+
+@contextlib.contextmanager
+def priority(level: int) -> Iterator[None]:
+    """Задает приоритет запросов бота внутри блока.
+
+    Приоритет действует и в задачах, созданных в блоке:
+    with priority(PRIORITY_BULK): await export().
+    """
+    token = request_priority.set(level)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+
+class PriorityScheduler:
+    """Очередь запросов с приоритетами за местами и токенами частоты.
+
+    Ожидающие запросы получают место (не больше concurrency в работе) и
+    токен limiter (TokenBucket или SharedTokenBucket) в порядке
+    приоритета, внутри приоритета - в порядке прихода. Фоновые запросы
+    занимают не больше bulk_share мест и не расходуют последние
+    bulk_reserve токенов, поэтому интерактивный запрос не ждет окончания
+    выгрузки, а выгрузка идет на оставшейся мощности.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = CONCURRENCY,
+        limiter: TokenBucket = None,
+        bulk_share: float = BULK_SHARE,
+        bulk_reserve: float = BULK_RESERVE,
+    ) -> None:
+        """Очередь на concurrency мест и токены limiter."""
+        self.concurrency = concurrency
+        self.bulk_concurrency = max(1, int(concurrency * bulk_share))
+        self.limiter = limiter
+        self.bulk_reserve = bulk_reserve
+        self.in_flight = 0
+        self.waiting = []
+        self.counter = itertools.count()
+        self.timer = None
+        self.timer_at = None
+        self.started = {PRIORITY_INTERACTIVE: 0, PRIORITY_BULK: 0}
+
+    def get_limit(self, level: int) -> int:
+        """Число мест, доступное запросам с приоритетом level."""
+        if level >= PRIORITY_BULK:
+            return self.bulk_concurrency
+        return self.concurrency
+
+    def take_token(self, level: int) -> float:
+        """Списывает токен частоты и возвращает 0 или время ожидания."""
+        if self.limiter is None:
+            return 0
+        if level >= PRIORITY_BULK:
+            shortage = 1 + self.bulk_reserve - self.limiter.available
+            if shortage > 0:
+                return shortage / self.limiter.rate
+        return self.limiter.try_acquire()
+
+    def dispatch(self) -> None:
+        """Запускает ожидающие запросы, пока есть места и токены."""
+        while self.waiting:
+            level, _, future = self.waiting[0]
+            if future.done():
+                heapq.heappop(self.waiting)
+                continue
+            if self.in_flight >= self.get_limit(level):
+                return
+            delay = self.take_token(level)
+            if delay:
+                self.schedule(delay)
+                return
+            heapq.heappop(self.waiting)
+            self.in_flight += 1
+            self.started[min(level, PRIORITY_BULK)] += 1
+            future.set_result(None)
+
+    def schedule(self, delay: float) -> None:
+        """Запускает dispatch через delay секунд, если он не запущен раньше."""
+        loop = asyncio.get_running_loop()
+        at = loop.time() + delay
+        if self.timer is not None:
+            if self.timer_at <= at:
+                return
+            self.timer.cancel()
+        self.timer_at = at
+        self.timer = loop.call_at(at, self.on_timer)
+
+    def on_timer(self) -> None:
+        """Запускает ожидающие запросы, когда появились токены."""
+        self.timer = None
+        self.dispatch()
+
+    async def acquire(self, level: int) -> None:
+        """Ждет места и токена для запроса с приоритетом level."""
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiting, (level, next(self.counter), future))
+        self.dispatch()
+        if future.done():
+            return
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Освобождает место и запускает ожидающие запросы."""
+        self.in_flight -= 1
+        self.dispatch()
+
+    def metrics(self) -> dict:
+        """Запросы в работе, в очереди по приоритетам и начатые запросы."""
+        waiting = {PRIORITY_INTERACTIVE: 0, PRIORITY_BULK: 0}
+        for level, _, future in self.waiting:
+            if not future.done():
+                waiting[min(level, PRIORITY_BULK)] += 1
+        return {
+            'in_flight': self.in_flight,
+            'waiting_interactive': waiting[PRIORITY_INTERACTIVE],
+            'waiting_bulk': waiting[PRIORITY_BULK],
+            'started_interactive': self.started[PRIORITY_INTERACTIVE],
+            'started_bulk': self.started[PRIORITY_BULK],
+        }
+
+
+class PriorityTransport(TransportLayer):
+    """Слой транспорта, пропускающий запросы через PriorityScheduler.
+
+    Приоритет запроса задает with priority(...), иначе методы из
+    bulk_operations (по умолчанию методы списков) считаются фоновыми,
+    остальные - интерактивными. DirectoryMirror и MessageArchive
+    отправляют свои запросы с PRIORITY_BULK.
+    """
+
+    def __init__(
+        self,
+        scheduler: PriorityScheduler = None,
+        transport: httpx.AsyncBaseTransport = None,
+        bulk_operations: Iterable[str] = BULK_OPERATIONS,
+    ) -> None:
+        """Слой поверх transport с очередью scheduler."""
+        super().__init__(transport)
+        self.scheduler = scheduler or PriorityScheduler()
+        self.bulk_operations = frozenset(bulk_operations)
+
+    def get_priority(self, request: httpx.Request) -> int:
+        """Приоритет запроса: из контекста или по операции."""
+        level = request_priority.get()
+        if level is not None:
+            return level
+        if get_operation(request) in self.bulk_operations:
+            return PRIORITY_BULK
+        return PRIORITY_INTERACTIVE
+
+    async def handle_async_request(
+        self, request: httpx.Request,
+    ) -> httpx.Response:
+        """Отправляет запрос, когда очередь дает место и токен."""
+        await self.scheduler.acquire(self.get_priority(request))
+        try:
+            return await self.transport.handle_async_request(request)
+        finally:
+            self.scheduler.release()
@@ -0,0 +1,169 @@
+import asyncio
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import time
+from collections.abc import Callable
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Запросов в секунду на один токен по умолчанию.
+RATE_LIMIT = 20
+BURST = 20
+# Запас и время пополнения общего ограничителя в файле состояния.
+SHARED_STATE = struct.Struct('dd')
+SHARED_STATE_PREFIX = 'pachca-rate-'
+
+
+class TokenBucket:
+    """Ограничитель частоты запросов одного токена (token bucket).
+
+    Запас пополняется со скоростью rate в секунду до capacity. Работает
+    внутри одного event loop: проверка и списание идут без await между
+    ними, поэтому блокировка не нужна.
+    """
+
+    def __init__(
+        self, rate: float = RATE_LIMIT, capacity: float = BURST,
+    ) -> None:
+        """Ограничитель на rate запросов в секунду с запасом capacity."""
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def refill(self) -> None:
+        """Пополняет запас за время с прошлого пополнения."""
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate,
+        )
+        self.updated = now
+
+    def try_acquire(self) -> float:
+        """Списывает запрос, если хватает запаса.
+
+        Возвращает 0 или, если запаса нет, сколько секунд нужно подождать.
+        """
+        self.refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    async def acquire(self) -> None:
+        """Ждет запаса и списывает запрос."""
+        delay = self.try_acquire()
+        while delay:
+            await asyncio.sleep(delay)
+            delay = self.try_acquire()
+
+    @property
+    def available(self) -> float:
+        """Текущий запас запросов."""
+        self.refill()
+        return self.tokens
+
+
+class SharedTokenBucket(TokenBucket):
+    """Token bucket токена, общий для всех процессов хоста.
+
+    Состояние (запас и время пополнения) лежит в небольшом файле,
+    отображенном в память, а списание идет под блокировкой fcntl, поэтому
+    воркеры gunicorn/uvicorn с одним токеном делят один лимит без внешних
+    сервисов. Файл называется по хэшу токена и лежит в directory
+    (по умолчанию во временном каталоге). Файл открывается при первом
+    обращении и заново после fork: flock на описании файла, унаследованном
+    от родителя, не разделяет процессы. Время хранится по часам
+    time.time (общим для процессов и перезагрузок), состояние из будущего
+    (перевод часов) сбрасывается. Блокировка держится только на время
+    чтения и записи двух чисел, ожидание запаса идет без нее.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        rate: float = RATE_LIMIT,
+        capacity: float = BURST,
+        directory: str = None,
+    ) -> None:
+        """Ограничитель токена token с состоянием в каталоге directory."""
+        if fcntl is None:
+            raise RuntimeError('SharedTokenBucket requires fcntl (POSIX)')
+        self.rate = rate
+        self.capacity = capacity
+        digest = hashlib.sha256(token.encode()).hexdigest()[:32]
+        self.path = os.path.join(
+            directory or tempfile.gettempdir(),
+            f'{SHARED_STATE_PREFIX}{digest}',
+        )
+        self.pid = None
+        self.fd = None
+        self.state = None
+
+    def open(self) -> None:
+        """Открывает файл состояния в текущем процессе."""
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        self.pid = os.getpid()
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self.fd).st_size < SHARED_STATE.size:
+                os.ftruncate(self.fd, SHARED_STATE.size)
+            self.state = mmap.mmap(self.fd, SHARED_STATE.size)
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def update(self, cost: float) -> float:
+        """Пополняет общий запас и списывает cost, если его хватает.
+
+        Возвращает запас до списания.
+        """
+        if self.pid != os.getpid():
+            # Описание файла родителя не закрывается: он им пользуется.
+            self.open()
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        try:
+            tokens, updated = SHARED_STATE.unpack_from(self.state)
+            now = time.time()
+            if updated == 0 or updated > now:
+                tokens, updated = self.capacity, now
+            tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+            SHARED_STATE.pack_into(
+                self.state, 0, tokens - cost if tokens >= cost else tokens,
+                now,
+            )
+            return tokens
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def try_acquire(self) -> float:
+        """Списывает запрос из общего запаса или возвращает ожидание."""
+        tokens = self.update(1)
+        if tokens >= 1:
+            return 0
+        return (1 - tokens) / self.rate
+
+    @property
+    def available(self) -> float:
+        """Текущий общий запас запросов."""
+        return self.update(0)
+
+    def close(self) -> None:
+        """Закрывает файл состояния, открытый в текущем процессе."""
+        if self.pid != os.getpid():
+            return
+        self.state.close()
+        os.close(self.fd)
+        self.pid = self.fd = self.state = None
+
+
+def shared_limiter_factory(
+    rate: float = RATE_LIMIT, capacity: float = BURST, directory: str = None,
+) -> Callable[[str], SharedTokenBucket]:
+    """limiter_factory для BotPool с общими для процессов ограничителями."""
+    return lambda token: SharedTokenBucket(token, rate, capacity, directory)
@@ -0,0 +1,76 @@
+import asyncio
+import random
+
+import httpx
+
+from .transport import IDEMPOTENT_EXTENSION, RETRIES_EXTENSION, TransportLayer
+
+RETRY_STATUSES = frozenset((429, 502, 503, 504))
+BACKOFF = 0.2
+MAX_BACKOFF = 5.0
+# Больше этого Retry-After ответа не ждем.
+MAX_RETRY_AFTER = 30.0
+
+
+def get_retry_after(response: httpx.Response) -> float:
+    """Секунды из заголовка Retry-After или 0."""
+    try:
+        return min(float(response.headers['Retry-After']), MAX_RETRY_AFTER)
+    except (KeyError, ValueError):
+        return 0
+
+
+class RetryTransport(TransportLayer):
+    """Повтор запросов по подсказкам операций из спецификации.
+
+    Сгенерированные методы передают в request.extensions идемпотентность
+    и число повторов операции (метод HTTP, x-idempotent, x-retry).
+    Повторяются только идемпотентные операции - при ошибке транспорта
+    (в том числе таймауте) и ответах 429, 502, 503, 504, с
+    экспоненциальной задержкой со случайной составляющей и с учетом
+    Retry-After. Запросы без подсказок и POST не повторяются.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport = None,
+        backoff: float = BACKOFF,
+        max_backoff: float = MAX_BACKOFF,
+    ) -> None:
+        """Слой поверх transport с задержкой повтора от backoff секунд."""
+        super().__init__(transport)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retried = 0
+
+    def get_delay(self, attempt: int) -> float:
+        """Задержка перед повтором номер attempt со случайной частью."""
+        delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def handle_async_request(
+        self, request: httpx.Request,
+    ) -> httpx.Response:
+        """Отправляет запрос, повторяя его по подсказкам операции."""
+        retries = 0
+        if request.extensions.get(IDEMPOTENT_EXTENSION):
+            retries = request.extensions.get(RETRIES_EXTENSION, 0)
+        attempt = 0
+        while True:
+            try:
+                response = await self.transport.handle_async_request(request)
+            except httpx.TransportError:
+                if attempt >= retries:
+                    raise
+                delay = self.get_delay(attempt)
+            else:
+                if (
+                    attempt >= retries
+                    or response.status_code not in RETRY_STATUSES
+                ):
+                    return response
+                delay = max(self.get_delay(attempt), get_retry_after(response))
+                await response.aclose()
+            attempt += 1
+            self.retried += 1
+            await asyncio.sleep(delay)
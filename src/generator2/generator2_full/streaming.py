@@ -0,0 +1,225 @@
+import re
+import types
+import typing
+from collections.abc import AsyncIterator
+from typing import Any
+
+import httpx
+
+UNION_TYPES = (typing.Union, types.UnionType)
+LIST_KEY = b'data'
+# Строка JSON без вложенных квантификаторов: незаконченная строка в конце
+# фрагмента отбрасывается за линейное время, без перебора вариантов.
+JSON_STRING = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+# Строка JSON целиком, структурный символ или незаконченная строка (").
+TOKEN_PATTERN = re.compile(JSON_STRING + rb'|[\[\]{}:,]|"', re.S)
+# Все, кроме скобок, вместе со строками: пропускается одним вызовом.
+SKIP_PATTERN = re.compile(
+    rb'[^"\[\]{}]*(?:' + JSON_STRING + rb'[^"\[\]{}]*)*', re.S,
+)
+STRING_PATTERN = re.compile(JSON_STRING, re.S)
+SEPARATOR_PATTERN = re.compile(rb'[\s,]*')
+SCALAR_PATTERN = re.compile(rb'[^,\]\s]+')
+
+
+class StreamResponseError(Exception):
+    """Сервер ответил ошибкой на потоковый запрос.
+
+    error - модель ошибки из спецификации, если ответ удалось разобрать.
+    """
+
+    def __init__(self, status_code: int, error: Any = None) -> None:
+        """Ошибка ответа со статусом status_code и моделью ошибки error."""
+        super().__init__(f'API responded with status {status_code}')
+        self.status_code = status_code
+        self.error = error
+
+
+class ArrayItemScanner:
+    """Возвращает по одному элементы JSON массива из потока байтов.
+
+    Массив ищется на верхнем уровне объекта по ключу (по умолчанию
+    "data"). В памяти хранится только текущий, еще не законченный
+    элемент, поэтому память не зависит от размера ответа. Сам JSON
+    элемента не разбирается: строки и значения пропускаются регулярным
+    выражением, в Python обрабатываются только скобки.
+    """
+
+    def __init__(self, key: bytes = LIST_KEY) -> None:
+        """Сканер массива с ключом key."""
+        self.key = key
+        self.buffer = b''
+        self.depth = 0
+        self.last_string = None
+        self.current_key = None
+        self.in_array = False
+        self.finished = False
+        # Позиция сканирования и вложенность внутри текущего элемента.
+        self.item_position = None
+        self.item_depth = 0
+
+    def feed(self, chunk: bytes) -> list[bytes]:
+        """Принимает очередной фрагмент ответа.
+
+        Возвращает элементы массива, законченные в этом фрагменте.
+        """
+        if self.finished:
+            return []
+        buffer = self.buffer + chunk if self.buffer else chunk
+        if self.in_array:
+            position = 0
+        else:
+            position = self.find_array(buffer)
+        items = []
+        if self.in_array:
+            position = self.read_items(buffer, position, items)
+        if self.item_position is not None:
+            self.item_position -= position
+        self.buffer = buffer[position:]
+        return items
+
+    def find_array(self, buffer: bytes) -> int:
+        """Ищет начало массива по ключу на верхнем уровне объекта.
+
+        Возвращает позицию, с которой нужно продолжить разбор.
+        """
+        position = 0
+        while True:
+            match = TOKEN_PATTERN.search(buffer, position)
+            if match is None:
+                return len(buffer)
+            token = match.group()
+            if token == b'"':
+                # Строка не закончилась в этом фрагменте.
+                return match.start()
+            position = match.end()
+            if token[0] == 0x22 or token == b':':
+                self.track_key(token)
+            elif token in b'[{':
+                self.depth += 1
+                if (
+                    token == b'[' and self.depth == 2
+                    and self.current_key == self.key
+                ):
+                    self.in_array = True
+                    return position
+            elif token in b']}':
+                self.depth -= 1
+                if self.depth == 0:
+                    self.finished = True
+                    return position
+
+    def track_key(self, token: bytes) -> None:
+        """Запоминает строку или ключ объекта верхнего уровня."""
+        if self.depth != 1:
+            return
+        if token == b':':
+            self.current_key = self.last_string
+        else:
+            self.last_string = token[1:-1]
+
+    def read_items(self, buffer: bytes, position: int, items: list) -> int:
+        """Добавляет в items законченные элементы массива.
+
+        Возвращает позицию начала незаконченного элемента.
+        """
+        size = len(buffer)
+        while True:
+            if self.item_position is not None:
+                end = self.scan_container(buffer, position)
+                if end is None:
+                    return position
+                items.append(buffer[position:end])
+                position = end
+                continue
+            position = SEPARATOR_PATTERN.match(buffer, position).end()
+            if position == size:
+                return position
+            first = buffer[position]
+            if first == 0x5d:  # ]
+                self.in_array = False
+                self.finished = True
+                return position + 1
+            if first in b'[{':
+                self.item_position = position
+                self.item_depth = 0
+                continue
+            if first == 0x22:
+                match = STRING_PATTERN.match(buffer, position)
+            else:
+                match = SCALAR_PATTERN.match(buffer, position)
+            if match is None or match.end() == size:
+                return position
+            items.append(match.group())
+            position = match.end()
+
+    def scan_container(self, buffer: bytes, start: int) -> int | None:
+        """Продолжает сканирование объекта или массива, начатого в start.
+
+        Возвращает позицию после закрывающей скобки или None, если
+        элемент не закончился в буфере.
+        """
+        position = self.item_position
+        size = len(buffer)
+        while True:
+            position = SKIP_PATTERN.match(buffer, position).end()
+            if position == size or buffer[position] == 0x22:
+                # Конец буфера или незаконченная строка.
+                self.item_position = position
+                return None
+            if buffer[position] in b'[{':
+                self.item_depth += 1
+            else:
+                self.item_depth -= 1
+            position += 1
+            if self.item_depth == 0:
+                self.item_position = None
+                return position
+
+
+def get_item_model(response_model: type) -> type:
+    """Возвращает модель элемента списка data модели ответа.
+
+    Модель ответа - модель pydantic или Struct.
+    """
+    fields = getattr(response_model, 'model_fields', None)
+    if fields is not None:
+        annotation = fields[LIST_KEY.decode()].annotation
+    else:
+        annotation = typing.get_type_hints(response_model)[LIST_KEY.decode()]
+    while typing.get_origin(annotation) in UNION_TYPES:
+        annotation = next(
+            argument for argument in typing.get_args(annotation)
+            if argument is not type(None)
+        )
+    return typing.get_args(annotation)[0]
+
+
+async def stream_items(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    response_model: type,
+    error_model: type = None,
+    **kwargs: Any,
+) -> AsyncIterator:
+    """Отправляет запрос и по одному возвращает элементы списка data.
+
+    Элементы проверяются моделью и возвращаются, не дожидаясь конца тела.
+
+    При ответе с ошибкой вызывает StreamResponseError с моделью ошибки.
+    """
+    item_model = get_item_model(response_model)
+    async with client.stream(method, url, **kwargs) as response:
+        if not response.is_success:
+            body = await response.aread()
+            error = None
+            if response.is_client_error and error_model is not None:
+                error = error_model.model_validate_json(body)
+            raise StreamResponseError(response.status_code, error)
+        scanner = ArrayItemScanner()
+        async for chunk in response.aiter_bytes():
+            for item in scanner.feed(chunk):
+                if item == b'null':
+                    continue
+                yield item_model.model_validate_json(item)
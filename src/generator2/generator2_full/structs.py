@@ -0,0 +1,128 @@
+import dataclasses
+import json
+import types
+import typing
+from collections.abc import Callable
+from enum import Enum
+from typing import Any, Self
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+UNION_TYPES = (typing.Union, types.UnionType)
+
+# Функция преобразования значения поля из JSON.
+Decoder = Callable[[Any], Any]
+
+
+class StructDecodeError(ValueError):
+    """Данные ответа не соответствуют структуре модели."""
+
+
+def compile_decoder(annotation: Any) -> Decoder | None:
+    """Возвращает функцию преобразования значения поля.
+
+    None - значение сохраняется как есть: строки, числа, словари и Any.
+    """
+    origin = typing.get_origin(annotation)
+    if origin in UNION_TYPES:
+        decoders = [
+            compile_decoder(argument)
+            for argument in typing.get_args(annotation)
+            if argument is not type(None)
+        ]
+        return decoders[0] if len(decoders) == 1 else None
+    if origin is list:
+        item_decoder = compile_decoder(typing.get_args(annotation)[0])
+        if item_decoder is None:
+            return list
+
+        def decode_list(value: list) -> list:
+            return [
+                None if item is None else item_decoder(item)
+                for item in value
+            ]
+        return decode_list
+    if not isinstance(annotation, type):
+        return None
+    if issubclass(annotation, Enum):
+        return annotation
+    if issubclass(annotation, Struct):
+        return annotation.from_dict
+    return None
+
+
+class Struct:
+    """Базовый класс компактных моделей ответов.
+
+    Модели генерируются как @dataclass(slots=True, kw_only=True): у объекта
+    нет __dict__, поэтому он занимает меньше памяти, чем модель pydantic.
+    Декодер собирается по полям класса при первом разборе ответа.
+    Проверяются обязательные поля, значения Enum и вложенные структуры,
+    простые типы не приводятся. Для совместимости с моделями pydantic
+    есть model_validate_json, model_validate и model_dump.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def get_fields(cls) -> tuple:
+        """Возвращает поля класса: (имя, ключ JSON, обязательное, декодер)."""
+        fields = cls.__dict__.get('_struct_fields')
+        if fields is not None:
+            return fields
+        hints = typing.get_type_hints(cls)
+        fields = tuple(
+            (
+                field.name,
+                field.metadata.get('alias', field.name),
+                field.default is dataclasses.MISSING,
+                compile_decoder(hints[field.name]),
+            )
+            for field in dataclasses.fields(cls)
+        )
+        cls._struct_fields = fields
+        return fields
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Self:
+        """Создает объект из словаря ответа, проверяя поля."""
+        if not isinstance(data, dict):
+            raise StructDecodeError(
+                f'{cls.__name__}: ожидается объект, получено {data!r}',
+            )
+        values = {}
+        for name, key, required, decoder in cls.get_fields():
+            value = data.get(key)
+            if value is None:
+                if required:
+                    raise StructDecodeError(
+                        f'{cls.__name__}: отсутствует поле {key!r}',
+                    )
+            elif decoder is not None:
+                try:
+                    value = decoder(value)
+                except (TypeError, ValueError) as error:
+                    raise StructDecodeError(
+                        f'{cls.__name__}.{key}: {error}',
+                    ) from error
+            values[name] = value
+        return cls(**values)
+
+    @classmethod
+    def model_validate(cls, data: dict) -> Self:
+        """Создает объект из словаря, как BaseModel.model_validate."""
+        return cls.from_dict(data)
+
+    @classmethod
+    def model_validate_json(cls, data: str | bytes) -> Self:
+        """Создает объект из JSON, как BaseModel.model_validate_json."""
+        return cls.from_dict(
+            orjson.loads(data) if orjson is not None else json.loads(data),
+        )
+
+    def model_dump(self) -> dict:
+        """Возвращает объект в виде словаря, как BaseModel.model_dump."""
+        return dataclasses.asdict(self)
@@ -0,0 +1,46 @@
+import httpx
+
+# Ключ расширения запроса httpx, в котором методы бота передают свое имя.
+OPERATION_EXTENSION = 'operation'
+# Подсказки повтора операции из спецификации (x-idempotent, x-retry).
+IDEMPOTENT_EXTENSION = 'idempotent'
+RETRIES_EXTENSION = 'retries'
+
+
+def get_operation(request: httpx.Request) -> str:
+    """Имя метода бота, отправившего запрос, или метод и путь запроса."""
+    return request.extensions.get(OPERATION_EXTENSION) or (
+        f'{request.method} {request.url.path}'
+    )
+
+
+class TransportLayer(httpx.AsyncBaseTransport):
+    """Слой поверх транспорта httpx для Bot(token, transport=...).
+
+    Сгенерированные методы закрывают клиента после каждого запроса
+    (async with client), поэтому aclose слоя ничего не делает, а пул
+    соединений внутреннего транспорта закрывает close. Слои вкладываются
+    друг в друга: transport может быть другим слоем. Сгенерированные
+    методы передают свое имя в request.extensions (get_operation), что
+    позволяет слоям вести состояние по операциям.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport = None) -> None:
+        """Слой поверх transport (по умолчанию новый пул соединений)."""
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(
+        self, request: httpx.Request,
+    ) -> httpx.Response:
+        """Передает запрос внутреннему транспорту."""
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        """Ничего не делает: пул соединений закрывает close."""
+
+    async def close(self) -> None:
+        """Закрывает пул соединений внутреннего транспорта."""
+        if isinstance(self.transport, TransportLayer):
+            await self.transport.close()
+        else:
+            await self.transport.aclose()
@@ -1,68 +1,99 @@
-import os
-import subprocess
+import argparse
+import sys
 
+from .generate_pydantic_model import set_models_backend
 from .request_methods_generator import generate
-from .services.constants import GENERATED_CLIENT_FOLDER
+from .services.code_formatter import write_generated_sources
+from .services.constants import MODELS_BACKENDS, MODELS_BACKEND_PYDANTIC
+from .services.file_writer import GENERATED_SOURCES
 from .services.logger_setup import setup_logging
+from .services.run_report import RunReport, start_report
+from .services.yaml_loader import get_spec, reset_spec, set_spec_path
 from .yaml_processor import process_endpoints
 
 
-def generate_client():
+def generate_client(
+    format_sources: bool = True,
+    spec_path: str = None,
+    compact: bool = False,
+    models_backend: str = MODELS_BACKEND_PYDANTIC,
+) -> RunReport:
+    """Генерирует клиент и возвращает отчет о запуске.
+
+    В отчете для каждой стадии записаны время, процессорное время и пиковый
+    RSS, а также счетчики операций, схем и записанных модулей.
+    compact включает компактный режим request_methods: таблица операций
+    и общий исполнитель вместо полного кода в каждом методе.
+    models_backend - бэкенд моделей ответов: pydantic или dataclass
+    (dataclass(slots=True) с декодером из generator2_full/structs.py).
+    """
     logger = setup_logging('client_generator')
+    report = start_report()
+    # Буфер мог остаться от прошлого запуска в этом же процессе.
+    GENERATED_SOURCES.clear()
+    if spec_path:
+        set_spec_path(spec_path)
+    reset_spec()
+    set_models_backend(models_backend)
 
     try:
-        process_endpoints()
+        with report.stage('load_spec'):
+            get_spec()
+        with report.stage('models'):
+            process_endpoints()
     except Exception as ex:
         logger.critical('Unable to create pydantic models! '
                         f'Error: {ex}')
 
     try:
-        generate()
+        with report.stage('request_methods'):
+            generate(compact)
     except Exception as ex:
         logger.critical('Unable to create endpoints! '
                         f'Error: {ex}')
 
-    dir_path = (
-        os.path.dirname(os.path.realpath(__file__)) +
-        f'/{GENERATED_CLIENT_FOLDER}'
-    )
-    logger.debug(f'Working directory: {dir_path}')
     try:
-        subprocess.run(
-            ['black', f'{dir_path}/models', '--line-length', '79'], check=True
-        )
-        subprocess.run(
-            [
-                'black',
-                f'{dir_path}/request_methods.py',
-                '--line-length',
-                '79'
-            ],
-            check=True
-        )
-        logger.debug('Finished code formatting!')
-        subprocess.run(
-            [
-                'ruff',
-                'check',
-                f'{dir_path}/models',
-                '--fix',
-                '--silent',
-            ]
-        )
-        subprocess.run(
-            [
-                'ruff',
-                'check',
-                f'{dir_path}/request_methods.py',
-                '--fix',
-                '--silent'
-            ]
-        )
-        logger.debug('Finished code fix with ruff!')
+        with report.stage('write'):
+            # Модули удаленных операций удаляются, только если клиент
+            # сгенерирован без ошибок и буфер содержит все модули.
+            write_generated_sources(
+                format_sources, remove_orphans=not report.errors,
+            )
     except Exception as ex:
-        logger.error(f'Unable to format or fix code: {ex}')
+        logger.error(f'Unable to format or write code: {ex}')
+    logger.debug(report.format_table())
+    return report
 
 
 if __name__ == '__main__':
-    generate_client()
+    parser = argparse.ArgumentParser(
+        description='Генерация клиента API мессенджера "Пачка".')
+    parser.add_argument(
+        '--no-format', action='store_true',
+        help='Записать сгенерированный код без форматирования black.')
+    parser.add_argument(
+        '--spec',
+        help='Путь к спецификации openapi.yaml или openapi.json.')
+    parser.add_argument(
+        '--compact', action='store_true',
+        help='Сгенерировать таблицу операций и общий исполнитель запросов '
+             'вместо полного кода в каждом методе.')
+    parser.add_argument(
+        '--models-backend', choices=MODELS_BACKENDS,
+        default=MODELS_BACKEND_PYDANTIC,
+        help='Бэкенд моделей ответов: pydantic или компактные '
+             'dataclass(slots=True) со сгенерированным декодером.')
+    parser.add_argument(
+        '--report-json',
+        help='Записать отчет о запуске (время, память, счетчики) в JSON.')
+    parser.add_argument(
+        '--max-seconds', type=float,
+        help='Завершиться с ошибкой, если генерация шла дольше.')
+    args = parser.parse_args()
+    report = generate_client(
+        format_sources=not args.no_format, spec_path=args.spec,
+        compact=args.compact, models_backend=args.models_backend)
+    print(report.format_table())
+    if args.report_json:
+        report.write_json(args.report_json)
+    sys.exit(report.check(args.max_seconds))
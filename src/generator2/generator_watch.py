@@ -0,0 +1,157 @@
+import argparse
+import os
+import sys
+import time
+from collections.abc import Iterator
+
+from .generator_starter import generate_client
+from .services.constants import MODELS_BACKENDS, MODELS_BACKEND_PYDANTIC
+from .services.logger_setup import setup_logging
+from .services.yaml_loader import get_spec_path, set_spec_path
+
+try:
+    import watchfiles
+except ImportError:  # pragma: no cover
+    watchfiles = None
+
+POLL_INTERVAL = 0.2
+DEBOUNCE = 0.3
+
+logger = setup_logging('generator_watch')
+
+
+def get_mtime(path: str) -> int:
+    """Возвращает время изменения файла или None, если файла нет."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def poll_changes(
+    path: str, poll_interval: float, debounce: float,
+) -> Iterator[None]:
+    """Опрашивает файл и отдает событие после окончания серии изменений.
+
+    Событие выдается, когда время изменения файла перестает меняться
+    в течение debounce секунд.
+    """
+    last_mtime = get_mtime(path)
+    while True:
+        time.sleep(poll_interval)
+        mtime = get_mtime(path)
+        if mtime is None or mtime == last_mtime:
+            continue
+        while True:
+            time.sleep(debounce)
+            settled_mtime = get_mtime(path)
+            if settled_mtime == mtime:
+                break
+            mtime = settled_mtime
+        last_mtime = mtime
+        yield
+
+
+def notify_changes(path: str, debounce: float) -> Iterator[None]:
+    """Отдает события изменения файла через inotify/FSEvents (watchfiles).
+
+    Следится за каталогом файла, так как редакторы часто сохраняют файл
+    через переименование временного.
+    """
+    path = os.path.realpath(path)
+    for changes in watchfiles.watch(
+        os.path.dirname(path), debounce=int(debounce * 1000),
+    ):
+        if any(os.path.realpath(changed) == path for _, changed in changes):
+            yield
+
+
+def regenerate(
+    format_sources: bool,
+    compact: bool = False,
+    models_backend: str = MODELS_BACKEND_PYDANTIC,
+) -> None:
+    """Перегенерирует клиент и печатает время запуска или ошибки."""
+    report = generate_client(
+        format_sources, compact=compact, models_backend=models_backend)
+    if report.errors:
+        message = (
+            f'[{time.strftime("%H:%M:%S")}] Client regeneration failed:\n'
+            + '\n'.join(f'  {error}' for error in report.errors)
+        )
+        logger.error(message)
+        print(message, file=sys.stderr)
+        return
+    counters = report.counters
+    message = (
+        f'[{time.strftime("%H:%M:%S")}] Client regenerated in '
+        f'{report.as_dict()["wall_seconds"]:.3f}s '
+        f'(written: {counters.get("modules_written", 0)}, '
+        f'unchanged: {counters.get("modules_unchanged", 0)}, '
+        f'formatting: {counters.get("format_seconds", 0):.3f}s)'
+    )
+    logger.info(message)
+    print(message)
+
+
+def watch(
+    format_sources: bool = True,
+    poll_interval: float = POLL_INTERVAL,
+    debounce: float = DEBOUNCE,
+    use_polling: bool = False,
+    compact: bool = False,
+    models_backend: str = MODELS_BACKEND_PYDANTIC,
+) -> None:
+    """Следит за файлом спецификации и перегенерирует клиент при изменениях.
+
+    Процесс не завершается между запусками: модули генератора уже
+    импортированы, разобранная спецификация и хэши модулей хранятся в
+    памяти и в .generator_cache/, а на диск попадают только изменившиеся
+    модули.
+    """
+    path = get_spec_path()
+    regenerate(format_sources, compact, models_backend)
+    if watchfiles is None or use_polling:
+        changes = poll_changes(path, poll_interval, debounce)
+    else:
+        changes = notify_changes(path, debounce)
+    print(f'Watching {path} for changes, press Ctrl+C to stop.')
+    for _ in changes:
+        regenerate(format_sources, compact, models_backend)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Перегенерация клиента при изменении спецификации.')
+    parser.add_argument(
+        '--spec',
+        help='Путь к спецификации openapi.yaml или openapi.json.')
+    parser.add_argument(
+        '--no-format', action='store_true',
+        help='Записывать сгенерированный код без форматирования black.')
+    parser.add_argument(
+        '--debounce', type=float, default=DEBOUNCE,
+        help='Сколько секунд файл должен не меняться перед перегенерацией.')
+    parser.add_argument(
+        '--compact', action='store_true',
+        help='Компактный режим: таблица операций и общий исполнитель.')
+    parser.add_argument(
+        '--models-backend', choices=MODELS_BACKENDS,
+        default=MODELS_BACKEND_PYDANTIC,
+        help='Бэкенд моделей ответов: pydantic или dataclass.')
+    parser.add_argument(
+        '--poll', action='store_true',
+        help='Опрашивать файл вместо уведомлений файловой системы.')
+    args = parser.parse_args()
+    if args.spec:
+        set_spec_path(args.spec)
+    try:
+        watch(
+            format_sources=not args.no_format,
+            debounce=args.debounce,
+            use_polling=args.poll,
+            compact=args.compact,
+            models_backend=args.models_backend,
+        )
+    except KeyboardInterrupt:
+        pass
@@ -1,49 +1,78 @@
-import os
 import re
 import textwrap
 from typing import Union
 
 from httpx import codes
-from openapi_parser import parse
-from openapi_parser.specification import (DataType, Operation, Parameter, Path,
-                                          Specification)
-
-from .services.constants import (DEFAULT_VALUE_SORT_FIELD,
-                                 GENERATED_CLIENT_FOLDER, PARAM_DEFAULT_KEY,
+from openapi_parser.specification import (ContentType, DataType, Operation,
+                                          Parameter, Path, Specification)
+
+from .services.constants import (DEFAULT_RETRIES, DEFAULT_TIMEOUT,
+                                 DEFAULT_TIMEOUTS, DEFAULT_VALUE_SORT_FIELD,
+                                 IDEMPOTENT_EXTENSION, IDEMPOTENT_METHODS,
+                                 LINE_LENGTH,
+                                 PARAM_DEFAULT_KEY,
                                  PARAM_LOCATION_PATH, PARAM_LOCATION_QUERY,
                                  PARAM_NAME_SORT, PARAM_NAME_SORT_FIELD,
-                                 PARAM_TYPE_KEY, PREFIX_REQUEST,
-                                 PREFIX_RESPONSE, SCHEMA_SORT_ID,
-                                 SPECIFICATION_FILE_NAME, TYPE_SORT_FIELD,
-                                 TEMPLATE_CLASS_REQUEST_METHODS)
-
-
-def format_path_params(param_path: dict[str, Union[str, dict]]) -> str:
-    """Форматирует параметры пути для использования в функции."""
-    return (
-        ", ".join(
-            [f"'{name}': {name}" for name in param_path]
-        ) if param_path else ""
-    )
-
-
-def format_query_params(param_query: dict[str, Union[str, dict]]) -> str:
-    """Форматирует параметры запроса для использования в функции."""
-    return ", ".join([
-        f"{name}={name}" for name in param_query.keys()
-    ]) if param_query else ""
+                                 PARAM_TYPE_KEY, LIST_RESPONSE_KEY,
+                                 OPERATION_EXTENSION, PREFIX_REQUEST,
+                                 PREFIX_RESPONSE, RETRIES_EXTENSION,
+                                 SCHEMA_SORT_ID, SPEC_EXTENSION_IDEMPOTENT,
+                                 SPEC_EXTENSION_RETRY, SPEC_EXTENSION_TIMEOUT,
+                                 STREAM_METHOD_PREFIX,
+                                 TYPE_SORT_FIELD, TYPED_DICT_SUFFIX,
+                                 TEMPLATE_CLASS_COMPACT_REQUEST_METHODS,
+                                 TEMPLATE_CLASS_REQUEST_METHODS,
+                                 TEMPLATE_COMPACT_IMPORTS,
+                                 TEMPLATE_TYPE_CHECKING_IMPORTS)
+from .services.code_formatter import (add_trailing_comma,
+                                      write_generated_sources)
+from .services.file_writer import write_to_file
+from .services.run_report import get_report
+from .services.yaml_loader import get_spec_path, load_specification
+
+IMPORT_LINE_PATTERN = re.compile(r'^ *from \S+ import .*$', re.MULTILINE)
+SIGNATURE_PATTERN = re.compile(r'async def .*')
 
 
 def generate_url_template(
         url: str, param_path: dict[str, Union[str, dict]]
 ) -> str:
-    """Генерирует строку с форматированным URL для функции."""
+    """Генерирует строку с URL для функции.
+
+    Параметры пути подставляются f-строкой, собранной при генерации,
+    без вызова format_url и str.format во время запроса.
+    """
     if param_path:
-        path_params = format_path_params(param_path)
-        return f"url = await self.format_url('{url}', {{{path_params}}})"
+        return f"url = f'{url}'"
     return f"url = '{url}'"
 
 
+def generate_query_template(
+        param_query: dict[str, Union[str, dict]], indent: int = 12,
+) -> str:
+    """Генерирует код, собирающий параметры строки запроса.
+
+    В словарь попадают только переданные параметры; sort и sort_field
+    сразу превращаются в ключ sort[<поле>], без filter_query_params.
+    """
+    if not param_query:
+        return ""
+    separator = "\n" + " " * indent
+    lines = ["query_params = {}"]
+    for name in param_query:
+        if name in {PARAM_NAME_SORT, PARAM_NAME_SORT_FIELD}:
+            continue
+        lines.append(f"if {name} is not None:")
+        lines.append(f"    query_params['{name}'] = {name}")
+    if PARAM_NAME_SORT in param_query:
+        lines.append(f"if {PARAM_NAME_SORT} is not None:")
+        lines.append(
+            f"    query_params[f'sort[{{{PARAM_NAME_SORT_FIELD}}}]'] = "
+            f"{PARAM_NAME_SORT}",
+        )
+    return separator + separator.join(lines)
+
+
 def generate_function_params(
     param_path: dict[str, Union[str, dict]] = None,
     param_query: dict[str, Union[str, dict]] = None,
@@ -74,23 +103,105 @@ def generate_function_params(
     return ", ".join(["self"] + function_params)
 
 
+def get_operation_policy(operation: Operation) -> tuple[float, int, bool]:
+    """Возвращает таймаут, число повторов и идемпотентность операции.
+
+    По умолчанию они следуют из метода HTTP (GET, PUT, DELETE
+    идемпотентны и повторяются DEFAULT_RETRIES раз, POST - нет),
+    расширения x-timeout, x-retry и x-idempotent операции в спецификации
+    их переопределяют. Неидемпотентная операция не повторяется даже с
+    x-retry: повтор POST может создать дубликат.
+    """
+    method = operation.method.value
+    extensions = operation.extensions or {}
+    timeout = float(extensions.get(
+        SPEC_EXTENSION_TIMEOUT, DEFAULT_TIMEOUTS.get(method, DEFAULT_TIMEOUT),
+    ))
+    idempotent = bool(extensions.get(
+        SPEC_EXTENSION_IDEMPOTENT, method in IDEMPOTENT_METHODS,
+    ))
+    retries = int(extensions.get(SPEC_EXTENSION_RETRY, DEFAULT_RETRIES))
+    return timeout, retries if idempotent else 0, idempotent
+
+
+def get_extensions(
+    name_func: str, policy: tuple[float, int, bool] = None,
+) -> str:
+    """Возвращает аргументы extensions и timeout запроса httpx.
+
+    Имя метода и подсказки повтора для слоев транспорта, таймаут операции.
+    """
+    if policy is None:
+        return f"extensions={{'{OPERATION_EXTENSION}': '{name_func}'}}"
+    timeout, retries, idempotent = policy
+    return (
+        f"extensions={{'{OPERATION_EXTENSION}': '{name_func}', "
+        f"'{IDEMPOTENT_EXTENSION}': {idempotent}, "
+        f"'{RETRIES_EXTENSION}': {retries}}}, timeout={timeout}"
+    )
+
+
 def generate_request_handling(
     method_request: str,
+    name_func: str,
     name_request_scheme: str = None,
     param_query: dict[str, Union[str, dict]] = None,
+    json_body: bool = True,
+    policy: tuple[float, int, bool] = None,
+    has_response: bool = True,
 ) -> str:
-    """Генерирует логику отправки запроса в зависимости от параметров."""
-    if name_request_scheme:
-        return (
-            f'response = await client.{method_request}'
-            '(url, json=data.model_dump())'
+    """Генерирует логику отправки запроса в зависимости от параметров.
+
+    JSON тело запроса передается в content с заголовком Content-Type,
+    его готовит код из generate_body_template. Если ответ не разбирается
+    (has_response=False), он не сохраняется в переменную.
+    """
+    extensions = get_extensions(name_func, policy)
+    if name_request_scheme and json_body:
+        arguments = (
+            f'url, content=content, headers=JSON_HEADERS, {extensions}'
         )
-    if param_query:
+    elif name_request_scheme:
+        arguments = f'url, json=data.model_dump(), {extensions}'
+    elif param_query:
+        arguments = f'url, params=query_params, {extensions}'
+    else:
+        arguments = f'url, {extensions}'
+    assignment = 'response = ' if has_response else ''
+    return add_trailing_comma(
+        f'{assignment}await client.{method_request}({arguments})', 12,
+    )
+
+
+def generate_body_template(
+    name_request_scheme: str = None, json_body: bool = True,
+) -> str:
+    """Генерирует сериализацию JSON тела запроса.
+
+    Модель сериализуется pydantic сразу в JSON без незаданных полей.
+    Обычный словарь (TypedDict) проверяется по модели запроса и
+    сериализуется без создания объектов модели.
+    """
+    if not (name_request_scheme and json_body):
+        return ''
+    return (
+        '\n        if isinstance(data, Mapping):\n'
+        f'            content = encode_request({name_request_scheme}, data)\n'
+        '        else:\n'
+        '            content = data.model_dump_json(exclude_unset=True)'
+    )
+
+
+def get_request_annotation(
+    name_request_scheme: str = None, json_body: bool = True,
+) -> str:
+    """Возвращает аннотацию тела запроса: модель или ее TypedDict."""
+    if name_request_scheme and json_body:
         return (
-            f'response = await client.{method_request}'
-            '(url, params=query_params)'
+            f'{name_request_scheme} | '
+            f'{name_request_scheme}{TYPED_DICT_SUFFIX}'
         )
-    return f"response = await client.{method_request}(url)"
+    return name_request_scheme
 
 
 def generate_response_handling(
@@ -99,21 +210,50 @@ def generate_response_handling(
 ) -> str:
     """Генерирует логику обработки ответа от сервера."""
     response_handling = ""
-    if name_response_scheme:
-        response_handling += (
-            '\n            if response.is_success:\n'
-            f'              return {name_response_scheme}'
-            '.model_validate_json(response.text)'
-        )
-    if name_error_scheme:
-        response_handling += (
-            '\n            if response.is_client_error:\n'
-            f'              return {name_error_scheme}'
-            '.model_validate_json(response.text)'
-        )
+    for condition, name_scheme in (
+        ('is_success', name_response_scheme),
+        ('is_client_error', name_error_scheme),
+    ):
+        if name_scheme:
+            response_handling += (
+                f'\n            if response.{condition}:\n'
+                '                ' + add_trailing_comma(
+                    f'return {name_scheme}'
+                    '.model_validate_json(response.text)', 16,
+                )
+            )
+    if response_handling:
+        response_handling += '\n            return None'
     return response_handling
 
 
+def select_imports(
+        import_lines: list[str], code: str, indent: int = 8,
+) -> str:
+    """Возвращает импорты моделей, имена которых используются в коде.
+
+    Строки импортов в самом коде не учитываются. Имена одного модуля
+    объединяются в один импорт, длинный импорт разбивается по одному
+    имени на строке, как его оформляет ruff (F401, I001).
+    """
+    code = IMPORT_LINE_PATTERN.sub('', code)
+    modules = {}
+    for import_line in import_lines or []:
+        module, name = import_line.split(' import ')
+        if re.search(rf'\b{name}\b', code):
+            modules.setdefault(module, set()).add(name)
+    separator = '\n' + ' ' * indent
+    imports = ''
+    for module, names in sorted(modules.items()):
+        import_line = f'{module} import {", ".join(sorted(names))}'
+        if indent + len(import_line) > LINE_LENGTH:
+            import_line = f'{module} import (' + ''.join(
+                f'{separator}    {name},' for name in sorted(names)
+            ) + f'{separator})'
+        imports += separator + import_line
+    return imports
+
+
 def get_template_methods(
         name_func: str,
         url: str,
@@ -124,49 +264,236 @@ def get_template_methods(
         name_request_scheme: str = None,
         name_response_scheme: str = None,
         name_error_scheme: str = None,
+        import_template: list[str] = None,
+        json_body: bool = True,
+        policy: tuple[float, int, bool] = None,
 ) -> str:
-    """Возвращает шаблон генерируемой функции."""
+    """Возвращает шаблон генерируемой функции.
+
+    Модели импортируются внутри функции: модуль модели загружается
+    при первом вызове метода, а не при импорте класса Bot.
+    """
     function_params = generate_function_params(
-        param_path, param_query, name_request_scheme
+        param_path, param_query,
+        get_request_annotation(name_request_scheme, json_body),
     )
+    body_code = generate_body_template(name_request_scheme, json_body)
     format_url = generate_url_template(url, param_path)
-    filter_params = format_query_params(param_query)
-    request_handling = generate_request_handling(
-        method_request, name_request_scheme, param_query
-    )
     response_handling = generate_response_handling(
         name_response_scheme, name_error_scheme
     )
-    response_annotation = (
-        f" -> {name_response_scheme}" if name_response_scheme else ""
+    request_handling = generate_request_handling(
+        method_request, name_func, name_request_scheme, param_query,
+        json_body, policy, bool(response_handling),
     )
-    filter_params_code = (
-        f"\n            query_params = await self.filter_query_params"
-        f"({filter_params})"
-        if filter_params else ""
+    response_annotation = f" -> {name_response_scheme or None}"
+    filter_params_code = generate_query_template(param_query)
+    body = f"""{body_code}
+        client = await self.get_client()
+        async with client:
+            {format_url}{filter_params_code}
+            {request_handling}{response_handling}
+"""
+    header = add_trailing_comma(
+        f'async def {name_func}({function_params}){response_annotation}:', 4,
     )
-
     return f"""
 
-    async def {name_func}({function_params}){response_annotation}:
-        {docstring}
+    {header}
+        {docstring}{select_imports(import_template, body)}{body}"""
+
+
+def get_stream_method_header(name_func: str, function_params: str) -> str:
+    """Возвращает объявление и докстринг потокового метода iter_<метод>."""
+    header = add_trailing_comma(
+        f"async def {STREAM_METHOD_PREFIX}{name_func}"
+        f"({function_params}) -> AsyncIterator:", 4,
+    )
+    return (
+        f'\n\n    {header}'
+        f'\n        """Потоковый вариант {name_func}: '
+        'элементы data по одному."""'
+    )
+
+
+def get_template_stream_methods(
+        name_func: str,
+        url: str,
+        method_request: str,
+        param_path: dict[str, Union[str, dict]] = None,
+        param_query: dict[str, Union[str, dict]] = None,
+        name_response_scheme: str = None,
+        name_error_scheme: str = None,
+        import_template: list[str] = None,
+        policy: tuple[float, int, bool] = None,
+) -> str:
+    """Возвращает шаблон потокового варианта метода списка iter_<метод>.
+
+    Тело ответа читается по частям, элементы массива data проверяются
+    и возвращаются по одному, поэтому память не зависит от per.
+    """
+    function_params = generate_function_params(param_path, param_query)
+    format_url = generate_url_template(url, param_path)
+    filter_params_code = generate_query_template(param_query)
+    arguments = [
+        'client', repr(method_request.upper()), 'url', name_response_scheme,
+    ]
+    if name_error_scheme:
+        arguments.append(name_error_scheme)
+    if param_query:
+        arguments.append('params=query_params')
+    arguments.append(get_extensions(name_func, policy))
+
+    stream_call = add_trailing_comma(
+        f"async for item in stream_items({', '.join(arguments)}):", 12,
+    )
+    body = f"""
         client = await self.get_client()
         async with client:
             {format_url}{filter_params_code}
-            {request_handling}{response_handling}
-            return None
+            {stream_call}
+                yield item
+"""
+    header = get_stream_method_header(name_func, function_params)
+    return header + select_imports(import_template, body) + body
+
+
+def get_model_ref(
+        import_template: list[str], name_scheme: str = None,
+) -> str:
+    """Возвращает ссылку на модель (модуль, класс) для таблицы операций."""
+    if not name_scheme:
+        return None
+    for import_line in import_template:
+        module, schema = import_line[len('from .models.'):].split(' import ')
+        if schema == name_scheme:
+            return repr((module, schema))
+    return None
+
+
+def get_template_operation(
+        name_func: str,
+        url: str,
+        method_request: str,
+        param_path: dict[str, Union[str, dict]] = None,
+        param_query: dict[str, Union[str, dict]] = None,
+        import_template: list[str] = None,
+        name_request_scheme: str = None,
+        name_response_scheme: str = None,
+        name_error_scheme: str = None,
+        json_body: bool = True,
+        policy: tuple[float, int, bool] = None,
+) -> str:
+    """Возвращает строку таблицы операций компактного режима."""
+    arguments = [repr(name_func), repr(method_request.upper()), repr(url)]
+    if param_path:
+        arguments.append(f'path_params={tuple(param_path)!r}')
+    if param_query:
+        arguments.append(f'query_params={tuple(param_query)!r}')
+    if name_request_scheme and not json_body:
+        arguments.append('json_body=False')
+    for argument, name_scheme in (
+        ('request_model', name_request_scheme),
+        ('response_model', name_response_scheme),
+        ('error_model', name_error_scheme),
+    ):
+        model_ref = get_model_ref(import_template or [], name_scheme)
+        if model_ref:
+            arguments.append(f'{argument}={model_ref}')
+    if policy is not None:
+        timeout, retries, idempotent = policy
+        arguments.append(
+            f'timeout={timeout}, retries={retries}, idempotent={idempotent}',
+        )
+    return f"\n    '{name_func}': Operation({', '.join(arguments)}),"
+
+
+def get_template_compact_methods(
+        name_func: str,
+        url: str,
+        docstring: str,
+        param_path: dict[str, Union[str, dict]] = None,
+        param_query: dict[str, Union[str, dict]] = None,
+        name_request_scheme: str = None,
+        name_response_scheme: str = None,
+        json_body: bool = True,
+) -> str:
+    """Возвращает шаблон тонкой обертки компактного режима.
+
+    Обертка передает параметры общему исполнителю execute_operation.
+    """
+    function_params = generate_function_params(
+        param_path, param_query,
+        get_request_annotation(name_request_scheme, json_body),
+    )
+    response_annotation = f" -> {name_response_scheme or None}"
+    arguments = [f"OPERATIONS['{name_func}']"]
+    if name_request_scheme:
+        arguments.append('data=data')
+    if param_path:
+        arguments.append(f"url=f'{url}'")
+    if param_query:
+        arguments.append(f"query=({', '.join(param_query)},)")
+
+    header = add_trailing_comma(
+        f'async def {name_func}({function_params}){response_annotation}:', 4,
+    )
+    call = add_trailing_comma(
+        f"return await self.execute_operation({', '.join(arguments)})", 8,
+    )
+    return f"""
+
+    {header}
+        {docstring}
+        {call}
 """
 
 
-def format_docstring(summary: str, description: str, max_width: int = 79):
+def get_template_compact_stream_methods(
+        name_func: str,
+        url: str,
+        param_path: dict[str, Union[str, dict]] = None,
+        param_query: dict[str, Union[str, dict]] = None,
+) -> str:
+    """Возвращает шаблон потокового варианта метода списка.
+
+    Метод компактного режима работает поверх
+    OperationExecutor.stream_operation.
+    """
+    function_params = generate_function_params(param_path, param_query)
+    arguments = [f"OPERATIONS['{name_func}']"]
+    if param_path:
+        arguments.append(f"url=f'{url}'")
+    if param_query:
+        arguments.append(f"query=({', '.join(param_query)},)")
+
+    stream_call = add_trailing_comma(
+        f"async for item in self.stream_operation({', '.join(arguments)}):", 8,
+    )
+    return get_stream_method_header(name_func, function_params) + f"""
+        {stream_call}
+            yield item
+"""
+
+
+def format_docstring(
+        summary: str, description: str, max_width: int = 79, indent: int = 8,
+) -> str:
     """Редактирует длины строк докстринг
     генерируемых функций в соответствиие с PEP8
     """
-    formatted_summary = "\n".join(textwrap.wrap(summary, width=max_width))
-    formatted_description = "\n".join(
-        textwrap.wrap(description, width=max_width),
+    width = max_width - indent
+    if summary and not summary.endswith(('.', '!', '?')):
+        summary += '.'
+    separator = "\n" + " " * indent
+    formatted_summary = separator.join(textwrap.wrap(summary, width=width))
+    formatted_description = separator.join(
+        textwrap.wrap(description, width=width),
+    )
+    return (
+        f'"""{formatted_summary}\n{separator}{formatted_description}'
+        f'{separator}"""'
     )
-    return f'"""{formatted_summary}\n\n{formatted_description}"""'
 
 
 def format_name_func(operation_id: str):
@@ -237,37 +564,43 @@ def process_operation(operation: Operation) -> tuple[str]:
                 schema=name_request_scheme
             )
         )
+    response_code = None
+    error_code = None
     for response in operation.responses:
         if codes.is_success(response.code) and response.content:
-            name_response_scheme = (
-                f'Response{operation_id.capitalize()}'
-                f'{operation.method.value.capitalize()}'
-                f'{str(response.code).capitalize()}'
-            )
-            import_template.append(
-                import_string_generation(
-                    prefix=PREFIX_RESPONSE,
-                    operation_id=operation_id,
-                    schema=name_response_scheme,
-                    code=response.code,
-                    method=method,
-                )
-            )
+            response_code = response.code
         if codes.is_client_error(response.code):
-            name_error_scheme = (
-                f'Response{operation_id.capitalize()}'
-                f'{operation.method.value.capitalize()}'
-                f'{str(response.code).capitalize()}'
+            error_code = response.code
+    if response_code is not None:
+        name_response_scheme = (
+            f'Response{operation_id.capitalize()}'
+            f'{operation.method.value.capitalize()}'
+            f'{str(response_code).capitalize()}'
+        )
+        import_template.append(
+            import_string_generation(
+                prefix=PREFIX_RESPONSE,
+                operation_id=operation_id,
+                schema=name_response_scheme,
+                code=response_code,
+                method=method,
             )
-            import_template.append(
-                import_string_generation(
-                    prefix=PREFIX_RESPONSE,
-                    operation_id=operation_id,
-                    schema=name_error_scheme,
-                    code=response.code,
-                    method=method,
-                )
+        )
+    if error_code is not None:
+        name_error_scheme = (
+            f'Response{operation_id.capitalize()}'
+            f'{operation.method.value.capitalize()}'
+            f'{str(error_code).capitalize()}'
+        )
+        import_template.append(
+            import_string_generation(
+                prefix=PREFIX_RESPONSE,
+                operation_id=operation_id,
+                schema=name_error_scheme,
+                code=error_code,
+                method=method,
             )
+        )
 
     return (
         method, operation_id, operation.summary, operation.description,
@@ -276,6 +609,34 @@ def process_operation(operation: Operation) -> tuple[str]:
     )
 
 
+def is_json_body(operation: Operation) -> bool:
+    """Проверяет, передается ли тело запроса операции в формате JSON."""
+    if not operation.request_body:
+        return False
+    return any(
+        content.type == ContentType.JSON
+        for content in operation.request_body.content
+    )
+
+
+def is_list_operation(operation: Operation) -> bool:
+    """Проверяет, возвращает ли GET операция список объектов в data."""
+    if operation.method.value != 'get':
+        return False
+    for response in operation.responses:
+        if not (codes.is_success(response.code) and response.content):
+            continue
+        for content in response.content:
+            for schema_property in getattr(content.schema, 'properties', []):
+                if (
+                    schema_property.name == LIST_RESPONSE_KEY
+                    and schema_property.schema.type == DataType.ARRAY
+                    and schema_property.schema.items.type == DataType.OBJECT
+                ):
+                    return True
+    return False
+
+
 def process_parameters(parameters: list[Parameter]) -> tuple[dict, dict]:
     """Обрабатывает параметры запроса и возвращает два словаря:
     - param_path: параметры, относящиеся к пути (path).
@@ -309,15 +670,20 @@ def process_parameters(parameters: list[Parameter]) -> tuple[dict, dict]:
     return param_path, param_query
 
 
-def template_generation(paths: list[Path]) -> tuple[list[str]]:
+def template_generation(
+        paths: list[Path], compact: bool = False,
+) -> tuple[list[str]]:
     """Собирает параметры запроса всех paths спецификации
     передает их в функицю get_template_methods
     Возвращает кортеж состоящий из:
     - templates список шаблонов методов запроса
     - import_templates список шаблонов импортов
+    - operation_templates строки таблицы операций (только в компактном
+      режиме, в нем методы - тонкие обертки над execute_operation)
     """
     templates = []
     import_templates = []
+    operation_templates = []
 
     for path in paths:
         url = path.url
@@ -340,7 +706,60 @@ def template_generation(paths: list[Path]) -> tuple[list[str]]:
             docstring = format_docstring(summary, description)
 
             param_path, param_query = process_parameters(operation.parameters)
+            json_body = is_json_body(operation)
+            policy = get_operation_policy(operation)
+            if policy[1]:
+                get_report().count('retry_operations')
+            if json_body:
+                import_templates.append(
+                    import_string_generation(
+                        prefix=PREFIX_REQUEST,
+                        operation_id=operation_id,
+                        schema=f'{name_request_scheme}{TYPED_DICT_SUFFIX}',
+                    ),
+                )
 
+            get_report().count('request_methods')
+            list_operation = name_response_scheme and is_list_operation(
+                operation,
+            )
+            if list_operation:
+                get_report().count('stream_methods')
+            if compact:
+                operation_templates.append(
+                    get_template_operation(
+                        function_name,
+                        url,
+                        method_request,
+                        param_path,
+                        param_query,
+                        import_template,
+                        name_request_scheme,
+                        name_response_scheme,
+                        name_error_scheme,
+                        json_body,
+                        policy,
+                    ),
+                )
+                templates.append(
+                    get_template_compact_methods(
+                        function_name,
+                        url,
+                        docstring,
+                        param_path,
+                        param_query,
+                        name_request_scheme,
+                        name_response_scheme,
+                        json_body,
+                    ),
+                )
+                if list_operation:
+                    templates.append(
+                        get_template_compact_stream_methods(
+                            function_name, url, param_path, param_query,
+                        ),
+                    )
+                continue
             templates.append(
                 get_template_methods(
                     function_name,
@@ -351,53 +770,98 @@ def template_generation(paths: list[Path]) -> tuple[list[str]]:
                     param_query,
                     name_request_scheme,
                     name_response_scheme,
-                    name_error_scheme
+                    name_error_scheme,
+                    import_template,
+                    json_body,
+                    policy,
                 ),
             )
+            if list_operation:
+                templates.append(
+                    get_template_stream_methods(
+                        function_name,
+                        url,
+                        method_request,
+                        param_path,
+                        param_query,
+                        name_response_scheme,
+                        name_error_scheme,
+                        import_template,
+                        policy,
+                    ),
+                )
 
-    return templates, import_templates
-
+    return templates, import_templates, operation_templates
 
-def get_obj_openapi_spec(
-        path_to_file=SPECIFICATION_FILE_NAME,
-) -> Specification:
-    """Читает спецификацию openapi из файла openapi.yaml и возвращает
-    спецификацию в виде объекта Specification библиотеки openapi_parser
-    """
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    full_path = os.path.join(base_dir, path_to_file)
 
-    with open(full_path, 'r', encoding='utf-8') as file:
-        spec_openapi = file.read()
+def get_obj_openapi_spec(path_to_file: str = None) -> Specification:
+    """Читает спецификацию openapi (YAML или JSON).
 
-    return parse(spec_string=spec_openapi)
+    Возвращает объект Specification библиотеки openapi_parser. Объект
+    берется из кэша yaml_loader, поэтому повторные запуски не разбирают
+    спецификацию заново.
+    """
+    return load_specification(path_to_file or get_spec_path())
 
 
 def generation_class_bot(
     templates: list,
     import_templates: list,
-    file=f'./{__package__}/{GENERATED_CLIENT_FOLDER}/request_methods.py',
+    operation_templates: list = None,
 ):
-    with open(
-        file, 'w', encoding='utf-8',
-    ) as file:
-        for module_name in import_templates:
-            file.write(f'{module_name}\n')
-        file.write(f'{TEMPLATE_CLASS_REQUEST_METHODS}')
-        for template in templates:
-            file.write(template)
+    """Записывает в буфер генератора модуль request_methods.
 
+    Модуль содержит класс RequestMethods.
+    Импорты моделей в начале модуля нужны только для аннотаций и
+    проверки типов, поэтому они спрятаны под TYPE_CHECKING, а аннотации
+    не вычисляются (from __future__ import annotations). Под TYPE_CHECKING
+    попадают только модели из сигнатур методов.
+    """
+    type_checking_imports = select_imports(
+        import_templates,
+        '\n'.join(SIGNATURE_PATTERN.findall(''.join(templates))),
+        indent=4,
+    )
+    if operation_templates:
+        header = (
+            TEMPLATE_COMPACT_IMPORTS + type_checking_imports
+            + '\n\nOPERATIONS = {' + ''.join(operation_templates) + '\n}\n\n'
+            + TEMPLATE_CLASS_COMPACT_REQUEST_METHODS
+        )
+    else:
+        header = (
+            TEMPLATE_TYPE_CHECKING_IMPORTS + type_checking_imports + '\n\n'
+            + TEMPLATE_CLASS_REQUEST_METHODS
+        )
+    write_to_file(
+        'request_methods',
+        header + ''.join(templates),
+        folder_name='',
+        open_file_mode='w',
+    )
+
+
+def generate(compact: bool = False) -> None:
+    """Генерирует модуль request_methods.
 
-def generate():
+    В компактном режиме (compact=True) вместо полного кода запроса в
+    каждом методе генерируется таблица операций OPERATIONS и тонкие
+    обертки над общим исполнителем OperationExecutor.execute_operation.
+    """
     spec: Specification = get_obj_openapi_spec()
     paths: list[Path] = spec.paths
 
-    templates, import_templates = template_generation(paths)
+    templates, import_templates, operation_templates = template_generation(
+        paths, compact,
+    )
 
     generation_class_bot(
-        templates=templates, import_templates=import_templates
+        templates=templates,
+        import_templates=import_templates,
+        operation_templates=operation_templates,
     )
 
 
 if __name__ == "__main__":
     generate()
+    write_generated_sources()
@@ -1,4 +1,8 @@
-from .services.yaml_loader import YAML_DICT
+from .services.yaml_loader import get_spec
+
+# Схемы компонентов, уже раскрытые при обходе спецификации:
+# id(схема) -> (схема, имя компонента).
+RESOLVED_COMPONENTS: dict[int, tuple[dict, str]] = {}
 
 
 def unite_schemas(schemas: list[dict], schema2: dict):
@@ -29,9 +33,43 @@ def unite_schemas(schemas: list[dict], schema2: dict):
 def load_schema(path_to_schema: str, is_parameter: bool = False) -> dict:
     """Возвращает схему из ссылки."""
     schema_name = path_to_schema.split('/')[-1]
+    components = get_spec().get('components')
     if is_parameter:
-        return YAML_DICT.get('components').get('parameters').get(schema_name)
-    return YAML_DICT.get('components').get('schemas').get(schema_name)
+        return components.get('parameters').get(schema_name)
+    return components.get('schemas').get(schema_name)
+
+
+def get_component_name(schema: dict) -> str:
+    """Возвращает имя схемы из components/schemas, из которой взята схема.
+
+    Схема считается взятой из компонента, если она является ссылкой на
+    компонент (в том числе allOf из одной ссылки) или самим словарем
+    компонента (ссылки заменяются на словари
+    компонентов при обходе спецификации).
+    """
+    if not isinstance(schema, dict):
+        return None
+    if len(schema.get('allOf', [])) == 1:
+        schema = schema['allOf'][0]
+    resolved = RESOLVED_COMPONENTS.get(id(schema))
+    if resolved and resolved[0] is schema:
+        return resolved[1]
+    ref = schema.get('$ref', '')
+    if ref.startswith('#/components/schemas/'):
+        return ref.split('/')[-1]
+    for name, component in get_spec().get('components')['schemas'].items():
+        if component is schema:
+            return name
+    return None
+
+
+def register_component(schema: dict, name: str) -> None:
+    """Запоминает, что раскрытая схема получена из компонента.
+
+    Обход спецификации заменяет ссылки раскрытыми схемами прямо в
+    спецификации, поэтому при следующем обходе ссылки уже нет.
+    """
+    RESOLVED_COMPONENTS[id(schema)] = (schema, name)
 
 
 def new_replace_ref_with_schema(schema: dict):
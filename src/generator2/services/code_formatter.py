@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import pathlib
+import time
+
+from .constants import (
+    FORMAT_CACHE_FILE_NAME,
+    LINE_LENGTH,
+    MODELS_MODULE_PREFIX,
+)
+from .file_writer import GENERATED_SOURCES, get_module_path, safe_open_w
+from .run_report import get_report
+
+try:
+    import black
+except ImportError:  # pragma: no cover
+    black = None
+
+
+def format_code(source: str) -> str:
+    """Форматирует исходный код модуля средствами black без подпроцесса.
+
+    Если black не установлен, код возвращается как есть: генератор и так
+    выдает корректный код с отсортированными импортами.
+    """
+    if black is None:
+        return source
+    return black.format_str(source, mode=black.Mode(line_length=LINE_LENGTH))
+
+
+def add_trailing_comma(
+    line: str, indent: int = 0, closing: str = ')',
+) -> str:
+    """Добавляет запятую перед последней скобкой строки длиннее LINE_LENGTH.
+
+    black разбивает строку с такой запятой по одному элементу на строке
+    и оставляет запятую, поэтому генератор сразу выдает код без замечаний
+    ruff (COM812). Короткие строки возвращаются без изменений.
+    """
+    if indent + len(line) <= LINE_LENGTH:
+        return line
+    position = line.rindex(closing)
+    return f'{line[:position]},{line[position:]}'
+
+
+def load_format_cache() -> dict[str, dict[str, str]]:
+    """Возвращает хэши модулей, записанных прошлым запуском генератора."""
+    try:
+        with open(FORMAT_CACHE_FILE_NAME, encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {
+        key: value for key, value in cache.items() if isinstance(value, dict)
+    }
+
+
+def save_format_cache(cache: dict[str, dict[str, str]]) -> None:
+    """Сохраняет хэши модулей для следующего запуска."""
+    with safe_open_w(FORMAT_CACHE_FILE_NAME, 'w') as f:
+        json.dump(cache, f, indent=1, sort_keys=True)
+
+
+def hash_text(text: str) -> str:
+    """Хэш SHA-256 текста."""
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def hash_file(path: str) -> str | None:
+    """Хэш содержимого файла на диске или None, если файла нет."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return hash_text(f.read())
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def find_orphans(cache: dict, generated: set[str]) -> set[str]:
+    """Модули прошлых запусков, которые генератор больше не создает.
+
+    Это модули из кэша и модули каталога models, которых нет среди
+    сгенерированных в этот раз.
+    """
+    models = get_module_path('', 'models').parent
+    candidates = set(cache) | {
+        str(path) for path in models.glob(f'{MODELS_MODULE_PREFIX}*.py')
+    }
+    return candidates - generated
+
+
+def write_generated_sources(
+    format_sources: bool = True,
+    remove_orphans: bool = False,
+) -> tuple[int, int, float]:
+    """Форматирует и записывает на диск модули из буфера генератора.
+
+    Модуль пропускается, если его неотформатированный исходник совпадает с
+    сохраненным в кэше, а файл на диске не менялся после записи (хэш
+    содержимого совпадает с записанным). remove_orphans удаляет модули
+    прошлых запусков, которых нет в буфере: его включают только после
+    полной генерации клиента.
+    Возвращает кортеж: количество записанных модулей, количество
+    пропущенных модулей и время форматирования в секундах.
+    """
+    cache = load_format_cache()
+    written = []
+    skipped = 0
+    format_time = 0.0
+    for path, chunks in GENERATED_SOURCES.items():
+        source = ''.join(chunks).strip() + '\n'
+        key = str(pathlib.Path(path))
+        source_hash = hash_text(f'{format_sources}:{source}')
+        entry = cache.get(key, {})
+        if (
+            entry.get('source') == source_hash
+            and entry.get('written') == hash_file(key)
+        ):
+            skipped += 1
+            continue
+        if format_sources:
+            start = time.perf_counter()
+            source = format_code(source)
+            format_time += time.perf_counter() - start
+        with safe_open_w(path, 'w') as f:
+            f.write(source)
+        cache[key] = {'source': source_hash}
+        written.append(key)
+        get_report().count('bytes_written', len(source.encode()))
+    for key in written:
+        cache[key]['written'] = hash_file(key)
+    removed = 0
+    if remove_orphans:
+        for key in find_orphans(cache, {
+            str(pathlib.Path(path)) for path in GENERATED_SOURCES
+        }):
+            cache.pop(key, None)
+            if os.path.exists(key):
+                os.remove(key)
+                removed += 1
+    GENERATED_SOURCES.clear()
+    save_format_cache(cache)
+    report = get_report()
+    report.count('modules_written', len(written))
+    report.count('modules_unchanged', skipped)
+    report.count('modules_removed', removed)
+    report.count('format_seconds', round(format_time, 3))
+    return len(written), skipped, format_time
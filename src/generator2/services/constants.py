@@ -19,6 +19,34 @@ ENUM_TYPES = {
     'integer': 'IntEnum',
 }
 
+# Required для TypedDict есть в typing начиная с Python 3.11.
+TYPED_DICT_NAMES = ('Required', 'TypedDict')
+
+MODELS_IMPORTS = (
+    ('dataclasses', ('dataclass', 'field')),
+    ('enum', ('Enum', 'IntEnum', 'StrEnum')),
+    ('typing', ('Any', 'Dict', 'List', 'Literal', 'Optional') + (
+        TYPED_DICT_NAMES if sys.version_info[1] >= 11 else ()
+    )),
+    ('typing_extensions', (
+        TYPED_DICT_NAMES if sys.version_info[1] < 11 else ()
+    )),
+    ('pydantic', ('BaseModel', 'Field')),
+    ('..structs', ('Struct',)),
+)
+
+# Бэкенды моделей ответов: pydantic или dataclass(slots=True) со своим
+# декодером (generator2_full/structs.py). Модели запросов всегда pydantic.
+MODELS_BACKEND_PYDANTIC = 'pydantic'
+MODELS_BACKEND_DATACLASS = 'dataclass'
+MODELS_BACKENDS = (MODELS_BACKEND_PYDANTIC, MODELS_BACKEND_DATACLASS)
+STRUCTS_COMPONENTS_MODELS_FILE_NAME = 'models_components_structs'
+
+TYPED_DICT_SUFFIX = 'Dict'
+TYPED_DICT_KEEP_NAMES = frozenset((
+    'Any', 'Dict', 'List', 'Optional', 'bool', 'float', 'int', 'str',
+))
+
 HTTP_METHODS = (
     'get', 'post', 'put', 'update', 'patch', 'delete',
 )
@@ -35,15 +63,60 @@ PARAM_LOCATION_PATH = 'path'
 
 PREFIX_RESPONSE = 'models_response_'
 PREFIX_REQUEST = 'models_reqBod_'
+COMPONENTS_MODELS_FILE_NAME = 'models_components'
+# Общий префикс сгенерированных модулей каталога models.
+MODELS_MODULE_PREFIX = 'models_'
 
 DEFAULT_VALUE_SORT_FIELD = 'id'
 TYPE_SORT_FIELD = 'str'
 
 BASE_DIR = Path(os.path.dirname(os.path.abspath(__file__))).parent
 LOG_FILE_NAME = os.path.join(BASE_DIR, "client_generator.log")
+CACHE_DIR = os.path.join(BASE_DIR, '.generator_cache')
+SPEC_CACHE_VERSION = 1
+FORMAT_CACHE_FILE_NAME = os.path.join(CACHE_DIR, 'format_cache.json')
+LINE_LENGTH = 79
 
 GENERATED_CLIENT_FOLDER = 'generator2_full'
 
+# Методы списков (data - массив объектов) получают потоковый вариант
+# iter_<метод>, который возвращает элементы по одному.
+LIST_RESPONSE_KEY = 'data'
+STREAM_METHOD_PREFIX = 'iter_'
+# Ключ расширения запроса httpx с именем метода для слоев транспорта.
+OPERATION_EXTENSION = 'operation'
+IDEMPOTENT_EXTENSION = 'idempotent'
+RETRIES_EXTENSION = 'retries'
+# Подсказки операций в спецификации (x-timeout, x-retry, x-idempotent):
+# openapi_parser хранит их в Operation.extensions без префикса x-.
+SPEC_EXTENSION_TIMEOUT = 'timeout'
+SPEC_EXTENSION_RETRY = 'retry'
+SPEC_EXTENSION_IDEMPOTENT = 'idempotent'
+# Таймаут запроса в секундах по методу HTTP, если нет x-timeout.
+DEFAULT_TIMEOUTS = {
+    'get': 10.0,
+    'head': 10.0,
+    'delete': 15.0,
+    'put': 20.0,
+    'patch': 20.0,
+    'post': 30.0,
+}
+DEFAULT_TIMEOUT = 30.0
+IDEMPOTENT_METHODS = frozenset(('get', 'head', 'options', 'put', 'delete'))
+# Повторы идемпотентных операций, если нет x-retry.
+DEFAULT_RETRIES = 2
+
+TEMPLATE_TYPE_CHECKING_IMPORTS = """from __future__ import annotations
+
+from collections.abc import AsyncIterator, Mapping
+from typing import TYPE_CHECKING
+
+from .constants import JSON_HEADERS
+from .fast_path import encode_request
+from .streaming import stream_items
+
+if TYPE_CHECKING:"""
+
 TEMPLATE_CLASS_REQUEST_METHODS = """
 class RequestMethods:
 
@@ -56,3 +129,25 @@ class RequestMethods:
     async def filter_query_params(self):
         pass
 """
+
+TEMPLATE_COMPACT_IMPORTS = """from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from typing import TYPE_CHECKING
+
+from .operations import Operation, OperationExecutor
+
+if TYPE_CHECKING:"""
+
+TEMPLATE_CLASS_COMPACT_REQUEST_METHODS = """
+class RequestMethods(OperationExecutor):
+
+    async def get_client(self):
+        pass
+
+    async def format_url(self):
+        pass
+
+    async def filter_query_params(self):
+        pass
+"""
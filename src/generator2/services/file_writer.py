@@ -5,6 +5,9 @@ import pathlib
 
 from .constants import GENERATED_CLIENT_FOLDER
 
+# Исходники генерируемых модулей, накапливаемые в памяти до записи на диск.
+GENERATED_SOURCES: dict[pathlib.Path, list[str]] = {}
+
 
 def mkdir_p(path):
     try:
@@ -21,17 +24,36 @@ def safe_open_w(path, mode: str):
     return open(path, mode, encoding='utf-8')
 
 
+def get_module_path(
+    file_name: str, folder_name: str = 'models',
+) -> pathlib.Path:
+    """Возвращает путь к генерируемому модулю клиента."""
+    return (
+        pathlib.Path(__file__).parent.parent.resolve()
+        / GENERATED_CLIENT_FOLDER / folder_name / f'{file_name}.py'
+    )
+
+
 def write_to_file(
     file_name: str, text_to_write: str, folder_name: str = 'models',
     open_file_mode: str = 'a'
 ):
-    """Записывает текст в файл."""
-    with safe_open_w(
-        (pathlib.Path(__file__).parent.parent.resolve()
-         / GENERATED_CLIENT_FOLDER / folder_name / f'{file_name}.py'),
-        open_file_mode
-    ) as f:
-        f.write(text_to_write)
+    """Записывает текст в буфер генерируемого модуля.
+
+    Режим 'w' начинает модуль заново, режим 'a' дописывает текст в конец.
+    На диск модули записывает code_formatter.write_generated_sources.
+    """
+    path = get_module_path(file_name, folder_name)
+    if open_file_mode == 'w' or path not in GENERATED_SOURCES:
+        GENERATED_SOURCES[path] = []
+    GENERATED_SOURCES[path].append(text_to_write)
+
+
+def read_from_buffer(file_name: str, folder_name: str = 'models') -> str:
+    """Возвращает накопленный в буфере текст модуля."""
+    return ''.join(
+        GENERATED_SOURCES.get(get_module_path(file_name, folder_name), []),
+    )
 
 
 if __name__ == '__main__':
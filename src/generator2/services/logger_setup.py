@@ -5,6 +5,8 @@ from .constants import LOG_FILE_NAME
 
 def setup_logging(logger_name: str) -> logging.Logger:
     logger = logging.getLogger(logger_name)
+    if logger.handlers:
+        return logger
     logger.setLevel(logging.DEBUG)
     file_handler = logging.FileHandler(LOG_FILE_NAME, encoding='utf-8')
     formatter = logging.Formatter(
@@ -0,0 +1,154 @@
+import json
+import sys
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+
+def get_peak_rss_mb() -> float:
+    """Возвращает пиковый RSS процесса в мегабайтах.
+
+    Если платформа его не сообщает, возвращает None.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux сообщает килобайты, macOS - байты.
+    if sys.platform == 'darwin':
+        return peak / 1024 / 1024
+    return peak / 1024
+
+
+def format_mb(value: float) -> str:
+    """Мегабайты для таблицы отчета или -, если значения нет."""
+    return '-' if value is None else f'{value:.1f}'
+
+
+class RunReport:
+    """Время, память и счетчики одного запуска генератора.
+
+    Используется обоими генераторами: generator1 импортирует этот модуль.
+    """
+
+    def __init__(self) -> None:
+        """Начинает отсчет времени, процессорного времени и памяти."""
+        self.stages = []
+        self.counters = {}
+        self.errors = []
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        self._rss_start = get_peak_rss_mb()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Замеряет стадию: время, процессорное время и память.
+
+        ru_maxrss - пик всего процесса, а не стадии, поэтому для стадии
+        записывается пиковый RSS процесса после нее (peak_rss_mb) и на
+        сколько стадия подняла этот пик (peak_rss_growth_mb).
+        Исключение стадии записывается в отчет и пробрасывается дальше.
+        """
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        rss_start = get_peak_rss_mb()
+        try:
+            yield
+        except Exception as ex:
+            self.add_error(f'{name}: {ex}')
+            raise
+        finally:
+            rss = get_peak_rss_mb()
+            self.stages.append({
+                'name': name,
+                'wall_seconds': time.perf_counter() - wall_start,
+                'cpu_seconds': time.process_time() - cpu_start,
+                'peak_rss_mb': rss,
+                'peak_rss_growth_mb': None if rss is None else rss - rss_start,
+            })
+
+    def count(self, name: str, value: float = 1) -> None:
+        """Увеличивает счетчик отчета."""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def add_error(self, message: str) -> None:
+        """Добавляет в отчет ошибку, которую генератор пропустил."""
+        self.errors.append(message)
+
+    def as_dict(self) -> dict:
+        """Возвращает отчет в виде словаря для JSON."""
+        rss = get_peak_rss_mb()
+        return {
+            'wall_seconds': time.perf_counter() - self._wall_start,
+            'cpu_seconds': time.process_time() - self._cpu_start,
+            'peak_rss_mb': rss,
+            'peak_rss_growth_mb': (
+                None if rss is None else rss - self._rss_start
+            ),
+            'stages': self.stages,
+            'counters': self.counters,
+            'errors': self.errors,
+        }
+
+    def format_table(self) -> str:
+        """Возвращает отчет в виде текстовой таблицы."""
+        report = self.as_dict()
+        lines = [
+            f'{"stage":<20}{"wall, s":>10}{"cpu, s":>10}'
+            f'{"process peak RSS, MB":>22}{"growth, MB":>12}',
+        ]
+        for stage in report['stages'] + [dict(report, name='total')]:
+            lines.append(
+                f'{stage["name"]:<20}{stage["wall_seconds"]:>10.3f}'
+                f'{stage["cpu_seconds"]:>10.3f}'
+                f'{format_mb(stage["peak_rss_mb"]):>22}'
+                f'{format_mb(stage["peak_rss_growth_mb"]):>12}',
+            )
+        lines.extend(
+            f'{name:<20}{value:>10g}'
+            for name, value in sorted(report['counters'].items())
+        )
+        lines.extend(f'ERROR {error}' for error in report['errors'])
+        return '\n'.join(lines)
+
+    def check(self, max_seconds: float = None) -> int:
+        """Возвращает код завершения для CI.
+
+        1, если в запуске были ошибки или он шел дольше max_seconds
+        секунд, иначе 0.
+        """
+        if self.errors:
+            return 1
+        wall_seconds = time.perf_counter() - self._wall_start
+        if max_seconds is not None and wall_seconds > max_seconds:
+            print(
+                f'Generation took {wall_seconds:.3f}s, '
+                f'budget is {max_seconds:.3f}s',
+            )
+            return 1
+        return 0
+
+    def write_json(self, path: str) -> None:
+        """Записывает отчет в JSON файл."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.as_dict(), f, ensure_ascii=False, indent=2)
+
+
+# Отчет текущего запуска генератора.
+_REPORT = RunReport()
+
+
+def start_report() -> RunReport:
+    """Начинает новый отчет и делает его текущим."""
+    global _REPORT
+    _REPORT = RunReport()
+    return _REPORT
+
+
+def get_report() -> RunReport:
+    """Возвращает отчет текущего запуска генератора."""
+    return _REPORT
@@ -1,8 +1,127 @@
+import hashlib
+import json
+import os
+import pickle
+from collections.abc import Callable
+from functools import partial
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
-from ruamel.yaml import YAML
+from .constants import CACHE_DIR, PATH_TO_YAML, SPEC_CACHE_VERSION
+from .file_writer import mkdir_p
 
-from .constants import PATH_TO_YAML
+if TYPE_CHECKING:
+    from openapi_parser.specification import Specification
 
+try:
+    import yaml
+    SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+except ImportError:  # pragma: no cover
+    yaml = None
+    from ruamel.yaml import YAML
 
-YAML_DICT = YAML(typ='rt').load(Path(PATH_TO_YAML))
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# Спецификация текущего запуска генератора и путь к ее файлу.
+_SPEC_PATH = PATH_TO_YAML
+_SPEC = None
+# Последние сериализованные спецификации, прочитанные в этом процессе:
+# (путь, вид) -> (путь к кэшу, данные).
+_LOADED_SPECS: dict[tuple[str, str], tuple[str, bytes]] = {}
+
+
+def parse_spec_text(text: bytes, path: str) -> dict:
+    """Разбирает JSON или YAML спецификацию.
+
+    Используется самый быстрый безопасный загрузчик из доступных.
+    """
+    if Path(path).suffix.lower() == '.json':
+        return orjson.loads(text) if orjson else json.loads(text)
+    if yaml is not None:
+        return yaml.load(text, Loader=SafeLoader)
+    return YAML(typ='safe').load(text)
+
+
+def parse_specification_text(text: bytes) -> 'Specification':
+    """Разбирает спецификацию в объект Specification.
+
+    Используется публичная функция openapi_parser.parse.
+    """
+    from openapi_parser import parse
+
+    return parse(spec_string=text.decode('utf-8'))
+
+
+def get_cache_path(text: bytes, kind: str) -> str:
+    """Возвращает путь к файлу кэша спецификации по хэшу ее содержимого."""
+    digest = hashlib.sha256(text).hexdigest()
+    return os.path.join(
+        CACHE_DIR, f'spec_{kind}_{SPEC_CACHE_VERSION}_{digest}.pickle')
+
+
+def load_cached(path: str, kind: str, parser: Callable) -> Any:
+    """Возвращает новую копию спецификации из кэша в памяти или на диске.
+
+    При промахе содержимое файла разбирается функцией parser и сохраняется в
+    кэш, ключом которого служит хэш содержимого файла.
+    """
+    text = Path(path).read_bytes()
+    cache_path = get_cache_path(text, kind)
+    loaded_path, blob = _LOADED_SPECS.get((path, kind), (None, None))
+    if loaded_path != cache_path:
+        try:
+            with open(cache_path, 'rb') as f:
+                blob = f.read()
+        except OSError:
+            blob = pickle.dumps(parser(text), protocol=pickle.HIGHEST_PROTOCOL)
+            mkdir_p(CACHE_DIR)
+            with open(f'{cache_path}.tmp', 'wb') as f:
+                f.write(blob)
+            os.replace(f'{cache_path}.tmp', cache_path)
+        _LOADED_SPECS[(path, kind)] = cache_path, blob
+    return pickle.loads(blob)
+
+
+def load_spec(path: str = PATH_TO_YAML) -> dict:
+    """Возвращает новую копию разобранной спецификации из файла."""
+    return load_cached(
+        str(path), 'raw', partial(parse_spec_text, path=str(path)))
+
+
+def load_specification(path: str = PATH_TO_YAML) -> 'Specification':
+    """Возвращает новую копию объекта Specification openapi_parser."""
+    return load_cached(str(path), 'specification', parse_specification_text)
+
+
+def set_spec_path(path: str) -> None:
+    """Задает файл спецификации для следующих запусков генератора."""
+    global _SPEC_PATH
+    _SPEC_PATH = str(path)
+    reset_spec()
+
+
+def get_spec_path() -> str:
+    """Возвращает путь к файлу спецификации текущего запуска."""
+    return _SPEC_PATH
+
+
+def get_spec() -> dict:
+    """Возвращает спецификацию текущего запуска генератора.
+
+    Файл читается при первом обращении, а не при импорте модуля.
+    Генератор дополняет схемы на месте, поэтому все модули одного запуска
+    работают с одним и тем же объектом.
+    """
+    global _SPEC
+    if _SPEC is None:
+        _SPEC = load_spec(_SPEC_PATH)
+    return _SPEC
+
+
+def reset_spec() -> None:
+    """Сбрасывает спецификацию, чтобы следующий запуск перечитал файл."""
+    global _SPEC
+    _SPEC = None
@@ -0,0 +1,165 @@
+import re
+
+from .services.constants import COMPONENTS_MODELS_FILE_NAME
+from .services.run_report import get_report
+
+CLASS_NAME_PATTERN = re.compile(r'^class (\w+)\(', re.MULTILINE)
+IDENTIFIER_PATTERN = re.compile(r'\b\w+\b')
+
+
+def split_classes(models_code: str) -> list[str]:
+    """Разбивает код модуля моделей на код отдельных классов.
+
+    Декораторы (@dataclass) остаются в коде своего класса.
+    """
+    classes = []
+    decorators = ''
+    for class_code in re.split(r'\n(?=@|class )', models_code):
+        if class_code.startswith('@'):
+            decorators += class_code.strip() + '\n'
+        elif class_code.strip():
+            classes.append(decorators + class_code.strip() + '\n')
+            decorators = ''
+    return classes
+
+
+def get_class_name(class_code: str) -> str:
+    """Возвращает имя класса модели или Enum."""
+    return CLASS_NAME_PATTERN.search(class_code).group(1)
+
+
+def rename_classes(class_code: str, names: dict[str, str]) -> str:
+    """Заменяет в коде класса имена классов модуля на общие имена."""
+    return IDENTIFIER_PATTERN.sub(
+        lambda match: names.get(match.group(0), match.group(0)), class_code,
+    )
+
+
+def get_shared_names(
+    modules: dict[str, list[str]],
+    component_names: dict[tuple[str, str], str],
+) -> dict[str, dict[str, str]]:
+    """Возвращает общие имена классов каждого модуля.
+
+    Класс, сгенерированный из схемы components/schemas, получает имя
+    компонента (Data из User -> User), остальные классы сохраняют имя.
+    """
+    shared_names = {}
+    for file_name, classes in modules.items():
+        names = shared_names[file_name] = {}
+        for class_code in classes:
+            class_name = get_class_name(class_code)
+            names.setdefault(
+                class_name,
+                component_names.get((file_name, class_name), class_name),
+            )
+    return shared_names
+
+
+def get_shared_classes(
+    modules: dict[str, list[str]],
+    shared_names: dict[str, dict[str, str]],
+) -> dict[str, str]:
+    """Возвращает классы, которые выносятся в общий модуль моделей.
+
+    Класс выносится, если он встречается в нескольких модулях и все его
+    определения под общим именем совпадают. Класс остается в модулях
+    эндпоинтов, если ссылается на класс, который вынести нельзя, или если
+    его общее имя занято другим классом модуля. Возвращает словарь:
+    общее имя -> код класса, в порядке первого появления, поэтому
+    зависимости идут раньше использующих их классов.
+    """
+    definitions = {}
+    modules_count = {}
+    for file_name, classes in modules.items():
+        names = shared_names[file_name]
+        for shared_name in set(names.values()):
+            modules_count[shared_name] = modules_count.get(shared_name, 0) + 1
+        for class_code in classes:
+            definitions.setdefault(
+                names[get_class_name(class_code)], {},
+            ).setdefault(rename_classes(class_code, names), None)
+    shared = {
+        shared_name: next(iter(variants))
+        for shared_name, variants in definitions.items()
+        if len(variants) == 1 and modules_count[shared_name] > 1
+    }
+    for names in shared_names.values():
+        for class_name, shared_name in names.items():
+            if shared_name != class_name and class_name in names.values():
+                shared.pop(class_name, None)
+    changed = True
+    while changed:
+        changed = False
+        for shared_name, class_code in list(shared.items()):
+            references = set(IDENTIFIER_PATTERN.findall(
+                class_code.split('\n', 1)[-1],
+            ))
+            if any(
+                reference in definitions and reference not in shared
+                for reference in references
+            ):
+                del shared[shared_name]
+                changed = True
+    return shared
+
+
+def dedupe_models_modules(
+    modules: dict[str, list[str]],
+    component_names: dict[tuple[str, str], str],
+) -> tuple[str, dict[str, tuple[list[str], dict[str, str], str]]]:
+    """Выносит общие классы моделей в общий модуль моделей.
+
+    Возвращает код общего модуля и для каждого модуля эндпоинта кортеж:
+    имена классов, импортируемых из общего модуля, псевдонимы классов
+    модуля для общих классов (Data -> User) и код оставшихся классов.
+    """
+    shared_names = get_shared_names(modules, component_names)
+    shared = get_shared_classes(modules, shared_names)
+    report = get_report()
+    report.count('shared_models', len(shared))
+    operation_modules = {}
+    for file_name, classes in modules.items():
+        names = shared_names[file_name]
+        imported = []
+        aliases = {}
+        local = []
+        for class_code in classes:
+            class_name = get_class_name(class_code)
+            shared_name = names[class_name]
+            if shared_name not in shared:
+                local.append(class_code)
+                continue
+            report.count('deduplicated_models')
+            if shared_name not in imported:
+                imported.append(shared_name)
+            if shared_name != class_name:
+                aliases[class_name] = shared_name
+        operation_modules[file_name] = (
+            imported, aliases, '\n\n'.join(local),
+        )
+    return '\n\n'.join(shared.values()), operation_modules
+
+
+def create_components_import(
+    class_names: list[str],
+    aliases: dict[str, str],
+    components_module: str = COMPONENTS_MODELS_FILE_NAME,
+) -> str:
+    """Возвращает импорт классов из общего модуля моделей.
+
+    В импорт входят и псевдонимы для классов, названных в модуле
+    эндпоинта по имени поля.
+    """
+    if not class_names:
+        return ''
+    components_import = (
+        f'from .{components_module} import '
+        f'{", ".join(sorted(class_names))}\n'
+    )
+    if aliases:
+        components_import += '\n' + ''.join(
+            f'{class_name} = {shared_name}\n'
+            for class_name, shared_name in aliases.items()
+        )
+    return components_import
@@ -0,0 +1,90 @@
+import asyncio
+from collections.abc import Callable
+from pathlib import Path
+
+import httpx
+import pytest
+
+from ..generator_starter import generate_client
+
+GENERATED_CLIENT = Path(__file__).resolve().parent.parent / 'generator2_full'
+
+
+def generate_missing_client() -> Path:
+    """Генерирует клиент, если его еще нет, и возвращает его каталог.
+
+    Модули generator2_full импортируют сгенерированные constants.py и
+    request_methods.py.
+    """
+    if not all(
+        (GENERATED_CLIENT / name).exists()
+        for name in ('constants.py', 'request_methods.py')
+    ):
+        generate_client(format_sources=False)
+    return GENERATED_CLIENT
+
+
+def pytest_sessionstart(session: pytest.Session) -> None:
+    """Генерирует клиент до сбора тестов.
+
+    Модули тестов импортируют generator2_full при сборе, до фикстур.
+    """
+    generate_missing_client()
+
+
+@pytest.fixture(scope='session', autouse=True)
+def generated_client() -> Path:
+    """Каталог сгенерированного клиента, один на сессию тестов."""
+    return generate_missing_client()
+
+
+class MockServer(httpx.MockTransport):
+    """Транспорт без сети для тестов слоев транспорта.
+
+    Записывает запросы в requests и отвечает статусом status. Тело
+    ответа - json, тело запроса (echo=True) или номер запроса
+    {'request': i}. delay - задержка ответа в секундах или список
+    задержек по порядку запросов.
+    """
+
+    def __init__(
+        self,
+        status: int = 200,
+        json: dict = None,
+        echo: bool = False,
+        delay: float | list[float] = 0,
+    ) -> None:
+        """Транспорт с ответом status и задержкой delay."""
+        super().__init__(self.respond)
+        self.status = status
+        self.json = json
+        self.echo = echo
+        self.delay = delay
+        self.requests = []
+
+    @property
+    def operations(self) -> list[str]:
+        """Операции запросов в порядке отправки."""
+        return [request.extensions['operation'] for request in self.requests]
+
+    async def respond(self, request: httpx.Request) -> httpx.Response:
+        """Записывает запрос и отвечает после его задержки."""
+        index = len(self.requests)
+        self.requests.append(request)
+        delay = (
+            self.delay[index] if isinstance(self.delay, list) else self.delay
+        )
+        if delay:
+            await asyncio.sleep(delay)
+        if self.echo:
+            return httpx.Response(self.status, content=request.content)
+        return httpx.Response(
+            self.status,
+            json={'request': index} if self.json is None else self.json,
+        )
+
+
+@pytest.fixture
+def mock_transport() -> Callable[..., MockServer]:
+    """Фабрика транспортов без сети с параметрами MockServer."""
+    return MockServer
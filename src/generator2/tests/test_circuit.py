@@ -0,0 +1,101 @@
+import asyncio
+
+import httpx
+import pytest
+
+from ..generator2_full.circuit import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+    CircuitBreakerTransport,
+    CircuitOpen,
+)
+
+
+def open_breaker(breaker: CircuitBreaker) -> None:
+    """Открывает цепь ошибками min_requests запросов."""
+    for _ in range(breaker.min_requests):
+        breaker.record(True, breaker.before_request())
+
+
+def test_failures_open_circuit() -> None:
+    """Доля ошибок от failure_rate открывает цепь и отклоняет запросы."""
+    breaker = CircuitBreaker('get_chat', min_requests=4)
+    for failed in (False, True, False):
+        breaker.record(failed, breaker.before_request())
+    assert breaker.state == STATE_CLOSED
+    breaker.record(True, breaker.before_request())
+    assert breaker.state == STATE_OPEN
+    with pytest.raises(CircuitOpen):
+        breaker.before_request()
+    assert breaker.metrics()['rejected'] == 1
+
+
+def test_successful_probes_close_circuit() -> None:
+    """После open_seconds пробные запросы закрывают цепь."""
+    breaker = CircuitBreaker(
+        'get_chat', min_requests=2, open_seconds=0, half_open_requests=2,
+    )
+    open_breaker(breaker)
+    first = breaker.before_request()
+    assert breaker.state == STATE_HALF_OPEN
+    second = breaker.before_request()
+    with pytest.raises(CircuitOpen):
+        breaker.before_request()
+    breaker.record(False, first)
+    assert breaker.state == STATE_HALF_OPEN
+    breaker.record(False, second)
+    assert breaker.state == STATE_CLOSED
+
+
+def test_failed_probe_reopens_circuit() -> None:
+    """Ошибка пробного запроса снова открывает цепь."""
+    breaker = CircuitBreaker('get_chat', min_requests=2, open_seconds=0)
+    open_breaker(breaker)
+    breaker.record(True, breaker.before_request())
+    assert breaker.state == STATE_OPEN
+    assert breaker.metrics()['opened'] == 2
+
+
+def test_outcomes_of_earlier_generation_are_ignored() -> None:
+    """Ответ на запрос из closed, пришедший в half_open, не пробный."""
+    breaker = CircuitBreaker(
+        'get_chat', min_requests=2, open_seconds=0, half_open_requests=1,
+    )
+    stale = breaker.before_request()
+    open_breaker(breaker)
+    probe = breaker.before_request()
+    breaker.record(True, stale)
+    assert breaker.state == STATE_HALF_OPEN
+    breaker.record(False, probe)
+    assert breaker.state == STATE_CLOSED
+
+
+def test_cancelled_probe_frees_its_place() -> None:
+    """Отмененный пробный запрос освобождает место для следующего."""
+    breaker = CircuitBreaker(
+        'get_chat', min_requests=2, open_seconds=0, half_open_requests=1,
+    )
+    open_breaker(breaker)
+    breaker.cancel(breaker.before_request())
+    breaker.record(False, breaker.before_request())
+    assert breaker.state == STATE_CLOSED
+
+
+def test_transport_rejects_requests_of_open_circuit() -> None:
+    """Слой транспорта отклоняет запросы операции с открытой цепью."""
+    api = httpx.MockTransport(lambda request: httpx.Response(503))
+    transport = CircuitBreakerTransport(api, min_requests=2)
+
+    async def main() -> None:
+        async with httpx.AsyncClient(transport=transport) as client:
+            for _ in range(3):
+                await client.get(
+                    'https://api.pachca.com/api/shared/v1/chats/1',
+                    extensions={'operation': 'get_chat'},
+                )
+
+    with pytest.raises(CircuitOpen):
+        asyncio.run(main())
+    assert transport.metrics()['get_chat']['state'] == STATE_OPEN
@@ -0,0 +1,83 @@
+import asyncio
+from collections.abc import Callable
+
+import httpx
+
+from ..generator2_full.coalesce import CoalescingTransport
+
+URL = 'https://api.pachca.com/api/shared/v1/messages/1'
+
+
+async def edit(client: httpx.AsyncClient, text: str) -> str:
+    """Редактирует сообщение и возвращает тело ответа."""
+    response = await client.put(
+        URL, content=text, extensions={'operation': 'edit_message'},
+    )
+    return response.text
+
+
+def test_coalesced_callers_get_last_response(
+    mock_transport: Callable,
+) -> None:
+    """Записи во время отправки схлопываются в одну последнюю."""
+    server = mock_transport(echo=True)
+    transport = CoalescingTransport(transport=server, window=0.05)
+
+    async def main() -> list[str]:
+        async with httpx.AsyncClient(transport=transport) as client:
+            first = asyncio.create_task(edit(client, 'v1'))
+            await asyncio.sleep(0.01)
+            results = await asyncio.gather(
+                first, *(edit(client, f'v{index}') for index in range(2, 6)),
+            )
+        await transport.close()
+        return results
+
+    assert asyncio.run(main()) == ['v1', 'v5', 'v5', 'v5', 'v5']
+    assert [request.content for request in server.requests] == [b'v1', b'v5']
+    assert transport.metrics() == {
+        'writes': 5, 'sent': 2, 'coalesced': 3, 'pending': 0,
+    }
+
+
+def test_other_operations_are_sent_as_is(mock_transport: Callable) -> None:
+    """Запросы других операций не схлопываются."""
+    server = mock_transport(echo=True)
+    transport = CoalescingTransport(transport=server)
+
+    async def main() -> None:
+        async with httpx.AsyncClient(transport=transport) as client:
+            await asyncio.gather(*(
+                client.post(URL, content=text)
+                for text in ('a', 'b', 'c')
+            ))
+
+    asyncio.run(main())
+    assert sorted(request.content for request in server.requests) == [
+        b'a', b'b', b'c',
+    ]
+    assert transport.metrics()['writes'] == 0
+
+
+def test_send_error_reaches_all_callers() -> None:
+    """Ошибку отправки получают все вызовы схлопнутой записи."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        """Обрывает соединение."""
+        raise httpx.ConnectError('refused', request=request)
+
+    transport = CoalescingTransport(
+        transport=httpx.MockTransport(handler), window=0.01,
+    )
+
+    async def main() -> list:
+        async with httpx.AsyncClient(transport=transport) as client:
+            results = await asyncio.gather(
+                edit(client, 'a'), edit(client, 'b'),
+                return_exceptions=True,
+            )
+        await transport.close()
+        return results
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, httpx.ConnectError) for result in results)
@@ -0,0 +1,93 @@
+import asyncio
+from collections.abc import Callable
+
+import httpx
+import pytest
+
+from ..generator2_full.concurrency import AdaptiveLimiter, AdaptiveTransport
+
+
+async def send(transport: AdaptiveTransport, count: int = 1) -> None:
+    """Отправляет count запросов через слой транспорта."""
+    async with httpx.AsyncClient(transport=transport) as client:
+        for _ in range(count):
+            await client.get('https://api.pachca.com/api/shared/v1/chats')
+
+
+def test_rate_limit_response_halves_limit(mock_transport: Callable) -> None:
+    """Ответ 429 уменьшает лимит вдвое."""
+    limiter = AdaptiveLimiter(initial=8)
+    asyncio.run(send(AdaptiveTransport(limiter, mock_transport(429))))
+    assert limiter.limit == 4
+    assert limiter.decreases == 1
+    assert limiter.in_flight == 0
+
+
+def test_one_overload_wave_decreases_limit_once() -> None:
+    """Ответы на запросы, начатые до уменьшения, лимит больше не меняют."""
+    limiter = AdaptiveLimiter(initial=8)
+
+    async def main() -> None:
+        started = [await limiter.acquire() for _ in range(3)]
+        for request_started in started:
+            limiter.release(request_started, True)
+
+    asyncio.run(main())
+    assert limiter.limit == 4
+    assert limiter.decreases == 1
+
+
+def test_successful_responses_raise_limit(mock_transport: Callable) -> None:
+    """Успешные ответы увеличивают лимит, но не выше max_limit."""
+    limiter = AdaptiveLimiter(initial=2, max_limit=3, latency_factor=1e9)
+    asyncio.run(send(AdaptiveTransport(limiter, mock_transport()), 20))
+    assert limiter.limit == 3
+    assert limiter.decreases == 0
+
+
+def test_transport_error_halves_limit() -> None:
+    """Ошибка сети считается перегрузкой."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        """Обрывает соединение."""
+        raise httpx.ConnectError('refused', request=request)
+
+    limiter = AdaptiveLimiter(initial=8)
+    transport = AdaptiveTransport(limiter, httpx.MockTransport(handler))
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(send(transport))
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
+
+
+def test_other_exception_keeps_limit() -> None:
+    """Исключение, не связанное с перегрузкой, освобождает место."""
+    limiter = AdaptiveLimiter(initial=8)
+
+    async def main() -> None:
+        async with limiter.slot():
+            raise ValueError
+
+    with pytest.raises(ValueError):
+        asyncio.run(main())
+    assert limiter.limit == 8
+    assert limiter.in_flight == 0
+
+
+def test_waiters_wake_when_slot_is_released() -> None:
+    """Запросы сверх лимита ждут и выполняются по мере освобождения."""
+    limiter = AdaptiveLimiter(initial=1, max_limit=1)
+    peak = []
+
+    async def request() -> None:
+        async with limiter.slot():
+            peak.append(limiter.in_flight)
+            await asyncio.sleep(0)
+
+    async def main() -> None:
+        await asyncio.gather(*(request() for _ in range(5)))
+
+    asyncio.run(main())
+    assert peak == [1] * 5
+    assert limiter.in_flight == 0
+    assert not limiter.waiters
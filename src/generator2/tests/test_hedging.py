@@ -0,0 +1,62 @@
+import asyncio
+from collections.abc import Callable
+
+import httpx
+import pytest
+
+from ..generator2_full import hedging
+from ..generator2_full.hedging import HedgingTransport
+
+URL = 'https://api.pachca.com/api/shared/v1/messages/1'
+
+
+async def send(
+    transport: HedgingTransport, method: str = 'GET',
+) -> httpx.Response:
+    """Отправляет один запрос операции get_message."""
+    async with httpx.AsyncClient(transport=transport) as client:
+        return await client.request(
+            method, URL, extensions={'operation': 'get_message'},
+        )
+
+
+@pytest.fixture(autouse=True)
+def short_delay(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Задержка хеджирования до набора статистики - 10 мс."""
+    monkeypatch.setattr(hedging, 'INITIAL_DELAY', 0.01)
+
+
+def test_hedge_wins_over_slow_primary(mock_transport: Callable) -> None:
+    """Медленный основной запрос отменяется, ответ дает копия."""
+    transport = HedgingTransport(transport=mock_transport(delay=[5, 0]))
+    response = asyncio.run(send(transport))
+    assert response.json() == {'request': 1}
+    assert transport.metrics()['get_message'] == {
+        'delay': 0.01, 'requests': 1, 'hedged': 1, 'hedge_wins': 1,
+    }
+
+
+def test_fast_primary_is_not_hedged(mock_transport: Callable) -> None:
+    """Ответ быстрее задержки хеджирования не порождает копию."""
+    transport = HedgingTransport(transport=mock_transport())
+    asyncio.run(send(transport))
+    assert transport.metrics()['get_message']['hedged'] == 0
+
+
+def test_post_is_not_hedged(mock_transport: Callable) -> None:
+    """Запросы, кроме GET, отправляются без хеджирования."""
+    transport = HedgingTransport(transport=mock_transport(delay=0.05))
+    response = asyncio.run(send(transport, 'POST'))
+    assert response.json() == {'request': 0}
+    assert transport.metrics() == {}
+
+
+def test_hedges_are_limited_by_budget(mock_transport: Callable) -> None:
+    """Без бюджета медленный запрос ждет основного ответа."""
+    transport = HedgingTransport(
+        transport=mock_transport(delay=0.05), budget=0,
+    )
+    transport.tokens = 0
+    response = asyncio.run(send(transport))
+    assert response.json() == {'request': 0}
+    assert transport.metrics()['get_message']['hedged'] == 0
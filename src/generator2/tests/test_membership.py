@@ -0,0 +1,86 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from ..generator2_full.membership import MembershipSync, MembershipSyncError
+
+
+class FakeBot:
+    """Бот без сети: хранит состав бесед и записывает вызовы."""
+
+    def __init__(self, chats: dict[int, dict], errors: list = None) -> None:
+        """Бот с беседами chats, отвечающий на изменения ошибками errors."""
+        self.chats = chats
+        self.errors = errors
+        self.calls = []
+
+    async def get_chat(self, chat_id: int) -> SimpleNamespace:
+        """Возвращает беседу с текущими участниками и тегами."""
+        self.calls.append(('get_chat', chat_id))
+        return SimpleNamespace(data=SimpleNamespace(**self.chats[chat_id]))
+
+    async def post_members_to_chats(
+        self, data: dict, chat_id: int,
+    ) -> SimpleNamespace:
+        """Записывает добавление участников."""
+        self.calls.append(('members', chat_id, data['member_ids']))
+        return SimpleNamespace(errors=self.errors)
+
+    async def post_tags_to_chats(
+        self, data: dict, chat_id: int,
+    ) -> SimpleNamespace:
+        """Записывает добавление тегов."""
+        self.calls.append(('tags', chat_id, data['group_tag_ids']))
+        return SimpleNamespace(errors=self.errors)
+
+
+def test_apply_adds_minimal_diff_in_chunks() -> None:
+    """Добавляются только недостающие участники, пачками по chunk_size."""
+    bot = FakeBot({1: {'member_ids': [1, 2, 3], 'group_tag_ids': []}})
+    sync = MembershipSync(bot, chunk_size=2)
+    result = asyncio.run(sync.sync_chat_members(1, [2, 3, 4, 5, 6, 7]))
+    assert result == {'added': [4, 5, 6, 7], 'removed': [], 'extra': [1]}
+    assert sorted(bot.calls[1:]) == [
+        ('members', 1, [4, 5]), ('members', 1, [6, 7]),
+    ]
+
+
+def test_sync_reads_each_chat_once() -> None:
+    """Участники и теги одной беседы считаются по одному get_chat."""
+    bot = FakeBot({1: {'member_ids': [1], 'group_tag_ids': [10]}})
+    result = asyncio.run(
+        MembershipSync(bot).sync(members={1: [1, 2]}, tags={1: [10, 11]}),
+    )
+    assert result == {1: {
+        'members': {'added': [2], 'removed': [], 'extra': []},
+        'tags': {'added': [11], 'removed': [], 'extra': []},
+    }}
+    assert [call for call in bot.calls if call[0] == 'get_chat'] == [
+        ('get_chat', 1),
+    ]
+
+
+def test_remove_callback_receives_extra_ids() -> None:
+    """Лишние участники передаются remove_member."""
+    removed = []
+
+    async def remove_member(chat_id: int, user_id: int) -> None:
+        """Записывает исключение участника."""
+        removed.append((chat_id, user_id))
+
+    bot = FakeBot({1: {'member_ids': [1, 2, 3], 'group_tag_ids': []}})
+    sync = MembershipSync(bot, remove_member=remove_member)
+    result = asyncio.run(sync.sync_chat_members(1, [1]))
+    assert result == {'added': [], 'removed': [2, 3], 'extra': []}
+    assert sorted(removed) == [(1, 2), (1, 3)]
+
+
+def test_api_error_raises() -> None:
+    """Ответ с ошибками вызывает MembershipSyncError."""
+    bot = FakeBot(
+        {1: {'member_ids': [], 'group_tag_ids': []}},
+        errors=[{'key': 'member_ids', 'value': 'invalid'}],
+    )
+    with pytest.raises(MembershipSyncError):
+        asyncio.run(MembershipSync(bot).sync_chat_members(1, [1]))
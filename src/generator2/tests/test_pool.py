@@ -0,0 +1,54 @@
+import asyncio
+from collections.abc import Callable
+
+import httpx
+import pytest
+
+from ..generator2_full import pool
+from ..generator2_full.pool import BotPool
+
+
+@pytest.fixture
+def chat_transport(mock_transport: Callable) -> httpx.MockTransport:
+    """Транспорт без сети, отвечающий беседой."""
+    return mock_transport(json={'data': {'id': 1, 'name': 'chat'}})
+
+
+def test_reserve_releases_unsent_request(
+    chat_transport: httpx.MockTransport,
+) -> None:
+    """Бронь запроса, который не был отправлен, снимается при выходе."""
+    bots = BotPool(['a', 'b'], transport=chat_transport)
+    with pytest.raises(ValueError), bots.reserve() as bot:
+        assert bot.transport.reserved == 1
+        raise ValueError
+    assert [bot.transport.reserved for bot in bots.bots] == [0, 0]
+
+
+def test_get_bot_reservation_expires(
+    monkeypatch: pytest.MonkeyPatch, chat_transport: httpx.MockTransport,
+) -> None:
+    """Бронь get_bot без запроса истекает через RESERVATION_TTL."""
+    monkeypatch.setattr(pool, 'RESERVATION_TTL', 0)
+    bots = BotPool(['a', 'b'], transport=chat_transport)
+    bot = bots.get_bot()
+    assert bot.transport.reserved == 0
+
+
+def test_least_loaded_spreads_gathered_requests(
+    chat_transport: httpx.MockTransport,
+) -> None:
+    """Запросы из asyncio.gather распределяются между ботами поровну."""
+
+    async def main() -> dict:
+        async with BotPool(
+            ['a', 'b', 'c'], transport=chat_transport,
+        ) as bots:
+            await asyncio.gather(*(
+                bots.get_bot().get_chat(index) for index in range(9)
+            ))
+            return bots.stats()
+
+    stats = asyncio.run(main())
+    assert [bot['requests'] for bot in stats.values()] == [3, 3, 3]
+    assert all(bot['in_flight'] == 0 for bot in stats.values())
@@ -0,0 +1,81 @@
+import asyncio
+from collections.abc import Callable
+
+import httpx
+
+from ..generator2_full.priority import (
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    PriorityScheduler,
+    PriorityTransport,
+    priority,
+)
+from ..generator2_full.rate_limit import TokenBucket
+
+URL = 'https://api.pachca.com/api/shared/v1/chats'
+
+
+async def send(client: httpx.AsyncClient, operation: str) -> None:
+    """Отправляет запрос операции operation."""
+    await client.get(URL, extensions={'operation': operation})
+
+
+def test_interactive_request_overtakes_queued_bulk(
+    mock_transport: Callable,
+) -> None:
+    """Интерактивный запрос идет раньше фоновых, ждущих в очереди."""
+    server = mock_transport(delay=0.01)
+    transport = PriorityTransport(PriorityScheduler(concurrency=1), server)
+
+    async def main() -> None:
+        async with httpx.AsyncClient(transport=transport) as client:
+            bulk = [
+                asyncio.create_task(send(client, 'get_chats'))
+                for _ in range(3)
+            ]
+            await asyncio.sleep(0)
+            await send(client, 'get_chat')
+            await asyncio.gather(*bulk)
+
+    asyncio.run(main())
+    assert server.operations == [
+        'get_chats', 'get_chat', 'get_chats', 'get_chats',
+    ]
+    assert transport.scheduler.metrics() == {
+        'in_flight': 0,
+        'waiting_interactive': 0,
+        'waiting_bulk': 0,
+        'started_interactive': 1,
+        'started_bulk': 3,
+    }
+
+
+def test_priority_context_overrides_operation(
+    mock_transport: Callable,
+) -> None:
+    """Контекст priority(...) задает приоритет запросов внутри блока."""
+    transport = PriorityTransport(transport=mock_transport())
+    request = httpx.Request(
+        'GET', URL, extensions={'operation': 'get_chat'},
+    )
+    assert transport.get_priority(request) == PRIORITY_INTERACTIVE
+    with priority(PRIORITY_BULK):
+        assert transport.get_priority(request) == PRIORITY_BULK
+
+
+def test_bulk_requests_keep_reserve_of_tokens() -> None:
+    """Фоновые запросы не расходуют последние bulk_reserve токенов."""
+    limiter = TokenBucket(rate=0.001, capacity=3)
+    scheduler = PriorityScheduler(limiter=limiter, bulk_reserve=2)
+
+    async def main() -> None:
+        await scheduler.acquire(PRIORITY_BULK)
+        waiting = asyncio.create_task(scheduler.acquire(PRIORITY_BULK))
+        await asyncio.sleep(0)
+        assert not waiting.done()
+        await scheduler.acquire(PRIORITY_INTERACTIVE)
+        waiting.cancel()
+
+    asyncio.run(main())
+    assert scheduler.metrics()['started_bulk'] == 1
+    assert scheduler.metrics()['started_interactive'] == 1
@@ -0,0 +1,75 @@
+import multiprocessing
+import time
+from pathlib import Path
+
+import pytest
+
+from ..generator2_full.rate_limit import (
+    SHARED_STATE,
+    SharedTokenBucket,
+    TokenBucket,
+    fcntl,
+)
+
+pytestmark = pytest.mark.skipif(fcntl is None, reason='requires fcntl')
+
+
+def drain(limiter: TokenBucket) -> int:
+    """Списывает весь запас и возвращает число разрешенных запросов."""
+    count = 0
+    while not limiter.try_acquire():
+        count += 1
+    return count
+
+
+def drain_to_queue(
+    limiter: TokenBucket, counts: multiprocessing.Queue,
+) -> None:
+    """Списывает запас в дочернем процессе и передает счетчик родителю."""
+    counts.put(drain(limiter))
+
+
+def test_buckets_with_one_token_share_budget(tmp_path: Path) -> None:
+    """Два ограничителя одного токена расходуют один запас."""
+    first = SharedTokenBucket('token', 0.001, 5, str(tmp_path))
+    second = SharedTokenBucket('token', 0.001, 5, str(tmp_path))
+    other = SharedTokenBucket('other', 0.001, 5, str(tmp_path))
+    assert drain(first) + drain(second) == 5
+    assert drain(other) == 5
+    for limiter in (first, second, other):
+        limiter.close()
+
+
+def test_state_from_the_future_is_reset(tmp_path: Path) -> None:
+    """Время состояния позже текущего сбрасывает запас.
+
+    Такое время остается от другой загрузки или перевода часов: запас
+    восстанавливается, а не заставляет ждать.
+    """
+    limiter = SharedTokenBucket('token', 1, 3, str(tmp_path))
+    Path(limiter.path).write_bytes(SHARED_STATE.pack(0, time.time() + 86400))
+    assert limiter.try_acquire() == 0
+    assert limiter.available == pytest.approx(2, abs=0.01)
+    limiter.close()
+
+
+def test_file_is_reopened_after_fork(tmp_path: Path) -> None:
+    """Ограничитель, созданный до fork, делит запас между процессами.
+
+    Каждый процесс открывает файл заново: с унаследованным описанием
+    файла flock не разделял бы процессы.
+    """
+    limiter = SharedTokenBucket('token', 0.001, 200, str(tmp_path))
+    limiter.available
+    context = multiprocessing.get_context('fork')
+    counts = context.Queue()
+    workers = [
+        context.Process(target=drain_to_queue, args=(limiter, counts))
+        for _ in range(4)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert sum(counts.get() for _ in workers) == 200
+    limiter.close()
@@ -0,0 +1,110 @@
+import asyncio
+from collections.abc import Callable
+
+import httpx
+import pytest
+from openapi_parser.enumeration import OperationMethod
+from openapi_parser.specification import Operation
+
+from ..generator2_full.bot import Bot
+from ..generator2_full.models.models_reqBod_getDirectUrl import Getdirecturl
+from ..generator2_full.retry import RetryTransport
+from ..generator2_full.transport import TransportLayer
+from ..request_methods_generator import get_operation_policy
+from ..services.constants import DEFAULT_RETRIES
+
+
+def create_bot(server: httpx.MockTransport) -> Bot:
+    """Бот с повтором без задержки поверх транспорта без сети."""
+    return Bot('token', transport=RetryTransport(server, 0))
+
+
+def test_post_is_not_retried(mock_transport: Callable) -> None:
+    """Неидемпотентный POST не повторяется при ответе 503."""
+    server = mock_transport(503)
+    bot = create_bot(server)
+    asyncio.run(bot.create_message(
+        {'message': {'entity_id': 1, 'content': 'text'}},
+    ))
+    assert len(server.requests) == 1
+    assert bot.transport.retried == 0
+
+
+def test_get_is_retried(mock_transport: Callable) -> None:
+    """GET идемпотентен и повторяется DEFAULT_RETRIES раз."""
+    server = mock_transport(503)
+    asyncio.run(create_bot(server).get_chat(1))
+    assert len(server.requests) == 1 + DEFAULT_RETRIES
+
+
+def test_x_idempotent_post_is_retried(mock_transport: Callable) -> None:
+    """POST с x-idempotent: true в спецификации повторяется."""
+    server = mock_transport(503)
+    asyncio.run(
+        create_bot(server).post_members_to_chats({'member_ids': [1]}, 1),
+    )
+    assert len(server.requests) == 1 + DEFAULT_RETRIES
+    assert server.requests[0].extensions['idempotent'] is True
+
+
+@pytest.mark.parametrize(('method', 'extensions', 'policy'), [
+    (OperationMethod.POST, {}, (30.0, 0, False)),
+    (OperationMethod.POST, {'retry': 5}, (30.0, 0, False)),
+    (OperationMethod.POST, {'idempotent': True, 'retry': 5}, (30.0, 5, True)),
+    (OperationMethod.GET, {}, (10.0, DEFAULT_RETRIES, True)),
+    (OperationMethod.GET, {'retry': 0}, (10.0, 0, True)),
+    (OperationMethod.GET, {'idempotent': False}, (10.0, 0, False)),
+    (OperationMethod.GET, {'timeout': 3}, (3.0, DEFAULT_RETRIES, True)),
+])
+def test_spec_extensions_override_method_defaults(
+    method: OperationMethod, extensions: dict, policy: tuple,
+) -> None:
+    """x-retry, x-idempotent и x-timeout переопределяют значения метода."""
+    operation = Operation(method=method, responses=[], extensions=extensions)
+    assert get_operation_policy(operation) == policy
+
+
+@pytest.mark.parametrize(('call', 'timeout'), [
+    (lambda bot: bot.get_direct_url(Getdirecturl()), 120.0),
+    (lambda bot: bot.get_chat(1), 10.0),
+])
+def test_x_timeout_reaches_request(
+    call: Callable, timeout: float, mock_transport: Callable,
+) -> None:
+    """Таймаут операции (x-timeout или метода HTTP) передается в httpx."""
+    server = mock_transport()
+    asyncio.run(call(create_bot(server)))
+    assert server.requests[0].extensions['timeout'] == dict.fromkeys(
+        ('connect', 'read', 'write', 'pool'), timeout,
+    )
+
+
+def test_plain_transport_survives_client_close() -> None:
+    """Транспорт httpx оборачивается в TransportLayer и не закрывается."""
+
+    class ClosingTransport(httpx.MockTransport):
+        """Транспорт, который после aclose не принимает запросы."""
+
+        closed = False
+
+        async def handle_async_request(
+            self, request: httpx.Request,
+        ) -> httpx.Response:
+            """Отвечает, пока транспорт не закрыт."""
+            assert not self.closed
+            return await super().handle_async_request(request)
+
+        async def aclose(self) -> None:
+            """Отмечает транспорт закрытым."""
+            self.closed = True
+
+    transport = ClosingTransport(lambda request: httpx.Response(200, json={}))
+    bot = Bot('token', transport=transport)
+    assert isinstance(bot.transport, TransportLayer)
+
+    async def main() -> None:
+        await bot.get_chat(1)
+        await bot.get_chat(2)
+
+    asyncio.run(main())
+    assert not transport.closed
@@ -0,0 +1,87 @@
+import json
+import time
+
+import pytest
+
+from ..generator2_full.streaming import ArrayItemScanner
+
+# Время разбора одного ответа: при переборе вариантов регулярным
+# выражением незаконченная строка разбирается экспоненциально долго.
+TIME_LIMIT = 1.0
+
+BODIES = {
+    'escaped_quotes': json.dumps({
+        'meta': {'note': 'key "data" \\ [not] {an array}'},
+        'data': [
+            {'text': 'say "hi" \\ then "bye"', 'tags': ['"', '\\', '\\"']},
+            '"quoted" scalar',
+            {'path': 'C:\\dir\\', 'empty': ''},
+        ],
+    }),
+    'nested': json.dumps({
+        'data': [
+            [1, [2, [3, []]], {}],
+            {'a': {'b': [1, {'c': ']}'}, [{'d': '[{'}]]}},
+            [],
+            {},
+        ],
+        'paginate': {'next_page': None},
+    }),
+    'scalars': json.dumps({
+        'count': 4, 'data': [1, -2.5e3, True, None, 'text', [None]],
+    }),
+    'long_string': json.dumps({
+        'data': [
+            {'id': 1, 'text': 'a\\"b' * 20000 + 'end'},
+            {'id': 2, 'text': 'x' * 50000},
+        ],
+    }),
+}
+
+
+def scan(chunks: list[bytes]) -> list:
+    """Разбирает ответ, переданный фрагментами, и возвращает элементы."""
+    scanner = ArrayItemScanner()
+    items = []
+    for chunk in chunks:
+        items.extend(scanner.feed(chunk))
+    return [json.loads(item) for item in items]
+
+
+@pytest.mark.parametrize('name', BODIES)
+def test_items_match_json_loads(name: str) -> None:
+    """Элементы совпадают с массивом data из json.loads при любом разбиении.
+
+    Ответ делится на два фрагмента по каждому байту и на фрагменты
+    одного размера.
+    """
+    body = BODIES[name].encode()
+    expected = json.loads(body)['data']
+    # Длинный ответ делится с шагом 997 байт: границы попадают внутрь
+    # длинных строк, а число разбиений остается небольшим.
+    if len(body) < 10000:
+        offsets = range(len(body) + 1)
+        chunk_size = 7
+    else:
+        offsets = [*range(0, len(body), 997), len(body) - 5]
+        chunk_size = 4096
+    for offset in offsets:
+        start = time.perf_counter()
+        assert scan([body[:offset], body[offset:]]) == expected, offset
+        assert time.perf_counter() - start < TIME_LIMIT, offset
+    chunks = [
+        body[index:index + chunk_size]
+        for index in range(0, len(body), chunk_size)
+    ]
+    assert scan(chunks) == expected
+
+
+def test_unfinished_long_string_is_linear() -> None:
+    """Фрагмент, оборванный внутри длинной строки, не вызывает перебора."""
+    scanner = ArrayItemScanner()
+    start = time.perf_counter()
+    assert scanner.feed(b'{"data": [{"text": "' + b'ab\\"' * 100000) == []
+    assert scanner.feed(b'tail"}, 2]}') == [
+        b'{"text": "' + b'ab\\"' * 100000 + b'tail"}', b'2',
+    ]
+    assert time.perf_counter() - start < TIME_LIMIT
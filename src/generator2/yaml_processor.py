@@ -1,17 +1,157 @@
-import sys
+import re
 
-from .services.file_writer import write_to_file
-from .generate_pydantic_model import look_into_schema_new
-from .services.logger_setup import setup_logging
-from .schema_link_processor import load_schema
-from .services.yaml_loader import YAML_DICT
+from .generate_pydantic_model import (
+    COMPONENT_NAMES,
+    look_into_schema_new,
+    uses_structs,
+)
+from .schema_link_processor import RESOLVED_COMPONENTS, load_schema
+from .services.code_formatter import (
+    add_trailing_comma,
+    write_generated_sources,
+)
 from .services.constants import (
-    HTTP_METHODS, PREFIX_RESPONSE, PREFIX_REQUEST
+    COMPONENTS_MODELS_FILE_NAME,
+    HTTP_METHODS,
+    MODELS_IMPORTS,
+    PREFIX_REQUEST,
+    PREFIX_RESPONSE,
+    STRUCTS_COMPONENTS_MODELS_FILE_NAME,
+)
+from .services.file_writer import read_from_buffer, write_to_file
+from .services.logger_setup import setup_logging
+from .services.run_report import get_report
+from .services.yaml_loader import get_spec
+from .shared_models import (
+    IDENTIFIER_PATTERN,
+    create_components_import,
+    dedupe_models_modules,
+    split_classes,
 )
-
 
 logger = setup_logging('yaml_processor')
 
+# Классы моделей модулей эндпоинтов текущего запуска:
+# имя модуля -> код классов в порядке генерации.
+MODELS_MODULES: dict[str, list[str]] = {}
+
+STRING_PATTERN = re.compile(r"'[^'\n]*'|\"[^\"\n]*\"")
+FIELD_PATTERN = re.compile(r' {4}\w+: .* = (?:Field|field)\(.*\)$')
+METADATA_PATTERN = re.compile(r'metadata=\{.*\}')
+
+
+def create_models_header(models_code: str) -> str:
+    """Возвращает импорты, используемые в коде модуля моделей.
+
+    Имена ищутся в коде без строк, чтобы слова из описаний полей
+    не добавляли лишних импортов.
+    """
+    header = ''
+    code = STRING_PATTERN.sub('', models_code)
+    for module, names in MODELS_IMPORTS:
+        used_names = [
+            name for name in names if re.search(rf'\b{name}\b', code)
+        ]
+        if not used_names:
+            continue
+        if module in ('pydantic', '..structs') and header:
+            header += '\n'
+        header += f'from {module} import {", ".join(used_names)}\n'
+    return header + '\n\n'
+
+
+def add_field_commas(models_code: str) -> str:
+    """Добавляет запятую в длинные объявления полей Field(...)/field(...).
+
+    black разбивает такое объявление по одному аргументу на строке,
+    и модуль не получает замечаний COM812 от ruff. Словарь metadata
+    поля dataclass, который не помещается на строке, получает запятую
+    по той же причине.
+    """
+    lines = models_code.split('\n')
+    for index, line in enumerate(lines):
+        if not FIELD_PATTERN.match(line):
+            continue
+        line = add_trailing_comma(line)
+        metadata = METADATA_PATTERN.search(line)
+        if metadata:
+            line = line.replace(
+                metadata.group(0),
+                add_trailing_comma(metadata.group(0), 9, '}'),
+            )
+        lines[index] = line
+    return '\n'.join(lines)
+
+
+def create_models_module(file_name: str, schema: dict) -> None:
+    """Генерирует классы моделей pydantic для схемы эндпоинта.
+
+    Модуль записывается в create_components_module после того, как
+    общие для нескольких эндпоинтов классы вынесены в models_components.
+    """
+    write_to_file(file_name, '', open_file_mode='w')
+    look_into_schema_new(schema, file_name)
+    MODELS_MODULES[file_name] = split_classes(read_from_buffer(file_name))
+
+
+def create_components_module() -> None:
+    """Записывает общие модули моделей и модули моделей эндпоинтов.
+
+    Одинаковые классы (User, Chat, Message...) генерируются один раз в
+    models_components, а модули эндпоинтов импортируют их оттуда.
+    С бэкендом dataclass модели ответов выносятся отдельно
+    в models_components_structs.
+    """
+    groups = {}
+    for file_name, classes in MODELS_MODULES.items():
+        components_module = (
+            STRUCTS_COMPONENTS_MODELS_FILE_NAME if uses_structs(file_name)
+            else COMPONENTS_MODELS_FILE_NAME
+        )
+        groups.setdefault(components_module, {})[file_name] = classes
+    for components_module, modules in groups.items():
+        write_models_modules(components_module, modules)
+
+
+def write_models_modules(components_module: str, modules: dict) -> None:
+    """Записывает общий модуль моделей группы и модули ее эндпоинтов.
+
+    Модуль эндпоинта импортирует из общего модуля только классы, на
+    которые ссылается его код или его псевдонимы.
+    """
+    components_code, operation_modules = dedupe_models_modules(
+        modules, COMPONENT_NAMES,
+    )
+    components_code = add_field_commas(components_code)
+    write_to_file(
+        components_module,
+        create_models_header(components_code) + components_code,
+        open_file_mode='w',
+    )
+    for file_name, module in operation_modules.items():
+        imported, aliases, models_code = module
+        models_code = add_field_commas(models_code)
+        used_names = set(IDENTIFIER_PATTERN.findall(
+            STRING_PATTERN.sub('', models_code),
+        )) | set(aliases.values())
+        imported = [name for name in imported if name in used_names]
+        header = create_models_header(models_code).rstrip('\n')
+        components_import = create_components_import(
+            imported, aliases, components_module,
+        )
+        # Относительные импорты идут одной группой, без пустой строки.
+        last_import = header.rsplit('\n', 1)[-1]
+        if components_import and header and not last_import.startswith(
+            'from .',
+        ):
+            header += '\n'
+        write_to_file(
+            file_name,
+            (header + '\n' if header else '') + components_import
+            + '\n\n' + models_code,
+            open_file_mode='w',
+        )
+
 
 def create_constants_for_client(yaml_dict: dict) -> str:
     """Записывает файл констант для клиента."""
@@ -22,7 +162,8 @@ def create_constants_for_client(yaml_dict: dict) -> str:
             f"URL = '{yaml_dict['servers'][0]['url']}'\n"
             "PARAM_NAME_SORT = 'sort'\n"
             "PARAM_NAME_SORT_FIELD = 'sort_field'\n"
-            "TOKEN_TYPE = 'Bearer'\n\n"
+            "TOKEN_TYPE = 'Bearer'\n"
+            "JSON_HEADERS = {'Content-Type': 'application/json'}\n\n"
             "# Logger constants\n"
             "LOG_FILE_NAME = 'pachca_log.log'\n"
             "MAX_FILE_SIZE = 1 * 1024 * 1024  # 1 MB\n"
@@ -53,10 +194,15 @@ def process_endpoints() -> tuple[list, list]:
     Проходит по каждому эндпоинту в openapi файле и генерирует модели для
     каждой схемы в requestBody и resopnse.
     """
-    create_constants_for_client(YAML_DICT)
+    yaml_dict = get_spec()
+    MODELS_MODULES.clear()
+    COMPONENT_NAMES.clear()
+    RESOLVED_COMPONENTS.clear()
+    create_constants_for_client(yaml_dict)
     body: dict
-    for endpoint, method, body in get_all_endpoints(YAML_DICT):
+    for endpoint, method, body in get_all_endpoints(yaml_dict):
         logger.debug(f'Working on: {endpoint}, {method}')
+        get_report().count('operations')
         operation_id = body.get('operationId')
         parameters = body.get('parameters')
         path_parameters = []
@@ -82,16 +228,6 @@ def process_endpoints() -> tuple[list, list]:
                     )
         request_body = body.get('requestBody')
         if request_body:
-            write_to_file(
-                f'{PREFIX_REQUEST}{operation_id}',
-                (
-                    'from enum import Enum, IntEnum'
-                    f'{"" if sys.version_info[1] < 11 else ", StrEnum"}\n'
-                    'from typing import Any, Dict, Optional, List\n'
-                    'from pydantic import Field, BaseModel\n\n\n'
-                ),
-                open_file_mode='w'
-            )
             schema = (
                 request_body.get('content').get('application/json')
                 or request_body.get('content').get('multipart/form-data'))
@@ -103,7 +239,7 @@ def process_endpoints() -> tuple[list, list]:
                 if schema_has_link
                 else {operation_id.capitalize(): schema.get('schema')}
             )
-            look_into_schema_new(schema, PREFIX_REQUEST + operation_id)
+            create_models_module(PREFIX_REQUEST + operation_id, schema)
         try:
             responses = body.get('responses', False)
             if responses:
@@ -115,16 +251,6 @@ def process_endpoints() -> tuple[list, list]:
                         or response.get('content').get('multipart/form-data'))
                     if not schema:
                         continue
-                    write_to_file(
-                        f'{PREFIX_RESPONSE}{operation_id}{method}{code}',
-                        (
-                            'from enum import Enum, IntEnum'
-                            f'{"" if sys.version_info[1] < 11 else ", StrEnum"}\n'
-                            'from typing import Any, Dict, Optional, List\n'
-                            'from pydantic import Field, BaseModel\n\n\n'
-                        ),
-                        open_file_mode='w'
-                    )
                     schema_has_link = schema.get('schema').get('$ref', False)
                     model_name = (
                         f'Response{operation_id.capitalize()}'
@@ -134,9 +260,9 @@ def process_endpoints() -> tuple[list, list]:
                         if schema_has_link
                         else {model_name: schema.get('schema')}
                     )
-                    look_into_schema_new(
+                    create_models_module(
+                        f'{PREFIX_RESPONSE}{operation_id}{method}{code}',
                         schema,
-                        f'{PREFIX_RESPONSE}{operation_id}{method}{code}'
                     )
         except Exception as e:
             logger.error(
@@ -144,8 +270,14 @@ def process_endpoints() -> tuple[list, list]:
                 f'{operation_id}, {method, code}!'
                 f'Error: {e}'
             )
+            get_report().add_error(
+                f'Unable to create responses for {operation_id}, '
+                f'{method, code}: {e}',
+            )
+    create_components_module()
     return path_parameters, query_parameters
 
 
 if __name__ == '__main__':
     process_endpoints()
+    write_generated_sources()